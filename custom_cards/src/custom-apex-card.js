@@ -9,6 +9,10 @@ import flatpickr_css_light from "flatpickr/dist/themes/light.css";
 // import { HomeAssistant } from "custom-card-helpers";
 // import { PropertyValues } from "@lit/reactive-element";
 
+// forecasts are closed while the config entry reloads, subscription is retried
+const RESUBSCRIBE_DELAY_MS = 2000;
+const RESUBSCRIBE_ATTEMPTS = 15;
+
 class CustomApexCard extends LitElement {
   static get properties() {
     return {
@@ -28,6 +32,8 @@ class CustomApexCard extends LitElement {
     this.darkMode = true;
     this.query = null;
     this.options = null;
+    this.forecasts = {};
+    this.unsubForecast = null;
 
     this.darkPallete = {
       chart_background: "#181818",
@@ -56,6 +62,7 @@ class CustomApexCard extends LitElement {
   }
 
   /**
+   * History of the range, downsampled and relative to its start on the server.
    *
    * @param {Date} from
    * @param {Date} to
@@ -64,26 +71,20 @@ class CustomApexCard extends LitElement {
    */
   async fetchHistory(from, to) {
     try {
-      const history = await this.hass.connection.sendMessagePromise({
-        type: "history/history_during_period",
-        start_time: from.toISOString(),
-        end_time: to.toISOString(),
-        entity_ids: [this.config.entity],
-        minimal_response: true,
+      const result = await this.hass.connection.sendMessagePromise({
+        type: "kronoterm/history/compare",
+        entity_id: this.config.entity,
+        ranges: [[from.toISOString(), to.toISOString()]],
+        points: this.config.points || 500,
       });
 
-      let series = history[this.config.entity]
-        .map((e, index) => {
-          return {
-            x: index,
-            y: parseFloat(e.s),
-            date: new Date(e.lu * 1000),
-          };
-        })
-        .filter((v) => !isNaN(v.y));
-
-      const step = 1;
-      return this.transformSeriesWithTimeSpacing(series, "minute", step);
+      const range = result.ranges[0];
+      const start = new Date(range.start).getTime();
+      return range.x.map((x, i) => ({
+        x: x,
+        y: range.y[i],
+        date: new Date(start + x * 60 * 1000),
+      }));
     } catch (e) {
       console.warn(e);
       return [];
@@ -128,8 +129,147 @@ class CustomApexCard extends LitElement {
     });
   }
 
+  /**
+   * Subscribe to forecasts, only changed slots are received after the first message.
+   */
+  async subscribeForecast() {
+    if (!this.config.forecast || this.unsubForecast) return;
+
+    const msg = { type: "kronoterm/forecast/subscribe" };
+    if (this.config.config_entry_id) {
+      msg.config_entry_id = this.config.config_entry_id;
+    }
+    try {
+      this.unsubForecast = await this.hass.connection.subscribeMessage(
+        (event) => this.handleForecast(event),
+        msg
+      );
+    } catch (e) {
+      console.warn(e);
+    }
+  }
+
+  /**
+   * Subscribe again once the config entry that closed the forecasts is loaded.
+   */
+  resubscribeForecast(attempt = 0) {
+    setTimeout(async () => {
+      if (!this.isConnected || this.unsubForecast) return;
+      await this.subscribeForecast();
+      if (!this.unsubForecast && attempt + 1 < RESUBSCRIBE_ATTEMPTS) {
+        this.resubscribeForecast(attempt + 1);
+      }
+    }, RESUBSCRIBE_DELAY_MS);
+  }
+
+  unsubscribeForecast() {
+    if (this.unsubForecast) {
+      this.unsubForecast();
+    }
+    this.unsubForecast = null;
+  }
+
+  /**
+   * @param {{type: string, kind?: string, version?: number, base_version?: number, start?: string, end?: string, slots?: Array<[string, number|null]>, forecasts?: Object}} event
+   */
+  handleForecast(event) {
+    if (event.type === "closed") {
+      this.unsubscribeForecast();
+      this.resubscribeForecast();
+      return;
+    }
+    if (event.type === "snapshot") {
+      this.forecasts = {};
+      for (const [kind, forecast] of Object.entries(event.forecasts)) {
+        this.forecasts[kind] = {
+          version: forecast.version,
+          slots: new Map(forecast.slots),
+        };
+      }
+    } else {
+      const forecast = this.forecasts[event.kind];
+      if (!forecast || forecast.version !== event.base_version) {
+        // missed a change, resync with a new snapshot
+        this.unsubscribeForecast();
+        this.subscribeForecast();
+        return;
+      }
+
+      const start = event.start ? new Date(event.start).getTime() : Infinity;
+      const end = event.end ? new Date(event.end).getTime() : -Infinity;
+      for (const date of forecast.slots.keys()) {
+        const time = new Date(date).getTime();
+        if (time < start || time > end) {
+          forecast.slots.delete(date);
+        }
+      }
+      for (const [date, value] of event.slots) {
+        forecast.slots.set(date, value);
+      }
+      forecast.version = event.version;
+      if (event.kind !== this.config.forecast) return;
+    }
+
+    if (this.chart) {
+      this.updateSeries();
+    }
+  }
+
+  /**
+   * Forecast on the same time axis as range 2, cumulative cost continues from its last value.
+   *
+   * @returns {Array<{x: number, y: number, date: Date}>}
+   */
+  forecastSeries() {
+    const forecast = this.forecasts[this.config.forecast];
+    if (!forecast || this.series2.length === 0) return [];
+
+    const offset =
+      this.config.forecast === "cost"
+        ? this.series2[this.series2.length - 1].y
+        : 0;
+    const points = [...forecast.slots.entries()]
+      .filter(([, y]) => y !== null)
+      .map(([date, y]) => ({ x: 0, y: y + offset, date: new Date(date) }))
+      .sort((a, b) => a.date - b.date);
+
+    return this.transformSeriesWithTimeSpacing(
+      [this.series2[0], ...points],
+      "minutes",
+      1
+    ).slice(1);
+  }
+
+  chartSeries() {
+    const series = [
+      {
+        name: "Range 1",
+        data: this.series1,
+      },
+      {
+        name: "Range 2",
+        data: this.series2,
+      },
+    ];
+    if (this.config.forecast) {
+      series.push({
+        name: "Forecast",
+        data: this.forecastSeries(),
+      });
+    }
+    return series;
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    this.unsubscribeForecast();
+  }
+
   connectedCallback() {
     super.connectedCallback();
+    if (this.hass) {
+      this.subscribeForecast();
+    }
     this.query = window.matchMedia("(prefers-color-scheme: dark)");
     this.query.addEventListener("change", (e) => {
       this.darkMode = e.matches;
@@ -159,11 +299,6 @@ class CustomApexCard extends LitElement {
           }
           this.fetchHistory(dates[0], dates[1]).then((vals) => {
             this.series1 = vals;
-            if (vals && vals.length > 0) {
-              this.series1 = vals.map((v) => {
-                return { x: v.x, y: v.y - vals[0].y, date: v.date };
-              });
-            }
             this.updateSeries();
           });
         }
@@ -179,11 +314,6 @@ class CustomApexCard extends LitElement {
           }
           this.fetchHistory(dates[0], dates[1]).then((vals) => {
             this.series2 = vals;
-            if (vals && vals.length > 0) {
-              this.series2 = vals.map((v) => {
-                return { x: v.x, y: v.y - vals[0].y, date: v.date };
-              });
-            }
             this.updateSeries();
           });
         }
@@ -193,19 +323,11 @@ class CustomApexCard extends LitElement {
     this.picker_s1.close();
     this.picker_s2.close();
     this.renderChart();
+    this.subscribeForecast();
   }
 
   updateSeries() {
-    this.chart.updateSeries([
-      {
-        name: "Range 1",
-        data: this.series1,
-      },
-      {
-        name: "Range 2",
-        data: this.series2,
-      },
-    ]);
+    this.chart.updateSeries(this.chartSeries());
   }
 
   /**
@@ -217,7 +339,9 @@ class CustomApexCard extends LitElement {
      */
     const hass = changedProps.get("hass");
     if (!hass) return;
-    this.darkMode = hass.themes.darkMode;
+    // hass changes on every state change, chart only depends on the theme
+    if (this.darkMode === this.hass.themes.darkMode) return;
+    this.darkMode = this.hass.themes.darkMode;
     // console.log("MODE: ", this.darkMode);
     this.updateChartData();
   }
@@ -398,16 +522,7 @@ class CustomApexCard extends LitElement {
         },
       },
       // colors: ["blue"],
-      series: [
-        {
-          name: "Range 1",
-          data: this.series1,
-        },
-        {
-          name: "Range 2",
-          data: this.series2,
-        },
-      ],
+      series: this.chartSeries(),
       xaxis: {
         type: "numeric",
         min: 0,
@@ -0,0 +1,187 @@
+"""Backfill of past cost from recorder history of the consumer."""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+from typing import Any, cast
+
+import numpy as np
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.models import StatisticData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, State
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN
+from .energy_api import EnergyAPI
+from .ledger import hour_start, statistic_metadata
+
+_LOGGER = logging.getLogger(__name__)
+
+# history and prices are processed one chunk at a time to bound memory
+BACKFILL_CHUNK = timedelta(days=1)
+SLOTS_PER_HOUR = 60 // EnergyAPI.INTERVALS
+
+BACKFILL_COST_STATISTIC = f"{DOMAIN}:backfill_cost"
+BACKFILL_ENERGY_STATISTIC = f"{DOMAIN}:backfill_energy"
+
+
+@dataclass
+class BackfillResult:
+    """Summary of backfilled period."""
+
+    hours: int = 0
+    energy: float = 0.0
+    cost: float = 0.0
+    missing_prices: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return summary in serializable format."""
+        return asdict(self)
+
+
+def slot_costs(
+    times: np.ndarray,
+    power: np.ndarray,
+    edges: np.ndarray,
+    prices: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return energy (kWh) and cost of every slot.
+
+    Power (W) changes at `times` (s) and holds until the next change, so
+    consumed energy is piecewise linear and exact at slot `edges` (s) by
+    interpolation. Unknown power counts as no consumption, unknown price as
+    no cost.
+    """
+    if len(times) == 0:
+        energy = np.zeros(len(edges) - 1)
+        return energy, energy.copy()
+
+    power = np.nan_to_num(power)
+    # energy consumed since the first change, at every change and at the end
+    points = np.append(times, max(times[-1], edges[-1]))
+    consumed = np.concatenate(([0.0], np.cumsum(power * np.diff(points)))) / 3.6e6
+
+    energy = np.diff(np.interp(edges, points, consumed))
+    return energy, np.nan_to_num(energy * prices)
+
+
+def _chunk_costs(
+    hass: HomeAssistant,
+    entity_id: str,
+    factor: float,
+    edges: np.ndarray,
+    prices: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Load history of one chunk and return energy and cost of its slots."""
+    start = dt_util.utc_from_timestamp(edges[0])
+    end = dt_util.utc_from_timestamp(edges[-1])
+    states = cast(
+        list[State],
+        history.get_significant_states(
+            hass,
+            start,
+            end,
+            [entity_id],
+            significant_changes_only=False,
+            include_start_time_state=True,
+            no_attributes=True,
+        ).get(entity_id, []),
+    )
+
+    def value(state: State) -> float:
+        try:
+            return float(state.state) * factor
+        except (TypeError, ValueError):
+            return np.nan
+
+    count = len(states)
+    times = np.fromiter(
+        (max(s.last_changed.timestamp(), edges[0]) for s in states), np.float64, count
+    )
+    power = np.fromiter((value(s) for s in states), np.float64, count)
+    return slot_costs(times, power, edges, prices)
+
+
+async def async_backfill(
+    hass: HomeAssistant,
+    provider: EnergyAPI,
+    entity_id: str,
+    factor: float,
+    start: datetime,
+    end: datetime,
+) -> BackfillResult:
+    """
+    Compute cost of consumption of entity in full hours from start to end.
+
+    Hourly energy and cost are written as external statistics
+    (`kronoterm:backfill_energy` and `kronoterm:backfill_cost`), summed from
+    start. Running backfill from the same start again overwrites them.
+    """
+    currency = await provider.currency()
+    recorder = get_instance(hass)
+    result = BackfillResult()
+
+    chunk_start = hour_start(start)
+    end = dt_util.as_utc(end)
+    while chunk_start < end:
+        chunk_end = min(chunk_start + BACKFILL_CHUNK, hour_start(end))
+        if chunk_end <= chunk_start:
+            break
+
+        slots = await provider.prices_between(chunk_start, chunk_end)
+        prices = np.array(
+            [np.nan if price is None else price for _, price in slots], dtype=float
+        )
+        edges = np.append(
+            [slot.timestamp() for slot, _ in slots], chunk_end.timestamp()
+        )
+
+        energy, cost = await recorder.async_add_executor_job(
+            partial(_chunk_costs, hass, entity_id, factor, edges, prices)
+        )
+        result.missing_prices += int(np.count_nonzero(np.isnan(prices)))
+
+        hourly_energy = energy.reshape(-1, SLOTS_PER_HOUR).sum(axis=1)
+        hourly_cost = cost.reshape(-1, SLOTS_PER_HOUR).sum(axis=1)
+        energy_sums = result.energy + np.cumsum(hourly_energy)
+        cost_sums = result.cost + np.cumsum(hourly_cost)
+        hours = [chunk_start + timedelta(hours=i) for i in range(len(hourly_energy))]
+
+        async_add_external_statistics(
+            hass,
+            statistic_metadata(
+                BACKFILL_ENERGY_STATISTIC,
+                "Kronoterm backfilled energy",
+                UnitOfEnergy.KILO_WATT_HOUR,
+            ),
+            [
+                StatisticData(start=hour, state=state, sum=total)
+                for hour, state, total in zip(
+                    hours, hourly_energy.tolist(), energy_sums.tolist(), strict=True
+                )
+            ],
+        )
+        async_add_external_statistics(
+            hass,
+            statistic_metadata(
+                BACKFILL_COST_STATISTIC, "Kronoterm backfilled cost", currency
+            ),
+            [
+                StatisticData(start=hour, state=state, sum=total)
+                for hour, state, total in zip(
+                    hours, hourly_cost.tolist(), cost_sums.tolist(), strict=True
+                )
+            ],
+        )
+
+        result.hours += len(hours)
+        result.energy = float(energy_sums[-1])
+        result.cost = float(cost_sums[-1])
+        _LOGGER.debug("Backfilled cost until %s", chunk_end)
+        chunk_start = chunk_end
+
+    return result
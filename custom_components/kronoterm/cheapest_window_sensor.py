@@ -0,0 +1,84 @@
+"""Sensors with start of the next cheapest window of a few run durations."""
+
+from datetime import datetime, timedelta
+from typing import Any, override
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.core import callback
+import homeassistant.util.dt as dt_util
+
+from .const import CHEAPEST_WINDOW_SENSOR
+from .forecast_cost import Window, cheapest_windows
+from .forecast_store import PRICE_FORECAST, ForecastStore
+
+CHEAPEST_WINDOW_HOURS = (1, 2, 3)
+
+
+class CheapestWindowSensor(SensorEntity):
+    """
+    Start of the cheapest window of a run duration among known prices.
+
+    Window is only searched for again when price forecast changes, which
+    happens at the start of every price slot and when day-ahead prices are
+    published. Window that started in the current price slot is kept until
+    the slot ends, so a refresh just after it starts doesn't drop it.
+    """
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_should_poll = False
+
+    def __init__(self, hours: int, forecast_store: ForecastStore) -> None:  # noqa: D107
+        self._duration = timedelta(hours=hours)
+        self._forecast_store = forecast_store
+        self._window: Window | None = None
+
+        sensor_id = f"{CHEAPEST_WINDOW_SENSOR}_{hours}h"
+        self._attr_translation_key = CHEAPEST_WINDOW_SENSOR
+        self._attr_translation_placeholders = {"hours": str(hours)}
+        self._attr_unique_id = sensor_id
+        self._attr_has_entity_name = True
+        self.entity_id = f"sensor.{sensor_id}"
+
+    @property
+    @override
+    def native_value(self) -> datetime | None:
+        return self._window.start if self._window else None
+
+    @property
+    @override
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {
+            "end": self._window.end.isoformat() if self._window else None,
+            "mean_price": self._window.mean_price if self._window else None,
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Find window in prices known so far and follow their changes."""
+        await super().async_added_to_hass()
+        self._update_window()
+        self.async_on_remove(
+            self._forecast_store.add_listener(self._async_forecast_changed)
+        )
+
+    @callback
+    def _async_forecast_changed(self, kind: str) -> None:
+        if kind == PRICE_FORECAST:
+            self._update_window()
+            self.async_write_ha_state()
+
+    def _update_window(self) -> None:
+        windows = cheapest_windows(
+            self._forecast_store.get(PRICE_FORECAST),
+            self._duration,
+            now=dt_util.utcnow(),
+        )
+        self._window = windows[0] if windows else None
+
+
+def cheapest_window_sensors(
+    forecast_store: ForecastStore,
+) -> list[CheapestWindowSensor]:
+    """Create cheapest window sensors for all run durations."""
+    return [
+        CheapestWindowSensor(hours, forecast_store) for hours in CHEAPEST_WINDOW_HOURS
+    ]
@@ -8,10 +8,30 @@ from homeassistant.core import callback
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.const import UnitOfPower
 from homeassistant.helpers.entity_registry import async_get as async_get_entity_registry
+import homeassistant.helpers.config_validation as cv
 
 from custom_components.kronoterm.energy_api import EnergyAPIFactory
 
-from .const import DOMAIN, SELECT_PROVIDER, SELECTED_CONSUMER, NAME
+from .const import (
+    ADDITIONAL_CONSUMERS,
+    DEFAULT_FORECAST_HORIZON,
+    DEFAULT_MIN_SAMPLE_INTERVAL,
+    DEFAULT_TRAINING_DAYS,
+    DOMAIN,
+    FORECAST_HORIZON,
+    MIN_SAMPLE_INTERVAL,
+    NAME,
+    SELECT_PROVIDER,
+    SELECTED_CONSUMER,
+    TRAINING_DAYS,
+)
+
+# history of the consumer, predictor is trained on
+MAX_TRAINING_DAYS = 90
+# consumer state is written at most once per interval (s)
+MAX_SAMPLE_INTERVAL = 300
+# day-ahead prices of the next day are known for at most 36 hours
+MAX_FORECAST_HORIZON = 48  # h
 
 
 class ProviderConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -74,11 +94,25 @@ class OptionsFlowHandler(OptionsFlow):
         # )
         selected_provider = self.config_entry.data[SELECT_PROVIDER]
         selected_sensor = self.config_entry.data.get(SELECTED_CONSUMER, None)
+        training_days = self.config_entry.data.get(TRAINING_DAYS, DEFAULT_TRAINING_DAYS)
+        min_interval = self.config_entry.data.get(
+            MIN_SAMPLE_INTERVAL, DEFAULT_MIN_SAMPLE_INTERVAL
+        )
+        additional_consumers = self.config_entry.data.get(ADDITIONAL_CONSUMERS) or []
+        horizon = self.config_entry.data.get(FORECAST_HORIZON, DEFAULT_FORECAST_HORIZON)
         # https://community.home-assistant.io/t/config-flow-how-to-update-an-existing-entity/522442/8
         if user_input is not None:
             data = {
                 SELECT_PROVIDER: user_input[SELECT_PROVIDER],
                 SELECTED_CONSUMER: none_is_none(user_input[SELECTED_CONSUMER]),
+                TRAINING_DAYS: user_input.get(TRAINING_DAYS, DEFAULT_TRAINING_DAYS),
+                MIN_SAMPLE_INTERVAL: user_input.get(
+                    MIN_SAMPLE_INTERVAL, DEFAULT_MIN_SAMPLE_INTERVAL
+                ),
+                ADDITIONAL_CONSUMERS: user_input.get(ADDITIONAL_CONSUMERS, []),
+                FORECAST_HORIZON: user_input.get(
+                    FORECAST_HORIZON, DEFAULT_FORECAST_HORIZON
+                ),
             }
             self.hass.config_entries.async_update_entry(self.config_entry, data=data)
 
@@ -105,6 +139,32 @@ class OptionsFlowHandler(OptionsFlow):
                         SELECTED_CONSUMER,
                         default=selected_sensor or "None",
                     ): vol.In(list(all_sensors.keys()) + ["None"]),
+                    vol.Optional(
+                        ADDITIONAL_CONSUMERS,
+                        default=[
+                            consumer
+                            for consumer in additional_consumers
+                            if consumer in all_sensors
+                        ],
+                    ): cv.multi_select(all_sensors),
+                    vol.Optional(
+                        TRAINING_DAYS,
+                        default=training_days,
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_TRAINING_DAYS)
+                    ),
+                    vol.Optional(
+                        MIN_SAMPLE_INTERVAL,
+                        default=min_interval,
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=MAX_SAMPLE_INTERVAL)
+                    ),
+                    vol.Optional(
+                        FORECAST_HORIZON,
+                        default=horizon,
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_FORECAST_HORIZON)
+                    ),
                 }
             ),
         )
@@ -8,3 +8,29 @@ SELECTED_CONSUMER = "selected_consumer"
 BLACK_HOLE_SENSOR = "black_hole_sensor"
 CONSUMER_SENSOR_ID = "consumer_sensor"
 TOTAL_COST_SENSOR = "total_cost_sensor"
+PROVIDER = "provider"
+PRICE_COORDINATOR = "price_coordinator"
+PROVIDER_REQUESTS_SENSOR = "provider_requests_sensor"
+PROVIDER_LATENCY_SENSOR = "provider_latency_sensor"
+PROVIDER_CACHE_HIT_RATIO_SENSOR = "provider_cache_hit_ratio_sensor"
+FORECAST_STORE = "forecast_store"
+CONFIG_ENTRY_ID = "config_entry_id"
+SERVICE_GET_FORECAST = "get_forecast"
+COST_LEDGER = "cost_ledger"
+DAILY_COST_SENSOR = "daily_cost_sensor"
+WEEKLY_COST_SENSOR = "weekly_cost_sensor"
+MONTHLY_COST_SENSOR = "monthly_cost_sensor"
+SERVICE_BACKFILL_COST = "backfill_cost"
+TRAINING_DAYS = "training_days"
+DEFAULT_TRAINING_DAYS = 7
+MIN_SAMPLE_INTERVAL = "min_sample_interval"
+DEFAULT_MIN_SAMPLE_INTERVAL = 10  # s
+ADDITIONAL_CONSUMERS = "additional_consumers"
+NAMED_CONSUMER_SENSOR = "named_consumer_sensor"
+NAMED_TOTAL_COST_SENSOR = "named_total_cost_sensor"
+TRAINING_POOL = "training_pool"
+TRACER = "tracer"
+FORECAST_HORIZON = "forecast_horizon"
+DEFAULT_FORECAST_HORIZON = 8  # h
+CHEAPEST_WINDOW_SENSOR = "cheapest_window_sensor"
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
@@ -1,42 +1,114 @@
 """Wrapper that imitates target sensor, so we can control state saving."""
 
+import asyncio
+from bisect import bisect_left
 from datetime import timedelta, datetime
 from dateutil.tz import tzutc
 from functools import partial
 import logging
 from typing import Any, cast, override
-from collections.abc import MutableMapping
+from collections.abc import AsyncIterator
 
 from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_utc_time_change,
+)
+from homeassistant.core import Event, HomeAssistant, State, callback
 
 import homeassistant.components.recorder as rec
-import homeassistant.components.recorder.history as hist
-
-from .const import CONSUMER_SENSOR_ID
+import homeassistant.util.dt as dt_util
+
+from .const import (
+    CONSUMER_SENSOR_ID,
+    NAMED_CONSUMER_SENSOR,
+    DEFAULT_FORECAST_HORIZON,
+    DEFAULT_MIN_SAMPLE_INTERVAL,
+    DEFAULT_TRAINING_DAYS,
+    DOMAIN,
+)
+from .forecast_store import CONSUMPTION_FORECAST, ForecastStore
 from .predictor import Predictor
+from .recorder_history import load_history
+from .refit_scheduler import RefitScheduler
+from .seasonal_profile import SeasonalProfile
+from .slot_average import SlotAverager
+from .tracing import Tracer
+from .training_pool import TrainingPool
 
 _LOGGER = logging.getLogger(__name__)
 
+# history is loaded one chunk at a time to bound memory
+HISTORY_CHUNK = timedelta(days=1)
+
+
+def _numeric_state(state: State | None) -> float | None:
+    """Return state as number, None if it isn't available."""
+    if state is None:
+        return None
+    try:
+        return float(state.state)
+    except (TypeError, ValueError):
+        return None
+
+
+def consumer_sensor_id(consumer: str | None) -> str:
+    """Return id of consumer sensor, the first consumer has no key."""
+    return (
+        CONSUMER_SENSOR_ID if consumer is None else f"{CONSUMER_SENSOR_ID}_{consumer}"
+    )
+
 
 class ConsumerSensor(SensorEntity):
     """Wrapper that imitates target sensor."""
 
+    # refit counters change every slot, they're kept out of the recorder too
+    _unrecorded_attributes = frozenset({"forecast", "refit"})
+
     predictor: Predictor
 
-    def __init__(self, hass: HomeAssistant, target_entity_id: str | None):
-        """Initialize wrapper."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        target_entity_id: str | None,
+        forecast_store: ForecastStore | None = None,
+        training_days: int = DEFAULT_TRAINING_DAYS,
+        min_interval: float = DEFAULT_MIN_SAMPLE_INTERVAL,
+        consumer: str | None = None,
+        pool: TrainingPool | None = None,
+        tracer: Tracer | None = None,
+        horizon: int = DEFAULT_FORECAST_HORIZON,
+    ):
+        """
+        Initialize wrapper.
+
+        Additional consumers of the entry are told apart by `consumer` key,
+        which is appended to ids of their entities. Forecast covers `horizon`
+        hours.
+        """
         self._hass = hass
+        self._forecast_store = forecast_store
         self._target_entity_id = target_entity_id
+        self._training_days = training_days
+        self._min_interval = min_interval
+        self._horizon = horizon * 60 // Predictor.INTERVALS
         self._state = 0.0
         self._original_state = 0
         self._attr_available = target_entity_id is not None
 
-        self._attr_translation_key = CONSUMER_SENSOR_ID
-        self._attr_unique_id = CONSUMER_SENSOR_ID
+        self._pool = pool
+        self._tracer = tracer or Tracer()
+        self._consumer = consumer
+        sensor_id = consumer_sensor_id(consumer)
+        if consumer is None:
+            self._attr_translation_key = CONSUMER_SENSOR_ID
+        else:
+            self._attr_translation_key = NAMED_CONSUMER_SENSOR
+            self._attr_translation_placeholders = {"consumer": consumer}
+        self._attr_unique_id = sensor_id
         self._attr_has_entity_name = True
-        self.entity_id = f"sensor.{CONSUMER_SENSOR_ID}"
+        self.entity_id = f"sensor.{sensor_id}"
 
         # Default attributes
         self._attr_device_class = None
@@ -46,6 +118,17 @@ class ConsumerSensor(SensorEntity):
         self._attr_extra_state_attributes: dict[Any, Any] = {}
 
         self.predictor = Predictor()
+        # forecast is served from profile until predictor is trained
+        self.profile = SeasonalProfile(hass, consumer)
+        self.trained = False
+        # slot averages that were completed during training
+        self._pending: list[tuple[datetime, float]] = []
+        self._training: asyncio.Task[None] | None = None
+        # predictor is refitted only when its forecast drifts or gets stale
+        self._scheduler = RefitScheduler()
+        self._refit: asyncio.Task[None] | None = None
+        self._averager = SlotAverager()
+        self._debouncer: Debouncer[None] | None = None
 
     async def async_added_to_hass(self, time: bool = True) -> None:
         """When entity is added to Home Assistant."""
@@ -53,43 +136,181 @@ class ConsumerSensor(SensorEntity):
         if self._target_entity_id is None:
             return
 
-        history = []
-
-        if self._target_entity_id is not None:
-            history = await get_entity_history(self._hass, self._target_entity_id)
-
-        self.predictor = Predictor.new(
-            [
-                (s.last_changed, float(s.state))
-                for s in history
-                if s.state not in ("unknown", "unavailable", "", None)
-            ]
-        )
+        # state is available right away, forecast follows current consumption
+        # until profile is loaded
+        now = datetime.now(tzutc())
+        state = self._hass.states.get(self._target_entity_id)
+        self._averager.add(now, _numeric_state(state))
+        self._update_from_state(state)
+        self._update_forecast(now)
 
-        self._update_from_state(
-            self._hass.states.get(self._target_entity_id), datetime.now(tzutc())
+        self._training = self._hass.async_create_background_task(
+            self._async_train(), f"{DOMAIN} consumer training"
         )
 
         if time:
-            # Initial state fetch
-            async_track_time_interval(
+            self._debouncer = Debouncer(
                 self._hass,
-                self._update_state,
-                timedelta(seconds=60),
-                cancel_on_shutdown=True,
+                _LOGGER,
+                cooldown=self._min_interval,
+                immediate=True,
+                function=self._async_publish,
+            )
+            # every change is sampled, state is written at most once per cooldown
+            self.async_on_remove(
+                async_track_state_change_event(
+                    self._hass, [self._target_entity_id], self._async_target_changed
+                )
+            )
+            # slots are completed even when target doesn't change
+            self.async_on_remove(
+                async_track_utc_time_change(
+                    self._hass,
+                    self._async_slot_end,
+                    minute=range(0, 60, Predictor.INTERVALS),
+                    second=0,
+                )
+            )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop training that didn't finish yet."""
+        if self._training is not None:
+            self._training.cancel()
+        if self._refit is not None:
+            self._refit.cancel()
+        if self._debouncer is not None:
+            self._debouncer.async_shutdown()
+
+    async def _async_train(self) -> None:
+        """Load profile, then history and train predictor without blocking startup."""
+        assert self._target_entity_id is not None
+
+        await self.profile.async_load()
+        self._update_forecast(datetime.now(tzutc()))
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+        predictor = Predictor()
+        with self._tracer.span("consumer/history", blocking=False):
+            async for chunk in entity_history_chunks(
+                self._hass, self._target_entity_id, self._training_days
+            ):
+                predictor.history.extend(chunk)
+        predictor = await self._async_fit(predictor.history)
+
+        predictor.history.extend(self._pending)
+        self._pending.clear()
+        self.predictor = predictor
+        # without history, profile forecasts until the first slot is fitted
+        self.trained = predictor.fitted
+        _LOGGER.debug("Trained predictor on %s samples", len(predictor.history))
+
+        now = datetime.now(tzutc())
+        if self.trained:
+            self._scheduler.fitted(now)
+        self._update_forecast(now)
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    @callback
+    def _async_target_changed(self, event: Event) -> None:
+        """Sample target at every change, write state debounced."""
+        new_state: State | None = event.data.get("new_state")
+        self._add_slots(self._averager.add(event.time_fired, _numeric_state(new_state)))
+        if self._debouncer is not None:
+            self._debouncer.async_schedule_call()
+
+    @callback
+    def _async_slot_end(self, now: datetime) -> None:
+        """Complete slot that ended, forecast then starts at the next one."""
+        self._add_slots(self._averager.advance(now))
+        self._update_forecast(now)
+        with self._tracer.span("consumer/write_state"):
+            self.async_write_ha_state()
+
+    @callback
+    def _async_publish(self) -> None:
+        """Write current state of target."""
+        if self._target_entity_id is None:
+            return
+        self._update_from_state(self._hass.states.get(self._target_entity_id))
+        self.async_write_ha_state()
+
+    def _add_slots(self, slots: list[tuple[datetime, float]]) -> None:
+        """Add averages of completed slots to profile and predictor."""
+        if not slots:
+            return
+
+        for slot, value in slots:
+            self.profile.add(slot, value)
+        if self._training is not None and not self._training.done():
+            self._pending.extend(slots)
+            return
+
+        self.predictor.history.extend(slots)
+        for slot, value in slots:
+            self._scheduler.observe(slot, value)
+        if self._refit is not None and not self._refit.done():
+            return
+
+        now = slots[-1][0] + timedelta(minutes=Predictor.INTERVALS)
+        if (reason := self._scheduler.reason(now)) is None:
+            self._scheduler.skipped += 1
+        else:
+            self._refit = self._hass.async_create_background_task(
+                self._async_refit(reason), f"{DOMAIN} consumer refit"
             )
+        self._attr_extra_state_attributes["refit"] = self._scheduler.as_dict()
+
+    async def _async_fit(self, history: list[tuple[datetime, float]]) -> Predictor:
+        """Train new predictor in training pool, so it doesn't block the loop."""
+        job = partial(Predictor.new, list(history))
+        # includes waiting for a worker of the pool
+        with self._tracer.span("consumer/fit", blocking=False):
+            if self._pool is None:
+                return await self._hass.async_add_executor_job(job)
+            predictor: Predictor = await self._pool.async_run(self.entity_id, job)
+        return predictor
+
+    async def _async_refit(self, reason: str) -> None:
+        """Replace predictor with one trained on history with new slots."""
+        self._trim_history(datetime.now(tzutc()))
+        history = self.predictor.history
+        predictor = await self._async_fit(history)
+        # slots added during training are kept
+        predictor.history = history
+        self.predictor = predictor
+        self.trained = predictor.fitted
+        self._scheduler.fitted(datetime.now(tzutc()), reason)
+        self._attr_extra_state_attributes["refit"] = self._scheduler.as_dict()
+        _LOGGER.debug("Refitted predictor of %s (%s)", self.entity_id, reason)
+
+    def _trim_history(self, now: datetime) -> None:
+        """Forget slots older than the training window, so refits stay bounded."""
+        history = self.predictor.history
+        start = now - timedelta(days=self._training_days)
+        del history[: bisect_left(history, start, key=lambda sample: sample[0])]
+
+    def _update_forecast(self, now: datetime) -> None:
+        """Forecast consumption from the slot of now."""
+        if self.trained:
+            forecast = self.predictor.forecast(now, self._horizon, self._tracer)
+            self._scheduler.expect(forecast)
+        else:
+            with self._tracer.span("consumer/profile"):
+                forecast = self.profile.forecast(now, self._state, self._horizon)
+        self._attr_extra_state_attributes["forecast"] = forecast
+        if self._forecast_store is not None:
+            self._forecast_store.update(CONSUMPTION_FORECAST, forecast)
 
-    def _update_from_state(self, state: Any, now: datetime) -> None:
+    def _update_from_state(self, state: Any) -> None:
         self._original_state = state
         if not state:
             return
 
-        if state.state != "unavailable":
-            self._state = float(state.state)
+        if (value := _numeric_state(state)) is not None:
+            self._state = value
             self._attr_available = True
-
-            self.predictor.add_and_refit(now, self._state)
-            self._attr_extra_state_attributes["forecast"] = self.predictor.forecast(now)
         else:
             self._attr_available = False
 
@@ -100,16 +321,6 @@ class ConsumerSensor(SensorEntity):
         self._attr_native_unit_of_measurement = attrs.get("unit_of_measurement")
         self._attr_icon = attrs.get("icon")
 
-    async def _update_state(self, now: datetime, write: bool = True) -> None:
-        if self._target_entity_id is None:
-            return
-
-        state = self.hass.states.get(self._target_entity_id)
-        self._update_from_state(state, now)
-
-        if write:
-            self.async_write_ha_state()
-
     @override
     @property
     def suggested_display_precision(self) -> int | None:
@@ -129,27 +340,29 @@ class ConsumerSensor(SensorEntity):
         return False
 
 
-async def get_entity_history(
+async def entity_history_chunks(
     hass: HomeAssistant,
     entity_id: str,
-) -> list[State]:
-    """Get last 7 days of entity history."""
-    now = datetime.now()
+    days: int = DEFAULT_TRAINING_DAYS,
+) -> AsyncIterator[list[tuple[datetime, float]]]:
+    """
+    Yield numeric entity history of the last days, one chunk at a time.
 
-    recorder = rec.get_instance(hass)
+    Entities with state class have mean statistics, which are much smaller
+    than their raw states. Other entities fall back to state changes. Only
+    one chunk is loaded at a time, so memory doesn't grow with the window.
+    """
+    now = dt_util.utcnow()
 
-    history: MutableMapping[
-        str, list[State | dict[str, Any]]
-    ] = await recorder.async_add_executor_job(
-        partial(
-            hist.get_significant_states,
-            hass,
-            now - timedelta(days=7),
-            now,
-            [entity_id],
-            significant_changes_only=False,
-            no_attributes=True,
-        ),
-    )
+    recorder = rec.get_instance(hass)
 
-    return cast(list[State], history.get(entity_id, []))
+    start = now - timedelta(days=days)
+    while start < now:
+        end = min(start + HISTORY_CHUNK, now)
+        yield cast(
+            list[tuple[datetime, float]],
+            await recorder.async_add_executor_job(
+                partial(load_history, hass, entity_id, start, end)
+            ),
+        )
+        start = end
@@ -0,0 +1,139 @@
+"""Coordinator refreshing electricity prices at slot boundaries."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import logging
+from typing import Any, override
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_utc_time_change,
+)
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+import homeassistant.util.dt as dt_util
+
+from .const import DEFAULT_FORECAST_HORIZON, DOMAIN
+from .energy_api import EnergyAPI
+from .tracing import Tracer
+
+_LOGGER = logging.getLogger(__name__)
+
+# how often to check for day-ahead prices while forecast is incomplete
+DAY_AHEAD_RETRY = timedelta(minutes=5)
+
+
+@dataclass
+class PriceData:
+    """Current price and price forecast at the time of the refresh."""
+
+    price: float | None
+    unit: str
+    forecast: list[tuple[datetime, float | None]] = field(default_factory=list)
+
+    @property
+    def forecast_complete(self) -> bool:
+        """Return True if prices for the whole forecast are known."""
+        return all(price is not None for _, price in self.forecast)
+
+    def complete_until(self, end: datetime) -> bool:
+        """Return True if prices of forecast slots that start before end are known."""
+        return all(price is not None for slot, price in self.forecast if slot < end)
+
+
+class PriceCoordinator(DataUpdateCoordinator[PriceData]):
+    """
+    Refreshes prices exactly at slot boundaries of the provider.
+
+    Prices only change when a new slot starts or when the provider publishes
+    day-ahead prices. Between slot boundaries no work is done, except for
+    periodic checks for day-ahead prices while some that could have been
+    published (until the end of the next day) are still missing.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        hass: HomeAssistant,
+        provider: EnergyAPI,
+        tracer: Tracer | None = None,
+        horizon: int = DEFAULT_FORECAST_HORIZON,
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} prices",
+            update_interval=None,
+            always_update=False,
+        )
+        self.provider = provider
+        self.tracer = tracer or Tracer()
+        # forecast slots, horizon is in hours
+        self._slots = horizon * 60 // provider.INTERVALS
+        self._unsub_slot: CALLBACK_TYPE | None = None
+        self._unsub_retry: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start refreshing at slot boundaries."""
+        if self._unsub_slot is not None:
+            return
+        self._unsub_slot = async_track_utc_time_change(
+            self.hass,
+            self._async_slot_started,
+            minute=list(range(0, 60, self.provider.INTERVALS)),
+            second=0,
+        )
+
+    async def _async_slot_started(self, _now: datetime) -> None:
+        await self.async_refresh()
+
+    async def _async_retry_day_ahead(self, _now: datetime) -> None:
+        self._unsub_retry = None
+        await self.async_refresh()
+
+    @override
+    async def _async_update_data(self) -> PriceData:
+        now = dt_util.utcnow()
+        metrics = self.provider.metrics
+        parses, parse_ms = metrics.parses, metrics.parse_ms_total
+        with self.tracer.span("price/fetch", blocking=False):
+            data = PriceData(
+                price=await self.provider.price(now),
+                unit=await self.provider.unit(),
+                forecast=await self.provider.prices(now, self._slots),
+            )
+        # responses are parsed on the loop, in between awaits of the fetch
+        if metrics.parses > parses:
+            self.tracer.record(
+                "price/parse", (metrics.parse_ms_total - parse_ms) / 1000
+            )
+
+        if self._unsub_retry is not None:
+            self._unsub_retry()
+            self._unsub_retry = None
+        # day-ahead prices of the next day are the last that can be published,
+        # longer horizons would otherwise keep retrying
+        published_end = dt_util.start_of_local_day(dt_util.as_local(now))
+        if not data.complete_until(published_end + timedelta(days=2)):
+            self._unsub_retry = async_call_later(
+                self.hass, DAY_AHEAD_RETRY, self._async_retry_day_ahead
+            )
+
+        return data
+
+    @override
+    async def async_shutdown(self) -> None:
+        await super().async_shutdown()
+        for unsub in (self._unsub_slot, self._unsub_retry):
+            if unsub is not None:
+                unsub()
+        self._unsub_slot = None
+        self._unsub_retry = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return state of the coordinator in serializable format."""
+        return {
+            "last_update_success": self.last_update_success,
+            "forecast_complete": self.data.forecast_complete if self.data else None,
+            "waiting_for_day_ahead": self._unsub_retry is not None,
+        }
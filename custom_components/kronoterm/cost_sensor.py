@@ -1,19 +1,35 @@
 """Cost sensor based on current price of electricity and current consumption."""
 
-from functools import cached_property
+from bisect import bisect_right
+from functools import cached_property, lru_cache
 import logging
-from typing import override, Any, cast
+from typing import override, Any
 
 from homeassistant.components.sensor import (
     RestoreSensor,
     SensorStateClass,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+import homeassistant.util.dt as dt_util
 
 from custom_components.kronoterm.const import (
+    NAMED_TOTAL_COST_SENSOR,
     TOTAL_COST_SENSOR,
-    CONSUMER_SENSOR_ID,
-    ENERGY_PRICE_SENSOR,
+)
+from custom_components.kronoterm.consumer_sensor import consumer_sensor_id
+from custom_components.kronoterm.coordinator import PriceCoordinator, PriceData
+from custom_components.kronoterm.energy_api import EnergyAPI
+from custom_components.kronoterm.forecast_cost import cumulative_cost
+from custom_components.kronoterm.integration import Piece, integrate
+from custom_components.kronoterm.ledger import CostLedger
+from custom_components.kronoterm.rollup_sensor import CostRollupSensor
+from custom_components.kronoterm.tracing import Tracer
+from custom_components.kronoterm.forecast_store import (
+    COST_FORECAST,
+    Forecast,
+    ForecastStore,
 )
 
 from datetime import datetime
@@ -21,39 +37,112 @@ from decimal import Decimal
 
 _LOGGER = logging.getLogger(__name__)
 
+SLOT_SECONDS = EnergyAPI.INTERVALS * 60
+
+
+@lru_cache
+def power_factor(unit: str) -> int:
+    """Return factor that converts power in unit to W."""
+    unit = unit.lower()
+    if unit == "w":
+        return 1
+    elif unit == "kw":
+        return 1_000
+    elif unit == "mw":
+        return 1_000_000
+
+    _LOGGER.info(
+        f"Unknown unit for consumption sensor: '{unit}', taking W as the unit anyway."
+    )
+    return 1
+
+
+def _slot_price(prices: Forecast, dt: datetime) -> float | None:
+    """Return price of slot that contains dt, None if it isn't known."""
+    timestamp = dt.timestamp()
+    i = bisect_right(prices, timestamp, key=lambda slot: slot[0].timestamp()) - 1
+    if i < 0:
+        return None
+    slot, price = prices[i]
+    # slot lasts until the next one, the last one for one interval
+    end = (
+        prices[i + 1][0].timestamp()
+        if i + 1 < len(prices)
+        else slot.timestamp() + SLOT_SECONDS
+    )
+    return price if timestamp < end else None
+
+
+def _state_available(state: State | None) -> bool:
+    return state is not None and state.state not in (None, "unknown", "unavailable")
 
-class CostSensor(RestoreSensor):
-    """Sensor that calculates cost from consumption and electricity price."""
 
-    def __init__(self, hass: HomeAssistant) -> None:  # noqa: D107
-        """Create a new cost sensor."""
+class CostSensor(CoordinatorEntity[PriceCoordinator], RestoreSensor):
+    """
+    Sensor that calculates cost from consumption and electricity price.
+
+    Prices are taken from the shared price coordinator and consumption from
+    state changes of the consumer sensor. Cost is integrated exactly at those
+    change points, with the values that were valid until the change. Forecast
+    cost is only recalculated when one of the input forecasts changes.
+    """
+
+    _unrecorded_attributes = frozenset({"cost_forecast_cumulative"})
+
+    def __init__(  # noqa: D107
+        self,
+        hass: HomeAssistant,
+        coordinator: PriceCoordinator,
+        forecast_store: ForecastStore | None = None,
+        ledger: CostLedger | None = None,
+        rollups: list[CostRollupSensor] | None = None,
+        consumer: str | None = None,
+        tracer: Tracer | None = None,
+    ) -> None:
+        """Create a new cost sensor of consumer, the first one if not given."""
+        super().__init__(coordinator)
+        self._tracer = tracer or Tracer()
+        self._forecast_store = forecast_store
+        self._ledger = ledger
+        self._rollups = rollups or []
 
         # core state
         self._state: str | None = None
         self._available = True
 
         self._cost: float | None = None
+        # pieces of the last integrated period, split at price slots
+        self._pieces: list[Piece] = []
         self._price: float | None = None
         self._consumption: float | None = None
 
         # settings for this entity
-        self._attr_translation_key = TOTAL_COST_SENSOR
-        self._attr_unique_id = TOTAL_COST_SENSOR
+        sensor_id = TOTAL_COST_SENSOR
+        if consumer is None:
+            self._attr_translation_key = TOTAL_COST_SENSOR
+        else:
+            sensor_id = f"{TOTAL_COST_SENSOR}_{consumer}"
+            self._attr_translation_key = NAMED_TOTAL_COST_SENSOR
+            self._attr_translation_placeholders = {"consumer": consumer}
+        self._attr_unique_id = sensor_id
         self._attr_has_entity_name = True
-        self.entity_id = f"sensor.{TOTAL_COST_SENSOR}"
+        self.entity_id = f"sensor.{sensor_id}"
 
         # other entities settings
-        self._current_price_entity_id: str = f"sensor.{ENERGY_PRICE_SENSOR}"
-        self._consumption_entity_id: str = f"sensor.{CONSUMER_SENSOR_ID}"
+        self._consumption_entity_id: str = f"sensor.{consumer_sensor_id(consumer)}"
         self._hass: HomeAssistant = hass
 
         # cumulative sum variables:
         self._cumulative_cost: float = 0.0
         self._last_update: datetime | None = None
 
-        # forecast variables
-        self._consumption_forecast: list[tuple[datetime, float | None]] | None = None
-        self._price_forecast: list[tuple[datetime, float | None]] | None = None
+        # forecast variables, consumer source is kept so changes can be detected
+        self._consumption_forecast: Forecast | None = None
+        self._price_forecast: Forecast | None = None
+        # slots that dropped out of the price forecast before they were charged
+        self._earlier_prices: Forecast = []
+        self._consumption_forecast_source: tuple[str, Any] | None = None
+        self._cost_forecast_cumulative: Forecast | None = None
         self._attr_extra_state_attributes: dict[Any, Any] = {}
 
     @cached_property
@@ -76,26 +165,14 @@ class CostSensor(RestoreSensor):
     @property
     @override
     def native_unit_of_measurement(self) -> str | None:
-        state_price = self._hass.states.get(self._current_price_entity_id)
-
-        if state_price and state_price.state not in (None, "unknown", "unavailable"):
-            try:
-                unit_full = cast(
-                    str, state_price.attributes.get("unit_of_measurement", "")
-                )
-
-                # extract the currency
-                unit = unit_full.split("/")[0].strip()
-
-                return unit
-
-            except (TypeError, ValueError):
-                _LOGGER.error("Error while getting unit from price sensor.")
-                return None
-        else:
-            _LOGGER.info("Current price entity state is unavailable.")
+        data: PriceData | None = self.coordinator.data
+        if data is None:
+            _LOGGER.info("Current price is unavailable.")
             return None
 
+        # extract the currency
+        return data.unit.split("/")[0].strip()
+
     @property
     @override
     def available(self) -> bool:
@@ -119,147 +196,78 @@ class CostSensor(RestoreSensor):
         return self._consumption
 
     def _get_current_price(self) -> float | None:
-        """Get and return current price from current price sensor."""
+        """Get and return current price from price coordinator."""
 
-        state_price = self._hass.states.get(self._current_price_entity_id)
-
-        if state_price and state_price.state not in (None, "unknown", "unavailable"):
-            try:
-                return float(state_price.state)
-            except (TypeError, ValueError):
-                _LOGGER.error("Error while getting current data from price sensor.")
-                return None
-        else:
-            _LOGGER.info("Current price entity state is unavailable.")
+        data: PriceData | None = self.coordinator.data
+        if data is None or data.price is None:
+            _LOGGER.info("Current price is unavailable.")
             return None
 
-    def _get_current_consumption(self) -> float | None:
-        """Get and return current consumption from consumer sensor."""
+        return data.price
 
-        state_consumption = self._hass.states.get(self._consumption_entity_id)
+    def _consumption_from_state(self, state: State | None) -> float | None:
+        """Return consumption in W from state of consumer sensor."""
 
-        if state_consumption and state_consumption.state not in (
-            None,
-            "unknown",
-            "unavailable",
-        ):
-            try:
-                # get data - unit, consumption
-                raw_consumption = float(state_consumption.state)
-                unit = state_consumption.attributes.get(
-                    "unit_of_measurement", ""
-                ).lower()
-
-                # check what unit consumer has
-                factor = 1
-                if unit == "w":
-                    factor = 1
-                elif unit == "kw":
-                    factor = 1_000
-                elif unit == "mw":
-                    factor = 1_000_000
-                else:
-                    _LOGGER.info(
-                        f"Unknown unit for consumption sensor: '{unit}', taking W as the unit anyway."
-                    )
-                    factor = 1
-
-                return raw_consumption * factor
-
-            except (TypeError, ValueError):
-                _LOGGER.error(
-                    "Error while getting current data from consumption sensor."
-                )
-                return None
-        else:
+        if state is None or not _state_available(state):
             _LOGGER.info("Current consumption entity state is unavailable.")
             return None
 
+        try:
+            unit = state.attributes.get("unit_of_measurement", "")
+            return float(state.state) * power_factor(unit)
+        except (TypeError, ValueError):
+            _LOGGER.error("Error while getting current data from consumption sensor.")
+            return None
+
     def _get_forecast_price(self) -> list[tuple[datetime, float | None]] | None:
-        """Get and return forecast price from current price sensor."""
-
-        state_price = self._hass.states.get(self._current_price_entity_id)
-
-        if state_price and state_price.state not in (
-            None,
-            "unknown",
-            "unavailable",
-        ):
-            try:
-                # get data - forecast array of tuples
-                forecast: list[tuple[datetime, float | None]] = (
-                    state_price.attributes.get("forecast")
-                )
+        """Get and return forecast price from price coordinator."""
 
-                return forecast
+        data: PriceData | None = self.coordinator.data
+        if data is None or data.price is None:
+            _LOGGER.info("Forecast price is unavailable.")
+            return None
 
-            except (TypeError, ValueError):
-                _LOGGER.warning("Error while getting forecast data from price sensor.")
-                return None
-        else:
-            _LOGGER.info("Forecast price entity state is unavailable.")
+        # not copied, forecast cost calculation doesn't modify it
+        return data.forecast
+
+    def _consumption_forecast_from_state(self, state: State | None) -> Forecast | None:
+        """Return consumption forecast in W from state of consumer sensor."""
+
+        if state is None or not _state_available(state):
+            _LOGGER.info("Forecast consumption entity state is unavailable.")
             return None
 
-    def _get_forecast_consumption(self) -> list[tuple[datetime, float | None]] | None:
-        """Get and return forecast consumption from consumer sensor."""
+        try:
+            factor = power_factor(state.attributes.get("unit_of_measurement", ""))
+            forecast: Forecast = state.attributes.get("forecast")
 
-        state_consumption = self._hass.states.get(self._consumption_entity_id)
+            if factor != 1:
+                # if factor isn't 1, we multiply consumption with it to get W
+                forecast = [
+                    (timestamp, value * factor if value is not None else None)
+                    for timestamp, value in forecast
+                ]
 
-        if state_consumption and state_consumption.state not in (
-            None,
-            "unknown",
-            "unavailable",
-        ):
-            try:
-                # get data - unit, forecast array of tuples
-                unit = state_consumption.attributes.get(
-                    "unit_of_measurement", ""
-                ).lower()
-
-                forecast: list[tuple[datetime, float | None]] = (
-                    state_consumption.attributes.get("forecast")
-                )
+            return forecast
 
-                # check what unit consumer has
-                factor = 1
-                if unit == "w":
-                    factor = 1
-                elif unit == "kw":
-                    factor = 1_000
-                elif unit == "mw":
-                    factor = 1_000_000
-                else:
-                    _LOGGER.info(
-                        f"Unknown unit for consumption sensor: '{unit}', taking W as the unit anyway."
-                    )
-                    factor = 1
-
-                if factor != 1:
-                    # if factor isn't 1, we multiply consumption with it to get W
-                    forecast = [
-                        (timestamp, value * factor if value is not None else None)
-                        for timestamp, value in forecast
-                    ]
-
-                return forecast
-
-            except (TypeError, ValueError):
-                _LOGGER.warning(
-                    "Error while getting forecast data from consumption sensor."
-                )
-                return None
-        else:
-            _LOGGER.info("Forecast consumption entity state is unavailable.")
+        except (TypeError, ValueError):
+            _LOGGER.warning(
+                "Error while getting forecast data from consumption sensor."
+            )
             return None
 
-    def _calculate_cost(self, now: datetime) -> float | None:
-        """Calculate current cost based on current price and consumption from the last update to now."""
+    def _calculate_cost(
+        self, now: datetime, consumption: float | None = None
+    ) -> float | None:
+        """
+        Calculate cost from the last update to now.
 
-        # current price ... EUR / kWh
-        # consumption ... W
-        # cost = price * (consumption/1000) = EUR/kWh * (W/1000) = EUR/kWh * kW = EUR/h
-        # then we only need time - we get this from difference in time since last update to now
+        Period is split at price slot boundaries, so every piece is charged
+        at the price of its own slot. Consumption changes linearly from the
+        last sample to `consumption` (the new sample, if there is one).
+        """
 
+        self._pieces = []
         if self._price is None or self._consumption is None:
             return None
 
@@ -267,20 +275,48 @@ class CostSensor(RestoreSensor):
             self._last_update = now
             return 0.0
 
-        time_diff_sec = (now - self._last_update).total_seconds()
-        time_diff_hours = time_diff_sec / 3600
-
-        cost = self._price * (self._consumption / 1000) * time_diff_hours
+        pieces = integrate(
+            self._last_update,
+            now,
+            self._consumption,
+            self._consumption if consumption is None else consumption,
+            self._price_at,
+        )
+        if self._ledger is not None:
+            self._ledger.add(pieces)
+        self._pieces = pieces
 
         self._last_update = now
 
-        return cost
+        return sum(piece.cost for piece in pieces if piece.cost is not None)
+
+    def _price_at(self, dt: datetime) -> float | None:
+        """Return price of slot that contains dt, current price if it isn't known."""
+        for prices in (self._price_forecast, self._earlier_prices):
+            if prices and (price := _slot_price(prices, dt)) is not None:
+                return price
+        return self._price
 
-    def _update_cumulative_cost(self) -> None:
-        """Calculate cumulative cost since the last update."""
+    def _uncharged_prices(self, price_forecast: Forecast | None) -> Forecast:
+        """Return known slots before price_forecast that end after the last update."""
+        if self._last_update is None:
+            return []
+        first = price_forecast[0][0] if price_forecast else None
+        since = self._last_update.timestamp()
+        return [
+            (slot, price)
+            for slot, price in [*self._earlier_prices, *(self._price_forecast or [])]
+            if (first is None or slot < first)
+            and slot.timestamp() + SLOT_SECONDS > since
+        ]
+
+    def _update_cumulative_cost(self, now: datetime) -> None:
+        """Calculate cumulative cost and period rollups since the last update."""
 
         if self._cost is not None:
             self._cumulative_cost += self._cost
+            for rollup in self._rollups:
+                rollup.add(self._pieces, now)
 
     def _calculate_forecast_cost_cumulative(
         self,
@@ -290,81 +326,100 @@ class CostSensor(RestoreSensor):
         if self._price_forecast is None or self._consumption_forecast is None:
             return None
 
-        forecast: list[tuple[datetime, float | None]] = []
-        last_datetime = None
-        total_cost = 0.0
-
-        # price time and consumption time can differ for 15 minutes
-        # in case one was updated e.g. at 14.59 and another at 15.00
-        # in that case we level them and return forecast with one entry less than usually
-        if (
-            abs(
-                (
-                    self._price_forecast[0][0] - self._consumption_forecast[0][0]
-                ).total_seconds()
-            )
-            > 60 * 15
-        ):
-            _LOGGER.warning(
-                "Datetime in price forecast and consumption forecast differ by more than 15 minutes."
-            )
-            return None
-        elif self._price_forecast[0][0] < self._consumption_forecast[0][0]:
-            # remove the first price forecast entry
-            self._price_forecast.pop(0)
-        elif self._price_forecast[0][0] > self._consumption_forecast[0][0]:
-            # remove the first consumption forecast entry
-            self._consumption_forecast.pop(0)
-
-        for price_entry, consumption_entry in zip(
-            self._price_forecast, self._consumption_forecast
-        ):
-            price_time, price_value = price_entry
-            consumption_time, consumption_value = consumption_entry
+        # forecasts are joined on slot timestamps, so they may start at
+        # different slots or have different resolution
+        return cumulative_cost(self._price_forecast, self._consumption_forecast)
 
-            if price_value is None or consumption_value is None:
-                continue
+    def _integrate(self, now: datetime, consumption: float | None = None) -> None:
+        """Add cost of the period since the last update, up to the new sample."""
+        with self._tracer.span("cost/integrate"):
+            self._cost = self._calculate_cost(now, consumption)
+            self._update_cumulative_cost(now)
+        # period without price or consumption is not charged later
+        self._last_update = now
 
-            if last_datetime is None:
-                last_datetime = consumption_time
-                forecast.append((last_datetime, total_cost))
-                continue
+    @callback
+    @override
+    def _handle_coordinator_update(self) -> None:
+        """
+        Switch to refreshed prices.
+
+        Cost is only integrated at consumption samples, so energy between two
+        samples doesn't depend on when prices were refreshed. Slots that
+        dropped out of the forecast are kept until they are charged.
+        """
+        self._price = self._get_current_price()
 
-            # calculate cost for the last period
-            time_diff_sec = (consumption_time - last_datetime).total_seconds()
-            time_diff_hours = time_diff_sec / 3600
-            cost = price_value * (consumption_value / 1000) * time_diff_hours
+        price_forecast = self._get_forecast_price()
+        if price_forecast != self._price_forecast:
+            self._earlier_prices = self._uncharged_prices(price_forecast)
+            self._price_forecast = price_forecast
+            self._update_forecast()
 
-            # update the total cost
-            total_cost += cost
-            forecast.append((consumption_time, total_cost))
+        self._available = self._cumulative_cost is not None
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_consumer_changed(self, event: Event) -> None:
+        """Integrate cost up to the new consumption sample, then switch to it."""
+        new_state: State | None = event.data.get("new_state")
+        consumption = self._consumption_from_state(new_state)
+        self._integrate(event.time_fired, consumption)
+        self._consumption = consumption
+
+        # forecast is parsed only when it (or its unit) changed
+        source = self._consumption_source(new_state)
+        if source != self._consumption_forecast_source:
+            self._consumption_forecast_source = source
+            self._consumption_forecast = self._consumption_forecast_from_state(
+                new_state
+            )
+            self._update_forecast()
 
-            # update loop variables
-            last_datetime = consumption_time
+        self._available = self._cumulative_cost is not None
+        with self._tracer.span("cost/write_state"):
+            self.async_write_ha_state()
 
-        return forecast
+    @staticmethod
+    def _consumption_source(state: State | None) -> tuple[str, Any] | None:
+        """Return raw unit and forecast of consumer, used to detect changes."""
+        if state is None or not _state_available(state):
+            return None
+        return (
+            state.attributes.get("unit_of_measurement", ""),
+            state.attributes.get("forecast"),
+        )
 
-    async def async_update(self) -> None:
-        """Update."""
-        now = datetime.now()
+    def _update_cost(self, now: datetime) -> None:
+        """Read all inputs, then update cost and forecast cost up to now."""
 
         # get data from other sensors:
         self._price = self._get_current_price()
-        self._consumption = self._get_current_consumption()
-        self._consumption_forecast = self._get_forecast_consumption()
+        state_consumption = self._hass.states.get(self._consumption_entity_id)
+        self._consumption = self._consumption_from_state(state_consumption)
+        self._consumption_forecast = self._consumption_forecast_from_state(
+            state_consumption
+        )
+        self._consumption_forecast_source = self._consumption_source(state_consumption)
         self._price_forecast = self._get_forecast_price()
 
         # calculate current cost and cumulative cost:
         self._cost = self._calculate_cost(now)
-        self._update_cumulative_cost()
+        self._update_cumulative_cost(now)
 
-        # calculate forecast cost:
-        self._cost_forecast_cumulative = self._calculate_forecast_cost_cumulative()
+        self._update_forecast()
+        self._available = self._cumulative_cost is not None
+
+    def _update_forecast(self) -> None:
+        """Recalculate forecast cost from input forecasts."""
+
+        with self._tracer.span("cost/forecast"):
+            self._cost_forecast_cumulative = self._calculate_forecast_cost_cumulative()
         self._attr_extra_state_attributes["cost_forecast_cumulative"] = (
             self._cost_forecast_cumulative
         )
-
-        self._available = self._cumulative_cost is not None
+        if self._forecast_store is not None:
+            self._forecast_store.update(COST_FORECAST, self._cost_forecast_cumulative)
 
     async def async_added_to_hass(self) -> None:
         """Restore previous state after Home Assistant restarts."""
@@ -383,3 +438,11 @@ class CostSensor(RestoreSensor):
                     type(native_value),
                 )
                 self._cumulative_cost = 0.0
+
+        self._update_cost(dt_util.utcnow())
+
+        self.async_on_remove(
+            async_track_state_change_event(
+                self._hass, [self._consumption_entity_id], self._async_consumer_changed
+            )
+        )
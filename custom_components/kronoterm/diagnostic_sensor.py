@@ -0,0 +1,136 @@
+"""Diagnostic sensors exposing network and cache metrics of energy provider."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+from typing import Any, override
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from custom_components.kronoterm.const import (
+    PROVIDER_CACHE_HIT_RATIO_SENSOR,
+    PROVIDER_LATENCY_SENSOR,
+    PROVIDER_REQUESTS_SENSOR,
+)
+from custom_components.kronoterm.coordinator import PriceCoordinator
+from custom_components.kronoterm.energy_api import ProviderMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ProviderMetricDescription:
+    """Describes which provider metric is exposed and how."""
+
+    key: str
+    state_class: SensorStateClass
+    native_unit_of_measurement: str | None = None
+    suggested_display_precision: int | None = None
+    value_fn: Callable[[ProviderMetrics], float | int | None]
+    attributes_fn: Callable[[ProviderMetrics], dict[str, Any]]
+
+
+def _ratio_to_percentage(ratio: float | None) -> float | None:
+    return None if ratio is None else round(ratio * 100, 1)
+
+
+PROVIDER_METRICS: tuple[ProviderMetricDescription, ...] = (
+    ProviderMetricDescription(
+        key=PROVIDER_REQUESTS_SENSOR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.requests,
+        attributes_fn=lambda metrics: {
+            "errors": metrics.errors,
+            "bytes": metrics.bytes,
+        },
+    ),
+    ProviderMetricDescription(
+        key=PROVIDER_LATENCY_SENSOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        value_fn=lambda metrics: metrics.latency_ms_mean,
+        attributes_fn=lambda metrics: {
+            "latency_histogram": metrics.latency_histogram_dict(),
+            "parse_ms_mean": metrics.parse_ms_mean,
+        },
+    ),
+    ProviderMetricDescription(
+        key=PROVIDER_CACHE_HIT_RATIO_SENSOR,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        value_fn=lambda metrics: _ratio_to_percentage(metrics.cache_hit_ratio),
+        attributes_fn=lambda metrics: {
+            "cache_hits": metrics.cache_hits,
+            "cache_misses": metrics.cache_misses,
+            "cache_evictions": metrics.cache_evictions,
+        },
+    ),
+)
+
+
+class ProviderMetricSensor(CoordinatorEntity[PriceCoordinator], SensorEntity):
+    """
+    Diagnostic sensor for one metric of energy provider.
+
+    Metrics mostly change when prices are refreshed, so the sensor is updated
+    by the price coordinator instead of being polled. Counters and histogram
+    are only recorded through the state.
+    """
+
+    _unrecorded_attributes = frozenset(
+        {
+            "errors",
+            "bytes",
+            "latency_histogram",
+            "parse_ms_mean",
+            "cache_hits",
+            "cache_misses",
+            "cache_evictions",
+        }
+    )
+
+    def __init__(  # noqa: D107
+        self, coordinator: PriceCoordinator, description: ProviderMetricDescription
+    ) -> None:
+        super().__init__(coordinator)
+        self._description = description
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_state_class = description.state_class
+        self._attr_native_unit_of_measurement = description.native_unit_of_measurement
+        self._attr_suggested_display_precision = description.suggested_display_precision
+        self._attr_translation_key = description.key
+        self._attr_unique_id = description.key
+        self._attr_has_entity_name = True
+        self.entity_id = f"sensor.{description.key}"
+
+    @property
+    @override
+    def available(self) -> bool:
+        # failed refreshes are what the metrics are about
+        return True
+
+    @property
+    @override
+    def native_value(self) -> float | int | None:
+        return self._description.value_fn(self.coordinator.provider.metrics)
+
+    @property
+    @override
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self._description.attributes_fn(self.coordinator.provider.metrics)
+
+
+def provider_metric_sensors(
+    coordinator: PriceCoordinator,
+) -> list[ProviderMetricSensor]:
+    """Create diagnostic sensors for all provider metrics."""
+    return [
+        ProviderMetricSensor(coordinator, description)
+        for description in PROVIDER_METRICS
+    ]
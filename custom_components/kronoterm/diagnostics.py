@@ -0,0 +1,51 @@
+"""Diagnostics support."""
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    ADDITIONAL_CONSUMERS,
+    COST_LEDGER,
+    DOMAIN,
+    PRICE_COORDINATOR,
+    PROVIDER,
+    SELECT_PROVIDER,
+    SELECTED_CONSUMER,
+    TRACER,
+    TRAINING_POOL,
+)
+from .coordinator import PriceCoordinator
+from .energy_api import EnergyAPI
+from .ledger import CostLedger
+from .tracing import Tracer
+from .training_pool import TrainingPool
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN].get(entry.entry_id, {})
+    provider: EnergyAPI | None = entry_data.get(PROVIDER)
+    coordinator: PriceCoordinator | None = entry_data.get(PRICE_COORDINATOR)
+    ledger: CostLedger | None = entry_data.get(COST_LEDGER)
+    pool: TrainingPool | None = hass.data[DOMAIN].get(TRAINING_POOL)
+    tracer: Tracer | None = entry_data.get(TRACER)
+
+    return {
+        "config": {
+            SELECT_PROVIDER: entry_data.get(SELECT_PROVIDER),
+            SELECTED_CONSUMER: entry_data.get(SELECTED_CONSUMER),
+            ADDITIONAL_CONSUMERS: entry_data.get(ADDITIONAL_CONSUMERS),
+        },
+        "provider": {
+            "name": type(provider).__name__ if provider else None,
+            "metrics": provider.metrics.as_dict() if provider else None,
+        },
+        "prices": coordinator.as_dict() if coordinator else None,
+        "ledger": ledger.as_dict() if ledger else None,
+        "training_pool": pool.as_dict() if pool else None,
+        "tracing": tracer.as_dict() if tracer else None,
+    }
@@ -65,32 +65,39 @@ class DummyPowerConsumerSensor(SensorEntity):
 
 def consumption() -> float:  # noqa: D103
     dt = datetime.now()
+    return float(daily_load(np.array([dt.hour * 60 + dt.minute]))[0])
+
+
+def daily_load(minute_of_day: np.ndarray) -> np.ndarray:
+    """Return simulated consumption (W) at every minute of day."""
 
     # Fine fluctuations (periodic per day)
-    def fine_fluctuations(minute_of_day: float) -> float:
-        return float(
+    def fine_fluctuations(minute_of_day: np.ndarray) -> np.ndarray:
+        fine: np.ndarray = (
             2 * np.sin(2 * np.pi * minute_of_day / 7.5)
             + 1.5 * np.sin(2 * np.pi * minute_of_day / 3.3)
             + 0.8 * np.sin(2 * np.pi * minute_of_day / 1.8)
         )
+        return fine
 
     # Smooth peak (Gaussian-shaped with wraparound)
     def smooth_peak(
-        hour: float, center: float, amplitude: float, width_hours: float
-    ) -> float:
+        hour: np.ndarray, center: float, amplitude: float, width_hours: float
+    ) -> np.ndarray:
         delta = (hour - center + 12) % 24 - 12  # Wrap hour within -12 to 12
-        return float(amplitude * np.exp(-(delta**2) / (2 * width_hours**2)))
+        peak: np.ndarray = amplitude * np.exp(-(delta**2) / (2 * width_hours**2))
+        return peak
 
-    hour = dt.hour + dt.minute / 60.0
-    minute_of_day = dt.hour * 60 + dt.minute
+    hour = minute_of_day / 60.0
 
     base_load = 300
     night_peak = smooth_peak(hour, center=2, amplitude=12000, width_hours=2.5)
     morning_peak = smooth_peak(hour, center=6, amplitude=5400, width_hours=2.0)
     evening_peak = smooth_peak(hour, center=18, amplitude=7200, width_hours=3.0)
-    modulation = float(150 * np.cos(2 * np.pi * hour / 24))
+    modulation = 150 * np.cos(2 * np.pi * hour / 24)
     fine = fine_fluctuations(minute_of_day)
 
-    return float(
-        base_load + night_peak + morning_peak + evening_peak + modulation + fine
+    return np.asarray(
+        base_load + night_peak + morning_peak + evening_peak + modulation + fine,
+        dtype=np.float64,
     )
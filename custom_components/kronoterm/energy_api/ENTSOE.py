@@ -2,13 +2,20 @@
 
 import asyncio
 import dateutil
-from .energy_api import EnergyAPI
+from itertools import groupby
+from .energy_api import EnergyAPI, slot_range
 from typing import override
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, tzinfo
 import aiohttp
 import xml.etree.ElementTree as ET
 from lru import LRU
 import os
+import time
+
+BASE_URL: str = "https://web-api.tp.entsoe.eu/api"
+# unpublished day isn't asked for again within this time, so a refresh of
+# the whole forecast asks for it only once
+MISS_TTL: float = 60  # s
 
 
 def _get_entsoe_api_key() -> str | None:
@@ -47,14 +54,21 @@ PROVIDER_TO_DOMAIN: dict[str, str] = {
 class ENTSOE(EnergyAPI):
     """ENTSOE data provider."""
 
+    base_url: str = BASE_URL
+    miss_ttl: float = MISS_TTL
+
     def __init__(self, provider: str) -> None:
         """Initialize the daily prices cache."""
         domain = PROVIDER_TO_DOMAIN.get(provider)
         if domain is None:
             raise ValueError(f"Unknown ENTSOE provider {provider}")
         self._domain = domain
-        self._daily_prices_cache: LRU[date, dict[datetime, float]] = LRU(10)
-        self._country = provider.split(" - ")[1]
+        self._daily_prices_cache: LRU[date, dict[datetime, float]] = LRU(
+            10, callback=self.metrics.cache_eviction
+        )
+        self._country = provider.split(" - ")[0].split(" (")[0]
+        # monotonic time when days without published prices were last asked for
+        self._misses: LRU[date, float] = LRU(10)
 
     @staticmethod
     @override
@@ -70,25 +84,64 @@ class ENTSOE(EnergyAPI):
     @override
     async def price(self, dt: datetime) -> float | None:
         """Return price for specific datetime (hourly resolution)."""
+        cet = await asyncio.to_thread(dateutil.tz.gettz, "CET")
+        hour = self._cet_hour(dt, cet)
+        return (await self._day_prices(hour.date())).get(hour)
 
+    @override
+    async def prices_between(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, float | None]]:
+        """
+        Return electricity prices of all slots from start (inclusive) to end.
+
+        Slots are looked up in prices of their CET day, so a range costs one
+        cache lookup (or request) per day instead of one per slot.
+        """
+        cet = await asyncio.to_thread(dateutil.tz.gettz, "CET")
+        hours = ((slot, self._cet_hour(slot, cet)) for slot in slot_range(start, end))
+
+        prices: list[tuple[datetime, float | None]] = []
+        for day, slots in groupby(hours, key=lambda slot: slot[1].date()):
+            day_prices = await self._day_prices(day)
+            prices.extend((slot, day_prices.get(hour)) for slot, hour in slots)
+        return prices
+
+    @staticmethod
+    def _cet_hour(dt: datetime, cet: tzinfo | None) -> datetime:
+        """Return start of hour of dt in CET, without time zone."""
         # TODO: use UTC
-        def convert(dt: datetime) -> datetime:
-            return dt.astimezone(dateutil.tz.gettz("CET")).replace(tzinfo=None)
+        return (
+            dt.astimezone(cet)
+            .replace(tzinfo=None)
+            .replace(minute=0, second=0, microsecond=0)
+        )
 
-        dt = await asyncio.to_thread(convert, dt)
+    async def _day_prices(self, day: date) -> dict[datetime, float]:
+        """Return prices of CET day, fetched if they aren't cached."""
+        if day in self._daily_prices_cache:
+            self.metrics.cache_hit()
+            return self._daily_prices_cache[day]
 
-        hour_rounded = dt.replace(minute=0, second=0, microsecond=0)
-        date_key = hour_rounded.date()
-        if date_key in self._daily_prices_cache:
-            return self._daily_prices_cache[date_key].get(hour_rounded)
+        missed = self._misses.get(day)
+        if missed is not None and time.monotonic() - missed < self.miss_ttl:
+            self.metrics.cache_hit()
+            return {}
 
-        xml_data = await self._fetch_entsoe_data(hour_rounded)
+        self.metrics.cache_miss()
+        xml_data = await self._fetch_entsoe_data(datetime(day.year, day.month, day.day))
         if not xml_data:
-            return None
+            return {}
 
-        prices_dict = self._parse_xml_response(xml_data)
-        self._daily_prices_cache[date_key] = prices_dict
-        return prices_dict.get(hour_rounded)
+        with self.metrics.parse():
+            prices_dict = self._parse_xml_response(xml_data)
+        # day-ahead prices not published yet, ask again after a while
+        if prices_dict:
+            self._daily_prices_cache[day] = prices_dict
+            self._misses.pop(day, None)
+        else:
+            self._misses[day] = time.monotonic()
+        return prices_dict
 
     async def _fetch_entsoe_data(self, dt: datetime) -> str:
         """Fetch XML data from ENTSO-E API."""
@@ -103,7 +156,7 @@ class ENTSOE(EnergyAPI):
             return ""
 
         url = (
-            f"https://web-api.tp.entsoe.eu/api?"
+            f"{self.base_url}?"
             f"documentType=A44"
             f"&out_Domain={self._domain}"
             f"&in_Domain={self._domain}"
@@ -112,10 +165,14 @@ class ENTSOE(EnergyAPI):
             f"&securityToken={api_key}"
         )
 
-        async with aiohttp.ClientSession() as session, session.get(url) as resp:
-            if resp.status != 200:
-                return ""
-            return await resp.text()
+        with self.metrics.request() as request:
+            async with aiohttp.ClientSession() as session, session.get(url) as resp:
+                if resp.status != 200:
+                    request.error = True
+                    return ""
+                text = await resp.text()
+                request.bytes = len(text)
+                return text
 
     def _parse_xml_response(self, xml_data: str) -> dict[datetime, float]:
         """Parse XML response from ENTSO-E API."""
@@ -1,10 +1,11 @@
 """Data provider module for Switzerland."""
 
-from .energy_api import EnergyAPI
+from .energy_api import EnergyAPI, slot_range
 
 from typing import override
 
 from datetime import datetime, date, timedelta
+from itertools import groupby
 import dateutil
 
 import aiohttp
@@ -15,6 +16,8 @@ import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+BASE_URL: str = "https://api.energy-charts.info/price"
+
 PROVIDER_TO_DOMAIN: dict[str, str] = {
     "Switzerland (Energy Charts)": "CH",
     "Czech Republic (Energy Charts)": "CZ",
@@ -25,9 +28,13 @@ PROVIDER_TO_DOMAIN: dict[str, str] = {
 class EnergyCharts(EnergyAPI):
     """EnergyAPI for Energy-Charts.info."""
 
+    base_url: str = BASE_URL
+
     def __init__(self, provider: str) -> None:
         """Initialize API."""
-        self._daily_prices_cache: LRU[date, dict[int, float | None]] = LRU(10)
+        self._daily_prices_cache: LRU[date, dict[int, float | None]] = LRU(
+            10, callback=self.metrics.cache_eviction
+        )
         self.session: aiohttp.ClientSession | None = None
         self.provider = PROVIDER_TO_DOMAIN[provider]
 
@@ -44,33 +51,60 @@ class EnergyCharts(EnergyAPI):
     async def price(self, dt: datetime) -> float | None:
         """Return price of electricity for specific datetime (hourly resolution)."""
 
-        dt = dt.astimezone(dateutil.tz.UTC).replace(tzinfo=None)
+        dt = dt.astimezone(dateutil.tz.UTC)
+        prices_dict = await self._day_prices(dt.date(), [dt.hour])
+        return prices_dict.get(dt.hour) if prices_dict is not None else None
 
-        hour_rounded_dict = dt.hour
-        date_key = dt.date()
+    @override
+    async def prices_between(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, float | None]]:
+        """
+        Return electricity prices of all slots from start (inclusive) to end.
+
+        Slots are looked up in prices of their UTC day, so a range costs one
+        cache lookup (or request) per day instead of one per slot.
+        """
+        prices: list[tuple[datetime, float | None]] = []
+        for day, day_slots in groupby(slot_range(start, end), key=datetime.date):
+            slots = list(day_slots)
+            prices_dict = await self._day_prices(day, [slot.hour for slot in slots])
+            prices.extend(
+                (slot, prices_dict.get(slot.hour) if prices_dict is not None else None)
+                for slot in slots
+            )
+        return prices
+
+    async def _day_prices(
+        self, day: date, hours: list[int]
+    ) -> dict[int, float | None] | None:
+        """Return prices of UTC day, fetched unless all hours are cached."""
 
         # check if we already fetched the data at some point:
-        if date_key in self._daily_prices_cache:
-            # last few values in dict might be None
-            cached_price = self._daily_prices_cache[date_key].get(hour_rounded_dict)
-            if cached_price is not None:
-                return cached_price
+        cached = self._daily_prices_cache.get(day)
+        # last few values in dict might be None
+        if cached is not None and all(cached.get(hour) is not None for hour in hours):
+            self.metrics.cache_hit()
+            return cached
+
+        self.metrics.cache_miss()
 
         # build url + fetch data from there
-        url = self._build_url(dt)
+        url = self._build_url(datetime(day.year, day.month, day.day))
         json_data = await self._fetch_data(url)
         if json_data is None:
             return None
 
         # convert data into a dictionary
-        prices_dict = self._parse_data(json_data, date_key)
+        with self.metrics.parse():
+            prices_dict = self._parse_data(json_data, day)
         if prices_dict is None:
             return None
 
         # store data into cache (last few values might be none!)
-        self._daily_prices_cache[date_key] = prices_dict
+        self._daily_prices_cache[day] = prices_dict
 
-        return prices_dict.get(hour_rounded_dict)
+        return prices_dict
 
     async def _fetch_data(self, url: str) -> dict | None:
         """Fetch data from the given URL."""
@@ -78,12 +112,15 @@ class EnergyCharts(EnergyAPI):
         json_data = None
 
         # Fetch data from the URL
-        async with aiohttp.ClientSession() as session, session.get(url) as response:
-            self.session = session
-            if response.status == 200:
-                json_data = await response.json()
-            else:
-                _LOGGER.warning(f"Failed to retrieve data: {response.status}")
+        with self.metrics.request() as request:
+            async with aiohttp.ClientSession() as session, session.get(url) as response:
+                self.session = session
+                if response.status == 200:
+                    request.bytes = len(await response.read())
+                    json_data = await response.json()
+                else:
+                    request.error = True
+                    _LOGGER.warning(f"Failed to retrieve data: {response.status}")
 
         return json_data
 
@@ -117,5 +154,5 @@ class EnergyCharts(EnergyAPI):
         start_str = start_date.isoformat(timespec="minutes")
         end_str = end_date.isoformat(timespec="minutes")
 
-        url = f"https://api.energy-charts.info/price?bzn={self.provider}&start={start_str}&end={end_str}"
+        url = f"{self.base_url}?bzn={self.provider}&start={start_str}&end={end_str}"
         return url
@@ -1,7 +1,8 @@
 """Data provider module for NordPool."""
 
 import asyncio
-from datetime import datetime
+from datetime import date, datetime
+from itertools import groupby
 from typing import override
 import urllib
 import dateutil
@@ -10,7 +11,7 @@ from collections.abc import MutableMapping
 
 import aiohttp as ahttp
 
-from custom_components.kronoterm.energy_api.energy_api import EnergyAPI
+from custom_components.kronoterm.energy_api.energy_api import EnergyAPI, slot_range
 
 BASE_URL: str = "https://dataportal-api.nordpoolgroup.com/api/DayAheadPriceIndices"
 
@@ -45,6 +46,7 @@ MARKETS = ["DayAhead", "N2EX_DayAhead"]  # 0: all but UK, 1: UK
 class NordPool(EnergyAPI):
     """EnergyAPI for NordPool."""
 
+    base_url: str = BASE_URL
     _internal_provider: str
     _currency: str
     _price_cache: MutableMapping[tuple[int, int, int], list[float]]
@@ -58,7 +60,7 @@ class NordPool(EnergyAPI):
 
         self._internal_provider = entry[0]
         self._currency = entry[1]
-        self._price_cache = LRU(10)  # type: ignore
+        self._price_cache = LRU(10, callback=self.metrics.cache_eviction)  # type: ignore
 
     @override
     @staticmethod
@@ -72,25 +74,48 @@ class NordPool(EnergyAPI):
     @override
     async def price(self, dt: datetime) -> float | None:
         """Return price of electricity at dt."""
+        dt = dt.astimezone(await asyncio.to_thread(dateutil.tz.gettz, "CET"))
+        return self._slot_price(await self._day_prices(dt.date()), dt)
 
-        def convert(dt: datetime) -> datetime:
-            return dt.astimezone(dateutil.tz.gettz("CET")).replace(tzinfo=None)
-
-        dt = await asyncio.to_thread(convert, dt)
-
-        cached = self._price_cache.get(
-            (dt.year, dt.month, dt.day)
-        ) or await self._fetch_prices(dt)
+    @override
+    async def prices_between(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, float | None]]:
+        """
+        Return electricity prices of all slots from start (inclusive) to end.
+
+        Slots are sliced from cached prices of their CET day, so a range costs
+        one cache lookup (or request) per day instead of one per slot.
+        """
+        cet = await asyncio.to_thread(dateutil.tz.gettz, "CET")
+        local_slots = ((slot, slot.astimezone(cet)) for slot in slot_range(start, end))
+
+        prices: list[tuple[datetime, float | None]] = []
+        for day, slots in groupby(local_slots, key=lambda slot: slot[1].date()):
+            cached = await self._day_prices(day)
+            prices.extend(
+                (slot, self._slot_price(cached, local)) for slot, local in slots
+            )
+        return prices
 
+    async def _day_prices(self, day: date) -> list[float] | None:
+        """Return prices of CET day, fetched if they aren't cached."""
+        cached = self._price_cache.get((day.year, day.month, day.day))
+        if cached:
+            self.metrics.cache_hit()
+            return cached
+        self.metrics.cache_miss()
+        return await self._fetch_prices(day)
+
+    def _slot_price(self, cached: list[float] | None, dt: datetime) -> float | None:
+        """Return price of slot of dt (CET) from prices of its day."""
         if cached is None:
             return None
+        idx = (dt.hour * 60 + dt.minute) // self.INTERVALS
+        # day might not be fully published yet
+        return cached[idx] if idx < len(cached) else None
 
-        minutes = dt.hour * 60
-        minutes += dt.minute
-        idx = minutes // self.INTERVALS
-        return cached[idx]
-
-    async def _fetch_prices(self, dt: datetime) -> list[float] | None:
+    async def _fetch_prices(self, dt: date) -> list[float] | None:
         date = f"{dt.year:04}-{dt.month:02}-{dt.day:02}"
         market = MARKETS[0] if self._internal_provider != "UK" else MARKETS[1]
 
@@ -104,19 +129,21 @@ class NordPool(EnergyAPI):
 
         async with ahttp.ClientSession() as session:
             try:
-                async with session.get(
-                    BASE_URL + "?" + urllib.parse.urlencode(params),
-                    allow_redirects=False,
-                ) as res:
-                    res.raise_for_status()
-                    data: dict = await res.json()
-                    cached = self._cache_data(dt, data)
-                    return cached
+                with self.metrics.request() as request:
+                    async with session.get(
+                        self.base_url + "?" + urllib.parse.urlencode(params),
+                        allow_redirects=False,
+                    ) as res:
+                        res.raise_for_status()
+                        request.bytes = len(await res.read())
+                        data: dict = await res.json()
+                with self.metrics.parse():
+                    return self._cache_data(dt, data)
 
             except ahttp.ClientError:
                 return None
 
-    def _cache_data(self, dt: datetime, data: dict) -> list[float]:
+    def _cache_data(self, dt: date, data: dict) -> list[float]:
         prices_list: list[dict[str, dict[str, float]]] = data["multiIndexEntries"]
         prices = [
             price["entryPerArea"][self._internal_provider] / 1000
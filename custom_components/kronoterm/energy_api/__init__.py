@@ -1,13 +1,22 @@
 """Energy providers."""
 
 from .energy_api import EnergyAPI
+from .metrics import ProviderMetrics
 from .GENI import GENI
 from .ElektroLJ import ElektroLJ
 from .ENTSOE import ENTSOE
 from .NordPool import NordPool
 from .EnergyCharts import EnergyCharts
 
-__all__ = ["EnergyAPI", "GENI", "ElektroLJ", "ENTSOE", "NordPool", "EnergyCharts"]
+__all__ = [
+    "EnergyAPI",
+    "ProviderMetrics",
+    "GENI",
+    "ElektroLJ",
+    "ENTSOE",
+    "NordPool",
+    "EnergyCharts",
+]
 ALL_MODULES: list[type[EnergyAPI]] = [GENI, ElektroLJ, ENTSOE, NordPool, EnergyCharts]
 
 
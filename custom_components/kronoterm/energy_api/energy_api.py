@@ -2,13 +2,17 @@
 
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
+from functools import cached_property
 from dateutil.tz import tzutc
 
+from .metrics import ProviderMetrics
+
 
 class EnergyAPI(ABC):
     """Interface for energy providers."""
 
     INTERVALS: int = 15  # min
+    HORIZON: int = 4 * 8  # slots
 
     @abstractmethod
     def __init__(self, provider: str) -> None:
@@ -42,6 +46,11 @@ class EnergyAPI(ABC):
         """Return currency of electricity price in ISO 4217."""
         raise NotImplementedError  # pragma: no cover
 
+    @cached_property
+    def metrics(self) -> ProviderMetrics:
+        """Return network and cache metrics of this provider."""
+        return ProviderMetrics()
+
     async def unit(self) -> str:
         """Return unit of price: `${currency}/kWh`."""
         return f"{await self.currency()}/kWh"
@@ -50,27 +59,48 @@ class EnergyAPI(ABC):
         """Return current price of electricity."""
         return await self.price(datetime.now(tzutc()))
 
-    async def prices(self, start: datetime) -> list[tuple[datetime, float | None]]:
+    async def prices(
+        self, start: datetime, count: int = HORIZON
+    ) -> list[tuple[datetime, float | None]]:
         """
-        Return series of future electricity prices (per interval defined in this class).
+        Return series of count future electricity prices (per interval of this class).
 
         If no timezone is specified, local will be used.
         """
+        first = _slot_start(start)
+        return await self.prices_between(
+            first, first + timedelta(minutes=EnergyAPI.INTERVALS * count)
+        )
+
+    async def prices_between(
+        self, start: datetime, end: datetime
+    ) -> list[tuple[datetime, float | None]]:
+        """
+        Return electricity prices of all slots from start (inclusive) to end.
 
-        start = start.astimezone(tzutc())
-
-        def dt(dt: datetime, times_interval: int = 0) -> datetime:
-            d = datetime(
-                dt.year,
-                dt.month,
-                dt.day,
-                dt.hour,
-                (dt.minute // EnergyAPI.INTERVALS) * EnergyAPI.INTERVALS,
-                0,
-                0,
-                dt.tzinfo,
-                fold=dt.fold,
-            )
-            return d + timedelta(minutes=EnergyAPI.INTERVALS * times_interval)
-
-        return [(dt(start, i), await self.price(dt(start, i))) for i in range(4 * 8)]
+        Slots are requested in time order, so providers fetch every day only
+        once and serve the rest of its slots from their cache.
+        """
+        return [(dt, await self.price(dt)) for dt in slot_range(start, end)]
+
+
+def _slot_start(dt: datetime) -> datetime:
+    """Return start (UTC) of slot that contains dt."""
+    dt = dt.astimezone(tzutc())
+    return dt.replace(
+        minute=(dt.minute // EnergyAPI.INTERVALS) * EnergyAPI.INTERVALS,
+        second=0,
+        microsecond=0,
+    )
+
+
+def slot_range(start: datetime, end: datetime) -> list[datetime]:
+    """Return starts (UTC) of slots from the one that contains start until end."""
+    slot = timedelta(minutes=EnergyAPI.INTERVALS)
+    dt = _slot_start(start)
+    end = end.astimezone(tzutc())
+    slots: list[datetime] = []
+    while dt < end:
+        slots.append(dt)
+        dt += slot
+    return slots
@@ -0,0 +1,113 @@
+"""Network and cache metrics of energy providers."""
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import time
+from typing import Any
+
+LATENCY_BUCKETS_MS: tuple[float, ...] = (50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass
+class RequestRecord:
+    """Outcome of one request, filled in by provider while request is running."""
+
+    bytes: int = 0
+    error: bool = False
+
+
+class ProviderMetrics:
+    """Counters of network and cache activity of one provider."""
+
+    def __init__(self) -> None:  # noqa: D107
+        self.requests: int = 0
+        self.errors: int = 0
+        self.bytes: int = 0
+        self.latency_ms_total: float = 0.0
+        # last bucket counts requests slower than all bounds
+        self.latency_histogram: list[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.parses: int = 0
+        self.parse_ms_total: float = 0.0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.cache_evictions: int = 0
+
+    @contextmanager
+    def request(self) -> Iterator[RequestRecord]:
+        """Time a network request, exceptions are counted as errors."""
+        record = RequestRecord()
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            record.error = True
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.requests += 1
+            self.errors += record.error
+            self.bytes += record.bytes
+            self.latency_ms_total += latency_ms
+            self.latency_histogram[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    @contextmanager
+    def parse(self) -> Iterator[None]:
+        """Time parsing of a response."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.parses += 1
+            self.parse_ms_total += (time.perf_counter() - start) * 1000
+
+    def cache_hit(self) -> None:
+        """Count lookup answered from cache."""
+        self.cache_hits += 1
+
+    def cache_miss(self) -> None:
+        """Count lookup that had to go to the network."""
+        self.cache_misses += 1
+
+    def cache_eviction(self, _key: Any, _value: Any) -> None:
+        """Count entry evicted from cache, usable as LRU callback."""
+        self.cache_evictions += 1
+
+    @property
+    def latency_ms_mean(self) -> float | None:
+        """Return mean request latency."""
+        return self.latency_ms_total / self.requests if self.requests else None
+
+    @property
+    def parse_ms_mean(self) -> float | None:
+        """Return mean parse time."""
+        return self.parse_ms_total / self.parses if self.parses else None
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        """Return share of lookups answered from cache."""
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+    def latency_histogram_dict(self) -> dict[str, int]:
+        """Return latency histogram keyed by bucket upper bound."""
+        labels = [f"<={bound:g}ms" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]:g}ms")
+        return dict(zip(labels, self.latency_histogram, strict=True))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics in serializable format."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "latency_ms_mean": self.latency_ms_mean,
+            "latency_histogram": self.latency_histogram_dict(),
+            "parses": self.parses,
+            "parse_ms_mean": self.parse_ms_mean,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": self.cache_hit_ratio,
+            "cache_evictions": self.cache_evictions,
+        }
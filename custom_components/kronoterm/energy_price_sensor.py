@@ -1,6 +1,5 @@
 """Sensor (data provider) for current price of electricity."""
 
-from datetime import datetime
 from functools import cached_property
 import logging
 from typing import override, Any
@@ -9,36 +8,47 @@ from homeassistant.components.sensor import (
     SensorEntity,
     SensorStateClass,
 )
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from custom_components.kronoterm.const import ENERGY_PRICE_SENSOR
-from custom_components.kronoterm.energy_api import EnergyAPI
+from custom_components.kronoterm.coordinator import PriceCoordinator, PriceData
+from custom_components.kronoterm.forecast_store import PRICE_FORECAST, ForecastStore
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class EnergyPriceSensor(SensorEntity):
+class EnergyPriceSensor(CoordinatorEntity[PriceCoordinator], SensorEntity):
     """Sensor (data provider) for current and future price of electricity."""
 
+    _unrecorded_attributes = frozenset({"forecast"})
+
     _provider_name: str
-    _provider: EnergyAPI
     _unit: str
-    _price: float | None
 
-    def __init__(self, provider_name: str, provider: EnergyAPI):  # noqa: D107
+    def __init__(  # noqa: D107
+        self,
+        provider_name: str,
+        coordinator: PriceCoordinator,
+        forecast_store: ForecastStore | None = None,
+    ):
+        super().__init__(coordinator)
         self._provider_name = provider_name
-        self._provider = provider
-        self._state: str | None = None
-        self._available = True
+        self._forecast_store = forecast_store
         self._attr_translation_key = ENERGY_PRICE_SENSOR
         self._attr_unique_id = ENERGY_PRICE_SENSOR
         self._attr_has_entity_name = True
         self.entity_id = f"sensor.{ENERGY_PRICE_SENSOR}"
 
     @staticmethod
-    async def new(provider_name: str, provider: EnergyAPI) -> Any:  # noqa: D102
-        sensor = EnergyPriceSensor(provider_name, provider)
-        sensor._unit = await sensor._provider.unit()
+    async def new(  # noqa: D102
+        provider_name: str,
+        coordinator: PriceCoordinator,
+        forecast_store: ForecastStore | None = None,
+    ) -> Any:
+        sensor = EnergyPriceSensor(provider_name, coordinator, forecast_store)
+        sensor._unit = await coordinator.provider.unit()
         return sensor
 
     # TODO: HA bug: is using state class 'measurement' which is impossible considering device class ('monetary') it is using; expected None or one of 'total'
@@ -61,19 +71,38 @@ class EnergyPriceSensor(SensorEntity):
     @override
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._available
+        return super().available and self.native_value is not None
 
     @property
     @override
     def native_value(self) -> float | None:
         """Return current price."""
-        return self._price
+        data: PriceData | None = self.coordinator.data
+        if data is None:
+            return None
+        return data.price
 
-    async def async_update(self) -> None:  # noqa: D102
-        current_price = await self._provider.current_price()
-        self._price = current_price
-        self._available = current_price is not None
-        self._attr_extra_state_attributes = {
+    @property
+    @override
+    def extra_state_attributes(self) -> dict[str, Any]:
+        forecast = self.coordinator.data.forecast if self.coordinator.data else []
+        return {
             "provider_name": self._provider_name,
-            "forecast": await self._provider.prices(datetime.now()),
+            "forecast": forecast,
         }
+
+    async def async_added_to_hass(self) -> None:
+        """Publish forecast known at the time entity is added."""
+        await super().async_added_to_hass()
+        self._publish_forecast()
+
+    @callback
+    @override
+    def _handle_coordinator_update(self) -> None:
+        self._publish_forecast()
+        with self.coordinator.tracer.span("price/write_state"):
+            super()._handle_coordinator_update()
+
+    def _publish_forecast(self) -> None:
+        if self._forecast_store is not None and self.coordinator.data is not None:
+            self._forecast_store.update(PRICE_FORECAST, self.coordinator.data.forecast)
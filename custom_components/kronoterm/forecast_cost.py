@@ -0,0 +1,205 @@
+"""Alignment of price and consumption forecasts, forecast cost and cheapest windows."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+
+from .forecast_store import Forecast
+
+# slot length of providers, used when forecast has a single slot
+DEFAULT_STEP = 15 * 60  # s
+
+# forecasts are only read, so any sequence of slots is accepted
+Slots = Sequence[tuple[datetime, float | None]]
+
+
+def _series(forecast: Slots) -> tuple[np.ndarray, np.ndarray]:
+    """Return timestamps (s) and values of forecast, missing values are NaN."""
+    count = len(forecast)
+    times = np.fromiter((t.timestamp() for t, _ in forecast), float, count)
+    values = np.fromiter(
+        (np.nan if v is None else v for _, v in forecast), float, count
+    )
+    return times, values
+
+
+def _step(times: np.ndarray) -> float | None:
+    """Return typical distance between timestamps, None if it can't be told."""
+    if len(times) < 2:
+        return None
+    return float(np.median(np.diff(times)))
+
+
+def align(price: Slots, consumption: Slots) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Join prices to slots of consumption forecast by timestamp.
+
+    Price of a slot is the price of the latest price slot that started at or
+    before it, as long as that price slot has not ended yet. That way hourly
+    prices (e.g. ENTSO-E) apply to all 15 minute consumption slots of the hour.
+    Returns timestamps of consumption slots and aligned prices (NaN if unknown).
+    """
+    consumption_times, _ = _series(consumption)
+    price_times, price_values = _series(price)
+    if len(price_times) == 0:
+        return consumption_times, np.full(len(consumption_times), np.nan)
+
+    # last price slot lasts as long as the others, or as consumption slot
+    price_step = _step(price_times) or _step(consumption_times) or 0.0
+    price_ends = np.append(price_times[1:], price_times[-1] + price_step)
+
+    idx = np.searchsorted(price_times, consumption_times, side="right") - 1
+    valid = idx >= 0
+    idx = np.clip(idx, 0, None)
+    valid &= consumption_times < price_ends[idx]
+
+    return consumption_times, np.where(valid, price_values[idx], np.nan)
+
+
+def cumulative_cost(price: Slots, consumption: Slots) -> Forecast:
+    """
+    Return cumulative forecast cost from price (per kWh) and consumption (W).
+
+    Slots without price or consumption are skipped. First known slot has cost
+    0, every next one adds its price and consumption over time since the
+    previous known slot.
+    """
+    if not price or not consumption:
+        return []
+
+    times, prices = align(price, consumption)
+    _, consumptions = _series(consumption)
+
+    known = np.flatnonzero(~np.isnan(prices) & ~np.isnan(consumptions))
+    if len(known) == 0:
+        return []
+
+    hours = np.diff(times[known]) / 3600
+    costs = prices[known][1:] * (consumptions[known][1:] / 1000) * hours
+    totals = np.concatenate(([0.0], np.cumsum(costs))).tolist()
+
+    slots: list[datetime] = [consumption[i][0] for i in known.tolist()]
+    return list(zip(slots, totals, strict=True))
+
+
+@dataclass(frozen=True)
+class Window:
+    """Run of an appliance that starts at a price slot boundary."""
+
+    start: datetime
+    end: datetime
+    cost: float
+    mean_price: float  # per kWh
+    base_load: float | None  # mean forecast consumption (W) of other consumers
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return window in serializable format."""
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "cost": self.cost,
+            "mean_price": self.mean_price,
+            "base_load": self.base_load,
+        }
+
+
+def _window_sums(values: np.ndarray, starts: np.ndarray, size: int) -> np.ndarray:
+    """Return sums of size values from starts on, NaN if any of them is unknown."""
+    known = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(known, values, 0.0))))
+    unknown = np.concatenate(([0], np.cumsum(~known)))
+    return np.where(
+        unknown[starts + size] == unknown[starts],
+        sums[starts + size] - sums[starts],
+        np.nan,
+    )
+
+
+def _non_overlapping(
+    order: list[int], starts: np.ndarray, ends: np.ndarray, count: int
+) -> list[int]:
+    """Return the first count windows in order that don't overlap earlier ones."""
+    chosen: list[int] = []
+    for i in order:
+        if all(ends[i] <= starts[j] or ends[j] <= starts[i] for j in chosen):
+            chosen.append(i)
+            if len(chosen) == count:
+                break
+    return chosen
+
+
+def cheapest_windows(
+    price: Slots,
+    duration: timedelta,
+    energy: float = 1.0,
+    *,
+    base_load: Slots | None = None,
+    now: datetime | None = None,
+    deadline: datetime | None = None,
+    max_power: float | None = None,
+    count: int = 1,
+) -> list[Window]:
+    """
+    Return up to count cheapest non-overlapping windows, cheapest first.
+
+    Appliance uses energy (kWh) evenly over duration. Windows start at price
+    slots that didn't end by now, so a window is kept until its first slot
+    ends, and end by the deadline (end of price forecast if not given).
+    Windows with unknown prices are skipped, and so are windows in which base
+    load (W) and appliance would draw more than `max_power` (W) or base load
+    isn't known. Price and base load sums of
+    every window come from prefix sums, so all windows are scored in O(n).
+    """
+    if not price or duration <= timedelta(0):
+        return []
+
+    times, prices = _series(price)
+    step = _step(times) or DEFAULT_STEP
+    seconds = duration.total_seconds()
+    full, rest = int(seconds // step), seconds % step
+    slots = full + (rest > 0)
+    starts = np.arange(max(len(times) - slots + 1, 0))
+
+    # the last slot of a window is used only for the rest of its duration
+    weighted = _window_sums(prices, starts, full)
+    if rest:
+        weighted += prices[starts + full] * rest / step
+    mean_prices = weighted * step / seconds
+    power = energy / (seconds / 3600)  # kW
+
+    base_means = np.full(len(starts), np.nan)
+    if base_load:
+        _, base = align(base_load, price)
+        base_means = _window_sums(base, starts, slots) / slots
+        if max_power is not None:
+            over = (base > max_power - power * 1000).astype(np.float64)
+            base_means[_window_sums(over, starts, slots) > 0] = np.nan
+
+    window_starts = times[starts]
+    window_ends = window_starts + seconds
+    valid = ~np.isnan(mean_prices)
+    if now is not None:
+        # now is floored to start of its slot
+        valid &= window_starts + step > now.timestamp()
+    if deadline is not None:
+        valid &= window_ends <= deadline.timestamp()
+    if max_power is not None:
+        valid &= ~np.isnan(base_means)
+
+    candidates = starts[valid][np.argsort(mean_prices[valid], kind="stable")]
+    windows: list[Window] = []
+    for i in _non_overlapping(candidates.tolist(), window_starts, window_ends, count):
+        base_mean = float(base_means[i])
+        windows.append(
+            Window(
+                start=price[i][0],
+                end=price[i][0] + duration,
+                cost=float(mean_prices[i] * energy),
+                mean_price=float(mean_prices[i]),
+                base_load=None if np.isnan(base_mean) else base_mean,
+            )
+        )
+    return windows
@@ -0,0 +1,126 @@
+"""In-memory store of latest forecasts, served without going through the recorder."""
+
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import Any
+
+PRICE_FORECAST = "price"
+CONSUMPTION_FORECAST = "consumption"
+COST_FORECAST = "cost"
+FORECAST_KINDS = (PRICE_FORECAST, CONSUMPTION_FORECAST, COST_FORECAST)
+
+Forecast = list[tuple[datetime, float | None]]
+
+_MISSING = object()
+
+
+class ForecastStore:
+    """
+    Latest price, consumption and cost forecasts of one config entry.
+
+    Forecasts can always be regenerated, so they are kept out of the recorder
+    and read from here instead. Serialized forecasts and changes since the
+    previous version are cached until the forecast changes again.
+    """
+
+    def __init__(self) -> None:  # noqa: D107
+        self._forecasts: dict[str, Forecast] = {}
+        self._previous: dict[str, Forecast] = {}
+        self._serialized: dict[str, list[tuple[str, float | None]]] = {}
+        self._deltas: dict[str, dict[str, Any]] = {}
+        self._versions: dict[str, int] = dict.fromkeys(FORECAST_KINDS, 0)
+        self._listeners: list[Callable[[str], None]] = []
+        self._close_listeners: list[Callable[[], None]] = []
+
+    def update(
+        self, kind: str, forecast: Sequence[tuple[datetime, float | None]] | None
+    ) -> None:
+        """Replace forecast of kind, listeners are only notified on change."""
+        current: Forecast = list(forecast) if forecast is not None else []
+        previous = self._forecasts.get(kind, [])
+        if previous == current:
+            return
+
+        self._previous[kind] = previous
+        self._forecasts[kind] = current
+        self._serialized.pop(kind, None)
+        self._deltas.pop(kind, None)
+        self._versions[kind] += 1
+        for listener in list(self._listeners):
+            listener(kind)
+
+    def get(self, kind: str) -> Forecast:
+        """Return forecast of kind."""
+        return self._forecasts.get(kind, [])
+
+    def version(self, kind: str) -> int:
+        """Return number of changes of forecast of kind."""
+        return self._versions[kind]
+
+    def serialized(self, kind: str) -> list[tuple[str, float | None]]:
+        """Return forecast of kind with timestamps in ISO format."""
+        if kind not in self._serialized:
+            self._serialized[kind] = [
+                (timestamp.isoformat(), value) for timestamp, value in self.get(kind)
+            ]
+        return self._serialized[kind]
+
+    def snapshot(self, kind: str) -> dict[str, Any]:
+        """Return whole serialized forecast of kind with its version."""
+        return {"version": self.version(kind), "slots": self.serialized(kind)}
+
+    def delta(self, kind: str) -> dict[str, Any]:
+        """
+        Return changes of forecast of kind since the previous version.
+
+        Slots outside of `start` and `end` were dropped, `slots` contains only
+        slots whose value changed or that were appended.
+        """
+        if kind not in self._deltas:
+            forecast = self.get(kind)
+            previous = dict(self._previous.get(kind, []))
+            self._deltas[kind] = {
+                "base_version": self.version(kind) - 1,
+                "version": self.version(kind),
+                "start": forecast[0][0].isoformat() if forecast else None,
+                "end": forecast[-1][0].isoformat() if forecast else None,
+                "slots": [
+                    (timestamp.isoformat(), value)
+                    for timestamp, value in forecast
+                    if previous.get(timestamp, _MISSING) != value
+                ],
+            }
+        return self._deltas[kind]
+
+    def as_dict(self, kinds: tuple[str, ...] = FORECAST_KINDS) -> dict[str, Any]:
+        """Return serialized forecasts of kinds."""
+        return {kind: self.serialized(kind) for kind in kinds}
+
+    def add_listener(self, listener: Callable[[str], None]) -> Callable[[], None]:
+        """Listen for forecast changes, returns function that removes listener."""
+        self._listeners.append(listener)
+        return lambda: _discard(self._listeners, listener)
+
+    def add_close_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Listen for store being closed, returns function that removes listener."""
+        self._close_listeners.append(listener)
+        return lambda: _discard(self._close_listeners, listener)
+
+    def close(self) -> None:
+        """
+        Drop all listeners, forecasts of unloaded entry don't change anymore.
+
+        Close listeners are notified, so they can follow the store that
+        replaces this one when the entry is loaded again.
+        """
+        close_listeners = self._close_listeners
+        self._close_listeners = []
+        self._listeners.clear()
+        for listener in close_listeners:
+            listener()
+
+
+def _discard(listeners: list[Any], listener: Any) -> None:
+    """Remove listener, it may have been dropped by close already."""
+    if listener in listeners:
+        listeners.remove(listener)
@@ -0,0 +1,114 @@
+"""Downsampled history of an entity in ranges that are compared in a chart."""
+
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Literal
+
+import numpy as np
+from homeassistant.components.recorder import get_instance
+from homeassistant.core import HomeAssistant
+
+from .recorder_history import states_history, statistics_history
+
+DEFAULT_POINTS = 500
+# short-term statistics are kept for a few days, longer ranges use hourly ones
+SHORT_TERM_RANGE = timedelta(days=2)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Return indices of points kept by Largest-Triangle-Three-Buckets.
+
+    First and last point are always kept. Of the rest, one point per bucket
+    is kept, the one that makes the largest triangle with the point kept in
+    the previous bucket and the average of the next bucket.
+    """
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    # buckets of points between the first and the last one
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    kept = np.empty(points, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end : edges[i + 2]].mean()
+            next_y = y[end : edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        a = kept[i]
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        kept[i + 1] = start + int(np.argmax(area))
+
+    return kept
+
+
+def _range_history(
+    hass: HomeAssistant, entity_id: str, start: datetime, end: datetime
+) -> list[tuple[datetime, float]]:
+    """Return history of range, from statistics if entity has them."""
+    period: Literal["5minute", "hour"] = (
+        "5minute" if end - start <= SHORT_TERM_RANGE else "hour"
+    )
+    return (
+        statistics_history(hass, entity_id, start, end, period, "sum")
+        or statistics_history(hass, entity_id, start, end, period, "mean")
+        or states_history(hass, entity_id, start, end)
+    )
+
+
+def compare_series(
+    history: list[tuple[datetime, float]], start: datetime, points: int
+) -> dict[str, Any]:
+    """
+    Return downsampled history relative to the range start.
+
+    `x` are minutes since start and `y` are changes since the first value, so
+    ranges of different lengths and levels can be drawn on the same axes.
+    """
+    if not history:
+        return {"start": start.isoformat(), "x": [], "y": []}
+
+    x = np.fromiter(
+        ((dt - start).total_seconds() / 60 for dt, _ in history),
+        np.float64,
+        len(history),
+    )
+    y = np.fromiter((value for _, value in history), np.float64, len(history))
+    kept = lttb(x, y, points)
+    return {
+        "start": start.isoformat(),
+        "x": np.round(x[kept], 3).tolist(),
+        "y": (y[kept] - y[0]).tolist(),
+    }
+
+
+def _compare_range(
+    hass: HomeAssistant, entity_id: str, start: datetime, end: datetime, points: int
+) -> dict[str, Any]:
+    """Read and downsample history of range, both are too slow for the loop."""
+    return compare_series(_range_history(hass, entity_id, start, end), start, points)
+
+
+async def async_compare(
+    hass: HomeAssistant,
+    entity_id: str,
+    ranges: list[tuple[datetime, datetime]],
+    points: int = DEFAULT_POINTS,
+) -> list[dict[str, Any]]:
+    """Return downsampled history of entity in every range."""
+    recorder = get_instance(hass)
+    return [
+        await recorder.async_add_executor_job(
+            partial(_compare_range, hass, entity_id, start, end, points)
+        )
+        for start, end in ranges
+    ]
@@ -0,0 +1,73 @@
+"""Integration of energy and cost between two consumption samples."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .energy_api import EnergyAPI
+
+
+@dataclass(frozen=True, slots=True)
+class Piece:
+    """Energy (kWh) and cost consumed in part of a period inside one slot."""
+
+    start: datetime
+    end: datetime
+    energy: float
+    cost: float | None
+
+
+def slot_boundaries(
+    start: datetime, end: datetime, interval: int = EnergyAPI.INTERVALS
+) -> list[datetime]:
+    """Return start, slot boundaries between start and end, and end."""
+    boundaries = [start]
+    boundary = start.replace(
+        minute=start.minute - start.minute % interval, second=0, microsecond=0
+    ) + timedelta(minutes=interval)
+    while boundary < end:
+        boundaries.append(boundary)
+        boundary += timedelta(minutes=interval)
+    boundaries.append(end)
+    return boundaries
+
+
+def integrate(
+    start: datetime,
+    end: datetime,
+    power_start: float,
+    power_end: float,
+    price_at: Callable[[datetime], float | None],
+) -> list[Piece]:
+    """
+    Split period at slot boundaries and integrate each piece.
+
+    Power (W) changes linearly from `power_start` to `power_end`, so energy of
+    each piece is a trapezoid. Price is constant inside of a slot and is read
+    with `price_at` at the start of the piece, cost is None if it's unknown.
+    """
+    if end <= start:
+        return []
+
+    duration = (end - start).total_seconds()
+
+    def power(dt: datetime) -> float:
+        return power_start + (power_end - power_start) * (
+            (dt - start).total_seconds() / duration
+        )
+
+    boundaries = slot_boundaries(start, end)
+    pieces = []
+    for piece_start, piece_end in zip(boundaries, boundaries[1:]):
+        hours = (piece_end - piece_start).total_seconds() / 3600
+        energy = (power(piece_start) + power(piece_end)) / 2 / 1000 * hours
+        price = price_at(piece_start)
+        pieces.append(
+            Piece(
+                piece_start,
+                piece_end,
+                energy,
+                energy * price if price is not None else None,
+            )
+        )
+    return pieces
@@ -0,0 +1,234 @@
+"""Ledger of consumed energy and its cost per slot."""
+
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN
+from .integration import Piece
+
+_LOGGER = logging.getLogger(__name__)
+
+SLOT = timedelta(minutes=15)
+# older slots are only kept as hourly statistics
+RETENTION = timedelta(days=35)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.cost_ledger"
+SAVE_DELAY = 60  # s
+
+COST_STATISTIC = f"{DOMAIN}:cost"
+ENERGY_STATISTIC = f"{DOMAIN}:energy"
+
+
+def slot_start(dt: datetime) -> datetime:
+    """Return start (UTC) of slot that contains dt."""
+    dt = dt_util.as_utc(dt)
+    return dt.replace(minute=dt.minute - dt.minute % 15, second=0, microsecond=0)
+
+
+def hour_start(dt: datetime) -> datetime:
+    """Return start (UTC) of hour that contains dt."""
+    return dt_util.as_utc(dt).replace(minute=0, second=0, microsecond=0)
+
+
+def statistic_metadata(
+    statistic_id: str, name: str, unit: str | None
+) -> StatisticMetaData:
+    """Return metadata of external statistic with sum."""
+    return StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=name,
+        source=DOMAIN,
+        statistic_id=statistic_id,
+        unit_of_measurement=unit,
+    )
+
+
+@dataclass(slots=True)
+class SlotRecord:
+    """Energy (kWh) and cost consumed in one slot."""
+
+    start: datetime
+    energy: float = 0.0
+    cost: float = 0.0
+
+    @property
+    def price(self) -> float | None:
+        """Return average price of energy consumed in slot."""
+        return self.cost / self.energy if self.energy else None
+
+
+class CostLedger:
+    """
+    Append-only ledger of energy and cost per 15 minute slot.
+
+    Completed hours are published as external statistics (`kronoterm:cost`
+    and `kronoterm:energy`), so long periods are read from pre-aggregated
+    statistics instead of raw states. Slots are persisted for `RETENTION`.
+    Slots booked into an hour that was published already (e.g. after clock
+    adjustment) publish that hour and the sums of later hours again.
+    """
+
+    def __init__(self, hass: HomeAssistant, currency: str | None) -> None:  # noqa: D107
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self.currency = currency
+        self.slots: list[SlotRecord] = []
+        # start of the first hour that wasn't published yet, sums are totals of
+        # all slots before it
+        self._published: datetime | None = None
+        # start of the first published hour that changed since
+        self._republish: datetime | None = None
+        self._energy_sum = 0.0
+        self._cost_sum = 0.0
+
+    async def async_load(self) -> None:
+        """Load persisted slots."""
+        data = await self._store.async_load()
+        if data is None:
+            return
+
+        self.slots = [
+            SlotRecord(dt_util.utc_from_timestamp(start), energy, cost)
+            for start, energy, cost in data["slots"]
+        ]
+        if data["published"] is not None:
+            self._published = dt_util.utc_from_timestamp(data["published"])
+        if data.get("republish") is not None:
+            self._republish = dt_util.utc_from_timestamp(data["republish"])
+        self._energy_sum = data["energy_sum"]
+        self._cost_sum = data["cost_sum"]
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "slots": [
+                (record.start.timestamp(), record.energy, record.cost)
+                for record in self.slots
+            ],
+            "published": self._published.timestamp() if self._published else None,
+            "republish": self._republish.timestamp() if self._republish else None,
+            "energy_sum": self._energy_sum,
+            "cost_sum": self._cost_sum,
+        }
+
+    def add(self, pieces: Sequence[Piece]) -> None:
+        """Book integrated pieces, each of them lies inside of one slot."""
+        if not pieces:
+            return
+
+        for piece in pieces:
+            start = slot_start(piece.start)
+            record = self._record(start)
+            record.energy += piece.energy
+            record.cost += piece.cost or 0.0
+            if self._published is not None and start < self._published:
+                # sums include all published hours, they're published again
+                self._energy_sum += piece.energy
+                self._cost_sum += piece.cost or 0.0
+                hour = hour_start(start)
+                self._republish = min(self._republish or hour, hour)
+
+        self._publish(pieces[-1].end)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save slots now, before the entry is unloaded and loaded again."""
+        await self._store.async_save(self._data_to_save())
+
+    def _record(self, start: datetime) -> SlotRecord:
+        """Return record of slot, appended if it is a new one."""
+        if not self.slots or self.slots[-1].start < start:
+            self.slots.append(SlotRecord(start))
+            # forget slots that are only needed as statistics by now
+            del self.slots[: self._index(start - RETENTION)]
+            return self.slots[-1]
+
+        # slot in the past, e.g. after clock adjustment
+        i = self._index(start)
+        if i == len(self.slots) or self.slots[i].start != start:
+            self.slots.insert(i, SlotRecord(start))
+        return self.slots[i]
+
+    def _index(self, start: datetime) -> int:
+        return bisect_left(self.slots, start, key=lambda record: record.start)
+
+    def hourly(self, start: datetime, end: datetime) -> list[SlotRecord]:
+        """Return records of hours (with any slots) from start to end."""
+        hours: list[SlotRecord] = []
+        for record in self.slots[self._index(start) : self._index(end)]:
+            hour = hour_start(record.start)
+            if not hours or hours[-1].start != hour:
+                hours.append(SlotRecord(hour))
+            hours[-1].energy += record.energy
+            hours[-1].cost += record.cost
+        return hours
+
+    def _publish(self, now: datetime) -> None:
+        """Publish hours completed before now as statistics."""
+        if not self.slots:
+            return
+
+        unpublished = self._published or hour_start(self.slots[0].start)
+        first_hour = self._republish or unpublished
+        end = max(hour_start(now), unpublished)
+        if first_hour >= end:
+            return
+
+        hours = self.hourly(first_hour, end)
+        # sums of published hours continue from the hour before the first one
+        republished = [hour for hour in hours if hour.start < unpublished]
+        energy_sum = self._energy_sum - sum(hour.energy for hour in republished)
+        cost_sum = self._cost_sum - sum(hour.cost for hour in republished)
+
+        energy: list[StatisticData] = []
+        cost: list[StatisticData] = []
+        for hour in hours:
+            energy_sum += hour.energy
+            cost_sum += hour.cost
+            energy.append(
+                StatisticData(start=hour.start, state=hour.energy, sum=energy_sum)
+            )
+            cost.append(StatisticData(start=hour.start, state=hour.cost, sum=cost_sum))
+        self._energy_sum = energy_sum
+        self._cost_sum = cost_sum
+        self._published = end
+        self._republish = None
+
+        if not energy:
+            return
+
+        _LOGGER.debug("Publishing %s hours of cost statistics", len(energy))
+        async_add_external_statistics(
+            self._hass,
+            statistic_metadata(
+                ENERGY_STATISTIC, "Kronoterm energy", UnitOfEnergy.KILO_WATT_HOUR
+            ),
+            energy,
+        )
+        async_add_external_statistics(
+            self._hass,
+            statistic_metadata(COST_STATISTIC, "Kronoterm cost", self.currency),
+            cost,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return state of the ledger in serializable format."""
+        return {
+            "slots": len(self.slots),
+            "first_slot": self.slots[0].start.isoformat() if self.slots else None,
+            "published_until": self._published.isoformat() if self._published else None,
+            "energy_sum": self._energy_sum,
+            "cost_sum": self._cost_sum,
+        }
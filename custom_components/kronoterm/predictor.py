@@ -1,16 +1,21 @@
 """Prediction model for predictor."""
 
-from datetime import datetime, timedelta
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Any, Self
 import numpy as np
 from sklearn.ensemble import GradientBoostingRegressor  # type: ignore
 import pickle
 
+from .tracing import Tracer
+
 
 class Predictor:
     """Interface for energy providers."""
 
     INTERVALS: int = 15  # min
+    HORIZON: int = 4 * 8  # slots
 
     def __init__(self) -> None:
         """Initialize an untrained Gradient Boosting Regressor model."""
@@ -18,27 +23,37 @@ class Predictor:
             n_estimators=100, learning_rate=0.1, random_state=42
         )
         self.history: list[tuple[datetime, float]] = []
+        # predictions of forecast slots that haven't started yet
+        self._predictions: dict[datetime, float] = {}
 
     @staticmethod
-    def _datetime_to_features(dt: datetime) -> list[float]:
-        """Convert datetime to numerical features for the model."""
-        return [
-            dt.hour + dt.minute / 60,
-            dt.weekday(),
-            int(dt.weekday() >= 5),
-            np.sin(2 * np.pi * dt.hour / 24),
-            np.cos(2 * np.pi * dt.hour / 24),
-            np.sin(2 * np.pi * dt.minute / 60),
-            np.cos(2 * np.pi * dt.minute / 60),
-            np.sin(2 * np.pi * (dt.hour * 60 + dt.minute) / (24 * 60)),
-            np.cos(2 * np.pi * (dt.hour * 60 + dt.minute) / (24 * 60)),
-            dt.month,
-            dt.isocalendar().week,
-            np.sin(2 * np.pi * dt.month / 12),
-            np.cos(2 * np.pi * dt.month / 12),
-            np.sin(2 * np.pi * dt.isocalendar().week / 52),
-            np.cos(2 * np.pi * dt.isocalendar().week / 52),
-        ]
+    def features(dts: Sequence[datetime]) -> np.ndarray:
+        """
+        Convert datetimes to rows of numerical features for the model.
+
+        Features are gathered from the slot-of-week table and the seasonal
+        features of each distinct day, so each datetime counts as the start of
+        its slot.
+        """
+        days, day_minutes = (
+            np.array(
+                [(dt.toordinal(), dt.hour * 60 + dt.minute) for dt in dts],
+                dtype=np.int64,
+            )
+            .reshape(-1, 2)
+            .T
+        )
+        # ordinal 1 is Monday
+        slots = (days - 1) % 7 * SLOTS_PER_DAY + day_minutes // Predictor.INTERVALS
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        return np.hstack(
+            (SLOT_OF_WEEK_FEATURES[slots], _seasonal_features(unique_days)[day_index])
+        )
+
+    @property
+    def fitted(self) -> bool:
+        """Return whether model was fitted, it can't predict before that."""
+        return hasattr(self.model, "estimators_")
 
     def dump(self) -> Any:
         """Return model in serializable format."""
@@ -73,9 +88,10 @@ class Predictor:
         if not filtered_history:
             return
 
-        X = np.array([self._datetime_to_features(dt) for dt, _ in filtered_history])
+        X = self.features([dt for dt, _ in filtered_history])
         y = np.array([val for _, val in filtered_history])
         self.model.fit(X, y)
+        self._predictions.clear()
 
     def add_and_refit(self, dt: datetime, value: float) -> None:
         """Add new data point and refit the model."""
@@ -84,11 +100,11 @@ class Predictor:
 
     def _predict(self, dt: datetime) -> float | None:
         """Predict consumption using the trained regression model."""
-        X = np.array(self._datetime_to_features(dt)).reshape(1, -1)
-        return abs(float(self.model.predict(X)[0]))
+        return abs(float(self.model.predict(self.features([dt]))[0]))
 
-    def forecast(self, start: datetime) -> list[tuple[datetime, float | None]]:
-        """Return series of predicted consumption (per interval defined in this class)."""
+    @classmethod
+    def slots(cls, start: datetime, count: int = HORIZON) -> list[datetime]:
+        """Return starts of count forecast intervals, from the one that contains start."""
 
         def dt_fixed(dt: datetime, i: int = 0) -> datetime:
             d = datetime(
@@ -96,15 +112,109 @@ class Predictor:
                 dt.month,
                 dt.day,
                 dt.hour,
-                (dt.minute // self.INTERVALS) * self.INTERVALS,
+                (dt.minute // cls.INTERVALS) * cls.INTERVALS,
                 0,
                 0,
                 dt.tzinfo,
                 fold=dt.fold,
             )
-            return d + timedelta(minutes=self.INTERVALS * i)
+            return d + timedelta(minutes=cls.INTERVALS * i)
+
+        return [dt_fixed(start, i) for i in range(count)]
+
+    def forecast(
+        self, start: datetime, count: int = HORIZON, tracer: Tracer | None = None
+    ) -> list[tuple[datetime, float | None]]:
+        """
+        Return series of predicted consumption (per interval defined in this class).
+
+        Predictions depend only on the model and the slot, so they're kept
+        until the slot starts and only newly exposed slots are predicted. They
+        are predicted in one call, on features from the horizon cache that is
+        shared by predictors of all consumers. Featurization and prediction
+        are timed with tracer when they happen.
+        """
+        tracer = tracer or Tracer()
+        slots = self.slots(start, count)
+        missing = [i for i, slot in enumerate(slots) if slot not in self._predictions]
+        if missing:
+            with tracer.span("consumer/featurize"):
+                features = horizon_features(slots[0], count)[missing]
+            with tracer.span("consumer/predict"):
+                predictions = np.abs(self.model.predict(features)).tolist()
+            for i, prediction in zip(missing, predictions, strict=True):
+                self._predictions[slots[i]] = prediction
+        # slots that already started are dropped
+        self._predictions = {slot: self._predictions[slot] for slot in slots}
+        return [(slot, self._predictions[slot]) for slot in slots]
+
+
+SLOTS_PER_DAY = 24 * 60 // Predictor.INTERVALS
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+
+
+def _slot_of_week_features() -> np.ndarray:
+    """Return time of day and day of week features of every slot in a week."""
+    weekday, day_slot = np.divmod(np.arange(SLOTS_PER_WEEK), SLOTS_PER_DAY)
+    day_minute = day_slot * Predictor.INTERVALS
+    hour, minute = np.divmod(day_minute, 60)
+    features = np.column_stack(
+        (
+            hour + minute / 60,
+            weekday,
+            weekday >= 5,
+            np.sin(2 * np.pi * hour / 24),
+            np.cos(2 * np.pi * hour / 24),
+            np.sin(2 * np.pi * minute / 60),
+            np.cos(2 * np.pi * minute / 60),
+            np.sin(2 * np.pi * day_minute / (24 * 60)),
+            np.cos(2 * np.pi * day_minute / (24 * 60)),
+        )
+    ).astype(np.float64)
+    features.setflags(write=False)
+    return features
 
-        return [
-            (dt_fixed(start, i), self._predict(dt_fixed(start, i)))
-            for i in range(4 * 8)
-        ]
+
+SLOT_OF_WEEK_FEATURES = _slot_of_week_features()
+
+
+def _seasonal_features(days: np.ndarray) -> np.ndarray:
+    """Return month and ISO week features of days (ordinals)."""
+    month, week = (
+        np.array(
+            [
+                (day.month, day.isocalendar().week)
+                for day in map(date.fromordinal, days.tolist())
+            ],
+            dtype=np.float64,
+        )
+        .reshape(-1, 2)
+        .T
+    )
+    return np.column_stack(
+        (
+            month,
+            week,
+            np.sin(2 * np.pi * month / 12),
+            np.cos(2 * np.pi * month / 12),
+            np.sin(2 * np.pi * week / 52),
+            np.cos(2 * np.pi * week / 52),
+        )
+    )
+
+
+def horizon_features(slot: datetime, count: int = Predictor.HORIZON) -> np.ndarray:
+    """
+    Return read-only features of count forecast slots from slot on.
+
+    Features depend only on wall-clock time of the slots, so they're cached by
+    the local slot start and computed once per slot for all consumers.
+    """
+    return _horizon_features(slot.replace(tzinfo=None), count)
+
+
+@lru_cache(maxsize=4)
+def _horizon_features(slot: datetime, count: int) -> np.ndarray:
+    features = Predictor.features(Predictor.slots(slot, count))
+    features.setflags(write=False)
+    return features
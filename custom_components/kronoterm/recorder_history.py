@@ -0,0 +1,75 @@
+"""Numeric history of entities read from recorder, run in recorder executor."""
+
+from datetime import datetime
+from typing import Any, Literal, cast
+
+from homeassistant.components.recorder import history
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.const import COMPRESSED_STATE_LAST_UPDATED, COMPRESSED_STATE_STATE
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+
+def statistics_history(
+    hass: HomeAssistant,
+    entity_id: str,
+    start: datetime,
+    end: datetime,
+    period: Literal["5minute", "hour"],
+    field: Literal["mean", "sum"] = "mean",
+) -> list[tuple[datetime, float]]:
+    """Return means (or sums) of entity in periods from recorder statistics."""
+    rows = statistics_during_period(
+        hass, start, end, {entity_id}, period, None, {field}
+    ).get(entity_id, [])
+    return [
+        (dt_util.utc_from_timestamp(row["start"]), value)
+        for row in rows
+        if (value := row.get(field)) is not None
+    ]
+
+
+def states_history(
+    hass: HomeAssistant, entity_id: str, start: datetime, end: datetime
+) -> list[tuple[datetime, float]]:
+    """Return numeric state changes of entity, without building State objects."""
+    states = cast(
+        list[dict[str, Any]],
+        history.get_significant_states(
+            hass,
+            start,
+            end,
+            [entity_id],
+            significant_changes_only=False,
+            minimal_response=True,
+            no_attributes=True,
+            compressed_state_format=True,
+        ).get(entity_id, []),
+    )
+
+    samples = []
+    for state in states:
+        try:
+            value = float(state[COMPRESSED_STATE_STATE])
+        except (TypeError, ValueError):
+            continue
+        samples.append(
+            (dt_util.utc_from_timestamp(state[COMPRESSED_STATE_LAST_UPDATED]), value)
+        )
+    return samples
+
+
+def load_history(
+    hass: HomeAssistant, entity_id: str, start: datetime, end: datetime
+) -> list[tuple[datetime, float]]:
+    """
+    Return history from statistics, or from states if entity has none.
+
+    Short-term statistics are purged after a few days, older history is only
+    available in hourly statistics.
+    """
+    return (
+        statistics_history(hass, entity_id, start, end, "5minute")
+        or statistics_history(hass, entity_id, start, end, "hour")
+        or states_history(hass, entity_id, start, end)
+    )
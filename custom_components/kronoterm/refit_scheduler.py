@@ -0,0 +1,97 @@
+"""Decides when predictor is refitted, from drift of its forecast residuals."""
+
+from collections import deque
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+# residuals of the last 4 hours of slots are compared
+RESIDUAL_WINDOW = 16
+MIN_RESIDUALS = 4
+# mean absolute error relative to mean observed consumption
+DRIFT_THRESHOLD = 0.3
+MAX_AGE = timedelta(days=2)
+MAX_NEW_SLOTS = 96
+# consumption below this doesn't make relative errors any larger
+MIN_SCALE = 1.0
+
+
+class RefitScheduler:
+    """
+    Tracks forecast residuals of completed slots and decides about refits.
+
+    Predictor is refitted when relative error of the last slots drifts past
+    the threshold, when it gets too old or when enough new slots were added
+    to history since it was fitted. Otherwise refit is skipped.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        drift_threshold: float = DRIFT_THRESHOLD,
+        max_age: timedelta = MAX_AGE,
+        max_new_slots: int = MAX_NEW_SLOTS,
+        window: int = RESIDUAL_WINDOW,
+    ) -> None:
+        self._drift_threshold = drift_threshold
+        self._max_age = max_age
+        self._max_new_slots = max_new_slots
+        self._predictions: dict[datetime, float] = {}
+        # absolute error and absolute observed value of every slot
+        self._residuals: deque[tuple[float, float]] = deque(maxlen=window)
+        self.fitted_at: datetime | None = None
+        self.new_slots = 0
+        self.refits = 0
+        self.skipped = 0
+        self.last_reason: str | None = None
+
+    def expect(self, forecast: Sequence[tuple[datetime, float | None]]) -> None:
+        """Remember predictions of the latest forecast."""
+        self._predictions = {
+            slot: value for slot, value in forecast if value is not None
+        }
+
+    def observe(self, slot: datetime, value: float) -> None:
+        """Compare observed slot average with its prediction."""
+        self.new_slots += 1
+        if (predicted := self._predictions.pop(slot, None)) is not None:
+            self._residuals.append((abs(value - predicted), abs(value)))
+
+    def error(self) -> float | None:
+        """Return relative error of the last slots, None if there are too few."""
+        if len(self._residuals) < MIN_RESIDUALS:
+            return None
+        errors = sum(error for error, _ in self._residuals)
+        scale = sum(value for _, value in self._residuals)
+        return errors / max(scale, MIN_SCALE * len(self._residuals))
+
+    def reason(self, now: datetime) -> str | None:
+        """Return why predictor should be refitted now, None if it shouldn't."""
+        if (error := self.error()) is not None and error > self._drift_threshold:
+            return "drift"
+        if self.fitted_at is None or now - self.fitted_at >= self._max_age:
+            return "age"
+        if self.new_slots >= self._max_new_slots:
+            return "slots"
+        return None
+
+    def fitted(self, now: datetime, reason: str | None = None) -> None:
+        """Start tracking a newly fitted predictor."""
+        self.fitted_at = now
+        self.new_slots = 0
+        self._residuals.clear()
+        if reason is not None:
+            self.refits += 1
+            self.last_reason = reason
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return residual metrics and refit decisions in serializable format."""
+        error = self.error()
+        return {
+            "error": round(error, 4) if error is not None else None,
+            "residuals": len(self._residuals),
+            "new_slots": self.new_slots,
+            "fitted_at": self.fitted_at.isoformat() if self.fitted_at else None,
+            "refits": self.refits,
+            "skipped": self.skipped,
+            "last_reason": self.last_reason,
+        }
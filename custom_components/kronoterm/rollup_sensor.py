@@ -0,0 +1,170 @@
+"""Sensors with cost of the current day, week and month."""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from typing import Any, override
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.restore_state import RestoredExtraData, RestoreEntity
+import homeassistant.util.dt as dt_util
+
+from .const import DAILY_COST_SENSOR, MONTHLY_COST_SENSOR, WEEKLY_COST_SENSOR
+from .integration import Piece
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def day_start(dt: datetime) -> datetime:
+    """Return local midnight of the day of dt."""
+    return dt_util.as_local(dt).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def week_start(dt: datetime) -> datetime:
+    """Return local midnight of Monday of the week of dt."""
+    start = day_start(dt)
+    return day_start(start - timedelta(days=start.weekday()))
+
+
+def month_start(dt: datetime) -> datetime:
+    """Return local midnight of the first day of the month of dt."""
+    return day_start(dt).replace(day=1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class RollupPeriod:
+    """Period after which rollup starts again from 0."""
+
+    key: str
+    start_fn: Callable[[datetime], datetime]
+
+
+ROLLUP_PERIODS: tuple[RollupPeriod, ...] = (
+    RollupPeriod(key=DAILY_COST_SENSOR, start_fn=day_start),
+    RollupPeriod(key=WEEKLY_COST_SENSOR, start_fn=week_start),
+    RollupPeriod(key=MONTHLY_COST_SENSOR, start_fn=month_start),
+)
+
+
+class CostRollupSensor(SensorEntity, RestoreEntity):
+    """
+    Running sum of cost in the current period.
+
+    Cost sensor adds pieces of every integrated period, so no history is read.
+    Pieces lie inside of price slots, which never cross a period start, so
+    each one is charged to the period it was consumed in. Sum resets at the
+    period start (local time) and the sum of the previous period is kept as
+    an attribute. Both are restored after restart.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, period: RollupPeriod, currency: str | None) -> None:  # noqa: D107
+        self._period = period
+        self._value = 0.0
+        self._previous: float | None = None
+        self._period_start = period.start_fn(dt_util.utcnow())
+
+        self._attr_state_class = SensorStateClass.TOTAL
+        self._attr_native_unit_of_measurement = currency
+        self._attr_suggested_display_precision = 2
+        self._attr_translation_key = period.key
+        self._attr_unique_id = period.key
+        self._attr_has_entity_name = True
+        self.entity_id = f"sensor.{period.key}"
+
+    @property
+    @override
+    def native_value(self) -> float:
+        return self._value
+
+    @property
+    @override
+    def last_reset(self) -> datetime:
+        return self._period_start
+
+    @property
+    @override
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"previous": self._previous}
+
+    @property
+    @override
+    def extra_restore_state_data(self) -> RestoredExtraData:
+        return RestoredExtraData(
+            {
+                "value": self._value,
+                "previous": self._previous,
+                "period_start": self._period_start.isoformat(),
+            }
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Restore sums and start rolling over at midnight."""
+        await super().async_added_to_hass()
+
+        if (data := await self.async_get_last_extra_data()) is not None:
+            try:
+                restored = data.as_dict()
+                period_start = dt_util.parse_datetime(restored["period_start"])
+                value = float(restored["value"])
+                previous = restored["previous"]
+                previous = float(previous) if previous is not None else None
+                if period_start is not None:
+                    self._value = value
+                    self._previous = previous
+                    self._period_start = period_start
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Failed to restore %s, starting from 0", self.entity_id)
+
+        self._roll_over(dt_util.utcnow())
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+        )
+
+    @callback
+    def _async_midnight(self, now: datetime) -> None:
+        if self._roll_over(now):
+            self.async_write_ha_state()
+
+    def _roll_over(self, now: datetime) -> bool:
+        """Start new period if now is past the current one, returns True if it did."""
+        start = self._period.start_fn(now)
+        if start <= self._period_start:
+            return False
+
+        # previous is 0 if whole periods passed without any update
+        last_start = self._period.start_fn(start - timedelta(microseconds=1))
+        self._previous = self._value if last_start == self._period_start else 0.0
+        self._value = 0.0
+        self._period_start = start
+        return True
+
+    @callback
+    def add(self, pieces: Sequence[Piece], now: datetime) -> None:
+        """Add cost of pieces integrated up to now to the periods they're in."""
+        for piece in pieces:
+            if piece.cost is None:
+                continue
+            self._roll_over(piece.start)
+            start = self._period.start_fn(piece.start)
+            if start == self._period_start:
+                self._value += piece.cost
+            elif self._previous is not None and start == self._period.start_fn(
+                self._period_start - timedelta(microseconds=1)
+            ):
+                # period was rolled over at its end, before it was integrated
+                self._previous += piece.cost
+        self._roll_over(now)
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+
+def cost_rollup_sensors(currency: str | None) -> list[CostRollupSensor]:
+    """Create rollup sensors for all periods."""
+    return [CostRollupSensor(period, currency) for period in ROLLUP_PERIODS]
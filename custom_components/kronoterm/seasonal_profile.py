@@ -0,0 +1,71 @@
+"""Seasonal-naive consumption profile, used until predictor is trained."""
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .predictor import Predictor
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.consumer_profile"
+SAVE_DELAY = 300  # s
+
+SLOTS_PER_DAY = 24 * 60 // Predictor.INTERVALS
+
+
+class SeasonalProfile:
+    """
+    Mean consumption of every slot of the day, on the last day it was seen.
+
+    Forecast for a slot is the consumption in the same slot a day before, or
+    fallback (usually current consumption) for slots without samples. Profile
+    is persisted, so forecast is available right after restart.
+    """
+
+    def __init__(self, hass: HomeAssistant, consumer: str | None = None) -> None:  # noqa: D107
+        key = STORAGE_KEY if consumer is None else f"{STORAGE_KEY}_{consumer}"
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, key)
+        # (day ordinal, sum, count) of samples for every slot of the day
+        self.slots: list[tuple[int, float, int] | None] = [None] * SLOTS_PER_DAY
+
+    async def async_load(self) -> None:
+        """Load persisted profile, slots sampled since start are kept."""
+        data = await self._store.async_load()
+        if data is not None and len(data["slots"]) == SLOTS_PER_DAY:
+            self.slots = [
+                current
+                if current is not None or not slot
+                else (int(slot[0]), float(slot[1]), int(slot[2]))
+                for current, slot in zip(self.slots, data["slots"], strict=True)
+            ]
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"slots": self.slots}
+
+    @staticmethod
+    def _slot(dt: datetime) -> int:
+        return (dt.hour * 60 + dt.minute) // Predictor.INTERVALS
+
+    def add(self, dt: datetime, value: float) -> None:
+        """Add consumption sample, samples of a new day replace the old ones."""
+        i = self._slot(dt)
+        day = dt.toordinal()
+        slot = self.slots[i]
+        if slot is None or slot[0] != day:
+            self.slots[i] = (day, value, 1)
+        else:
+            self.slots[i] = (day, slot[1] + value, slot[2] + 1)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def forecast(
+        self, start: datetime, fallback: float | None, count: int = Predictor.HORIZON
+    ) -> list[tuple[datetime, float | None]]:
+        """Return forecast of count slots in the same format as predictor."""
+        forecast: list[tuple[datetime, float | None]] = []
+        for dt in Predictor.slots(start, count):
+            slot = self.slots[self._slot(dt)]
+            forecast.append((dt, slot[1] / slot[2] if slot else fallback))
+        return forecast
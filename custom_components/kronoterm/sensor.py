@@ -11,15 +11,35 @@ from homeassistant.helpers.typing import (
 )
 
 from custom_components.kronoterm.const import (
+    ADDITIONAL_CONSUMERS,
+    COST_LEDGER,
     DOMAIN,
+    FORECAST_STORE,
+    PRICE_COORDINATOR,
+    PROVIDER,
     SELECT_PROVIDER,
     SELECTED_CONSUMER,
+    DEFAULT_FORECAST_HORIZON,
+    DEFAULT_MIN_SAMPLE_INTERVAL,
+    DEFAULT_TRAINING_DAYS,
+    FORECAST_HORIZON,
+    MIN_SAMPLE_INTERVAL,
+    TRACER,
+    TRAINING_DAYS,
 )
+from custom_components.kronoterm.coordinator import PriceCoordinator
 from custom_components.kronoterm.energy_price_sensor import EnergyPriceSensor
+from custom_components.kronoterm.cheapest_window_sensor import cheapest_window_sensors
 from custom_components.kronoterm.dummy_consumer_sensor import DummyPowerConsumerSensor
 from custom_components.kronoterm.consumer_sensor import ConsumerSensor
 from custom_components.kronoterm.energy_api import EnergyAPIFactory
 from custom_components.kronoterm.cost_sensor import CostSensor
+from custom_components.kronoterm.diagnostic_sensor import provider_metric_sensors
+from custom_components.kronoterm.forecast_store import ForecastStore
+from custom_components.kronoterm.ledger import CostLedger
+from custom_components.kronoterm.rollup_sensor import cost_rollup_sensors
+from custom_components.kronoterm.tracing import Tracer
+from custom_components.kronoterm.training_pool import get_training_pool
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -36,6 +56,10 @@ async def async_setup_entry(
         config.update(config_entry.options)
 
     await async_setup_platform(hass, config, async_add_entities)
+    # subscribers follow the store of the entry that replaces this one
+    config_entry.async_on_unload(config[FORECAST_STORE].close)
+    # entry loaded again reads the ledger from storage, pending save is stale then
+    config_entry.async_on_unload(config[COST_LEDGER].async_save)
 
 
 async def async_setup_platform(
@@ -47,20 +71,87 @@ async def async_setup_platform(
     """Set up the sensor platform."""
     provider_name = config[SELECT_PROVIDER]
     provider = await EnergyAPIFactory.create(provider_name)
+    # kept for diagnostics
+    config[PROVIDER] = provider
+
+    # timing spans of all update stages of the entry, kept for diagnostics
+    tracer = Tracer()
+    config[TRACER] = tracer
+
+    # price and consumption forecasts cover the same hours
+    horizon = config.get(FORECAST_HORIZON, DEFAULT_FORECAST_HORIZON)
+
+    # shared by price and cost sensor, refreshes at slot boundaries
+    coordinator = PriceCoordinator(hass, provider, tracer, horizon)
+    await coordinator.async_refresh()
+    coordinator.async_start()
+    config[PRICE_COORDINATOR] = coordinator
+
+    # forecasts are not recorded, they are read from here
+    forecast_store = ForecastStore()
+    config[FORECAST_STORE] = forecast_store
+
+    # per slot cost, published as long-term statistics
+    currency = coordinator.data.unit.split("/")[0].strip() if coordinator.data else None
+    ledger = CostLedger(hass, currency)
+    await ledger.async_load()
+    config[COST_LEDGER] = ledger
 
     dummy = DummyPowerConsumerSensor()
     async_add_entities([dummy], update_before_add=True)
     sensor_id = config.get(SELECTED_CONSUMER)
 
     energy_price_sensor: EnergyPriceSensor = await EnergyPriceSensor.new(
-        provider_name, provider
+        provider_name, coordinator, forecast_store
     )
 
-    consumer_sensor = ConsumerSensor(hass, sensor_id)
+    # training of all consumers shares one bounded pool
+    pool = get_training_pool(hass)
+    training_days = config.get(TRAINING_DAYS, DEFAULT_TRAINING_DAYS)
+    min_interval = config.get(MIN_SAMPLE_INTERVAL, DEFAULT_MIN_SAMPLE_INTERVAL)
+    consumer_sensor = ConsumerSensor(
+        hass,
+        sensor_id,
+        forecast_store,
+        training_days,
+        min_interval,
+        pool=pool,
+        tracer=tracer,
+        horizon=horizon,
+    )
 
-    async_add_entities([energy_price_sensor, consumer_sensor], update_before_add=True)
+    async_add_entities([energy_price_sensor])
+    # searched again only when price forecast changes
+    async_add_entities(cheapest_window_sensors(forecast_store))
+    async_add_entities([consumer_sensor], update_before_add=True)
 
+    # cost of the current day, week and month, fed by cost sensor
+    rollups = cost_rollup_sensors(currency)
+    async_add_entities(rollups)
     async_add_entities(
-        [CostSensor(hass)],
-        update_before_add=True,
+        [CostSensor(hass, coordinator, forecast_store, ledger, rollups, tracer=tracer)]
     )
+
+    # additional consumers have their own forecast and cost, but aren't part of
+    # forecast store, ledger and rollups of the entry
+    for target in config.get(ADDITIONAL_CONSUMERS) or []:
+        if target == sensor_id:
+            continue
+        consumer = target.split(".", 1)[1]
+        async_add_entities(
+            [
+                ConsumerSensor(
+                    hass,
+                    target,
+                    training_days=training_days,
+                    min_interval=min_interval,
+                    consumer=consumer,
+                    pool=pool,
+                    tracer=tracer,
+                    horizon=horizon,
+                ),
+                CostSensor(hass, coordinator, consumer=consumer, tracer=tracer),
+            ]
+        )
+
+    async_add_entities(provider_metric_sensors(coordinator))
@@ -0,0 +1,181 @@
+"""Services of the integration."""
+
+from datetime import timedelta
+from typing import Any
+
+import voluptuous as vol  # type: ignore
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+
+from .backfill import async_backfill
+from .const import (
+    CONFIG_ENTRY_ID,
+    DOMAIN,
+    FORECAST_STORE,
+    PROVIDER,
+    SELECTED_CONSUMER,
+    SERVICE_BACKFILL_COST,
+    SERVICE_FIND_CHEAPEST_WINDOW,
+    SERVICE_GET_FORECAST,
+)
+from .cost_sensor import power_factor
+from .forecast_cost import cheapest_windows
+from .forecast_store import (
+    CONSUMPTION_FORECAST,
+    FORECAST_KINDS,
+    PRICE_FORECAST,
+    ForecastStore,
+)
+
+ATTR_FORECAST = "forecast"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_DURATION = "duration"
+ATTR_ENERGY = "energy"
+ATTR_DEADLINE = "deadline"
+ATTR_MAX_POWER = "max_power"
+ATTR_COUNT = "count"
+
+GET_FORECAST_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORECAST, default=list(FORECAST_KINDS)): vol.All(
+            cv.ensure_list, [vol.In(FORECAST_KINDS)]
+        ),
+    }
+)
+
+BACKFILL_COST_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+    }
+)
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_DURATION): vol.All(
+            cv.time_period, vol.Range(min=timedelta(minutes=1))
+        ),
+        vol.Optional(ATTR_ENERGY, default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_MAX_POWER): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(ATTR_COUNT, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=10)
+        ),
+    }
+)
+
+
+def loaded_entry_data(
+    hass: HomeAssistant, entry_id: str | None, key: str
+) -> dict[str, Any]:
+    """Return data of loaded config entry with key, first such entry if not given."""
+    entries: dict[str, Any] = hass.data.get(DOMAIN, {})
+    for current_id, entry_data in entries.items():
+        if entry_id is not None and current_id != entry_id:
+            continue
+        if isinstance(entry_data, dict) and key in entry_data:
+            return entry_data
+
+    raise ServiceValidationError(f"No loaded {DOMAIN} config entry with {key}")
+
+
+def get_forecast_store(hass: HomeAssistant, entry_id: str | None) -> ForecastStore:
+    """Return forecast store of config entry, first loaded entry if not given."""
+    store: ForecastStore = loaded_entry_data(hass, entry_id, FORECAST_STORE)[
+        FORECAST_STORE
+    ]
+    return store
+
+
+def consumer_power_factor(hass: HomeAssistant, entity_id: str | None) -> int:
+    """Return factor that converts power of consumer to W, unit of its current state."""
+    state = hass.states.get(entity_id) if entity_id is not None else None
+    return power_factor(
+        state.attributes.get("unit_of_measurement", "") if state else ""
+    )
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register services of the integration."""
+
+    async def get_forecast(call: ServiceCall) -> ServiceResponse:
+        store = get_forecast_store(hass, call.data.get(CONFIG_ENTRY_ID))
+        return store.as_dict(tuple(call.data[ATTR_FORECAST]))
+
+    async def backfill_cost(call: ServiceCall) -> ServiceResponse:
+        entry_data = loaded_entry_data(hass, call.data.get(CONFIG_ENTRY_ID), PROVIDER)
+        entity_id = entry_data.get(SELECTED_CONSUMER)
+        if entity_id is None:
+            raise ServiceValidationError("No consumer is selected")
+
+        start = dt_util.as_utc(call.data[ATTR_START])
+        end = dt_util.as_utc(call.data.get(ATTR_END) or dt_util.utcnow())
+        if start >= end:
+            raise ServiceValidationError("Start of backfill must be before its end")
+
+        # history is loaded without attributes, unit is taken from current state
+        factor = consumer_power_factor(hass, entity_id)
+
+        result = await async_backfill(
+            hass, entry_data[PROVIDER], entity_id, factor, start, end
+        )
+        return result.as_dict()
+
+    async def find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+        entry_data = loaded_entry_data(
+            hass, call.data.get(CONFIG_ENTRY_ID), FORECAST_STORE
+        )
+        store: ForecastStore = entry_data[FORECAST_STORE]
+        # consumption is forecast in unit of the consumer, windows take W
+        factor = consumer_power_factor(hass, entry_data.get(SELECTED_CONSUMER))
+        base_load = [
+            (slot, value * factor if value is not None else None)
+            for slot, value in store.get(CONSUMPTION_FORECAST)
+        ]
+        deadline = call.data.get(ATTR_DEADLINE)
+        windows = cheapest_windows(
+            store.get(PRICE_FORECAST),
+            call.data[ATTR_DURATION],
+            call.data[ATTR_ENERGY],
+            base_load=base_load,
+            now=dt_util.utcnow(),
+            deadline=dt_util.as_utc(deadline) if deadline else None,
+            max_power=call.data.get(ATTR_MAX_POWER),
+            count=call.data[ATTR_COUNT],
+        )
+        return {"windows": [window.as_dict() for window in windows]}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_FORECAST,
+        get_forecast,
+        schema=GET_FORECAST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_COST,
+        backfill_cost,
+        schema=BACKFILL_COST_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,59 @@
+"""Time-weighted average of a sensor value in every slot."""
+
+from datetime import datetime, timedelta
+
+from .predictor import Predictor
+
+
+class SlotAverager:
+    """
+    Aggregates value changes into time-weighted slot averages.
+
+    Every value holds until the next change, so short spikes count for as
+    long as they lasted. Time with unknown value is left out of the average.
+    """
+
+    def __init__(self) -> None:  # noqa: D107
+        self._slot: datetime | None = None
+        self._last: tuple[datetime, float | None] | None = None
+        # value * seconds and seconds with known value in the current slot
+        self._weighted = 0.0
+        self._seconds = 0.0
+
+    def add(self, now: datetime, value: float | None) -> list[tuple[datetime, float]]:
+        """Switch to new value at now, return slots completed until now."""
+        completed = self.advance(now)
+        if self._slot is None:
+            self._slot = Predictor.slots(now, 1)[0]
+        self._last = (now, value)
+        return completed
+
+    def advance(self, now: datetime) -> list[tuple[datetime, float]]:
+        """Hold the last value until now, return slots completed until now."""
+        if self._last is None or self._slot is None or now <= self._last[0]:
+            return []
+
+        interval = timedelta(minutes=Predictor.INTERVALS)
+        since, value = self._last
+        completed = []
+        while True:
+            end = self._slot + interval
+            until = min(end, now)
+            if value is not None:
+                seconds = (until - since).total_seconds()
+                self._weighted += value * seconds
+                self._seconds += seconds
+            if now < end:
+                break
+
+            if self._seconds:
+                completed.append((self._slot, self._weighted / self._seconds))
+            self._slot = since = end
+            self._weighted = self._seconds = 0.0
+
+        self._last = (now, value)
+        return completed
+
+    def average(self) -> float | None:
+        """Return average of the current slot so far."""
+        return self._weighted / self._seconds if self._seconds else None
@@ -0,0 +1,123 @@
+"""Timing spans of update stages and detection of sections that block the loop."""
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+import logging
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# durations of the last spans of every name that percentiles are taken from
+SPAN_WINDOW = 256
+# asyncio reports callbacks as slow at 100 ms, stages should stay well below
+BLOCKING_THRESHOLD = 0.05  # s
+# a span that keeps blocking the loop is reported at most this often
+WARNING_INTERVAL = 3600  # s
+PERCENTILES = (50, 95, 99)
+
+
+class SpanStats:
+    """Rolling durations and counters of spans with the same name."""
+
+    def __init__(self, window: int = SPAN_WINDOW) -> None:  # noqa: D107
+        self.durations: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.blocked = 0
+        self.warned_at: float | None = None
+
+    def add(self, duration: float) -> None:
+        """Add duration (s) of a finished span."""
+        self.durations.append(duration)
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def percentile(self, q: float) -> float | None:
+        """Return nearest-rank percentile (s) of the rolling window."""
+        if not self.durations:
+            return None
+        durations = sorted(self.durations)
+        rank = max(round(q / 100 * len(durations)), 1)
+        return durations[rank - 1]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return statistics in ms, in serializable format."""
+        stats: dict[str, Any] = {
+            "count": self.count,
+            "mean_ms": _ms(self.total / self.count if self.count else None),
+            "max_ms": _ms(self.max),
+            "blocked": self.blocked,
+        }
+        for q in PERCENTILES:
+            stats[f"p{q}_ms"] = _ms(self.percentile(q))
+        return stats
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class Tracer:
+    """
+    Named timing spans around stages of entity updates of one config entry.
+
+    Spans are cheap, they only keep a rolling window of durations per name.
+    Synchronous spans run on the event loop, so one that takes longer than
+    the threshold held the loop and is reported. Spans around awaited work
+    (network, executor) only measure it.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        window: int = SPAN_WINDOW,
+        blocking_threshold: float = BLOCKING_THRESHOLD,
+    ) -> None:
+        self._window = window
+        self._blocking_threshold = blocking_threshold
+        self._spans: dict[str, SpanStats] = {}
+
+    @contextmanager
+    def span(self, name: str, blocking: bool = True) -> Iterator[None]:
+        """Time stage, spans that raise are timed too."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, blocking)
+
+    def record(self, name: str, duration: float, blocking: bool = True) -> None:
+        """Add duration (s) of a stage that was timed elsewhere."""
+        if (stats := self._spans.get(name)) is None:
+            stats = self._spans[name] = SpanStats(self._window)
+        stats.add(duration)
+
+        if not blocking or duration <= self._blocking_threshold:
+            return
+        stats.blocked += 1
+        now = time.monotonic()
+        if stats.warned_at is None or now - stats.warned_at >= WARNING_INTERVAL:
+            stats.warned_at = now
+            _LOGGER.warning(
+                "%s held the event loop for %.0f ms (%s times over %.0f ms so far)",
+                name,
+                duration * 1000,
+                stats.blocked,
+                self._blocking_threshold * 1000,
+            )
+
+    def stats(self, name: str) -> SpanStats | None:
+        """Return statistics of spans with name, None if there were none."""
+        return self._spans.get(name)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return statistics of all spans in serializable format."""
+        return {
+            "blocking_threshold_ms": _ms(self._blocking_threshold),
+            "spans": {
+                name: stats.as_dict() for name, stats in sorted(self._spans.items())
+            },
+        }
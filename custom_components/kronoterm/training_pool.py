@@ -0,0 +1,94 @@
+"""Shared pool that runs CPU-heavy training of predictors."""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, TRAINING_POOL
+
+_LOGGER = logging.getLogger(__name__)
+
+TRAINING_WORKERS = 2
+
+
+class TrainingPool:
+    """
+    Runs training jobs in executor, at most `workers` of them at a time.
+
+    Jobs wait in one FIFO queue with at most one job per key (consumer). A new
+    job of a key that is still queued replaces the queued one and keeps its
+    place, so a consumer that refits often can't starve the others and stale
+    refits are never run.
+    """
+
+    def __init__(self, hass: HomeAssistant, workers: int = TRAINING_WORKERS) -> None:  # noqa: D107
+        self._hass = hass
+        self._workers = workers
+        self._running = 0
+        self._queue: OrderedDict[
+            str, tuple[Callable[[], Any], list[asyncio.Future[Any]]]
+        ] = OrderedDict()
+        self.completed = 0
+        self.replaced = 0
+
+    async def async_run(self, key: str, job: Callable[[], Any]) -> Any:
+        """Queue job of key and return its result (or result of a newer one)."""
+        future: asyncio.Future[Any] = self._hass.loop.create_future()
+        if key in self._queue:
+            _, futures = self._queue[key]
+            self._queue[key] = (job, [*futures, future])
+            self.replaced += 1
+        else:
+            self._queue[key] = (job, [future])
+        self._start()
+        return await future
+
+    def _start(self) -> None:
+        while self._running < self._workers and self._queue:
+            key, (job, futures) = self._queue.popitem(last=False)
+            self._running += 1
+            self._hass.async_create_background_task(
+                self._run(job, futures), f"{DOMAIN} training {key}"
+            )
+
+    async def _run(
+        self, job: Callable[[], Any], futures: list[asyncio.Future[Any]]
+    ) -> None:
+        try:
+            result = await self._hass.async_add_executor_job(job)
+        except Exception as err:
+            _LOGGER.warning("Training failed: %s", err)
+            for future in futures:
+                if not future.done():
+                    future.set_exception(err)
+        else:
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._running -= 1
+            self.completed += 1
+            self._start()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return state of pool in serializable format."""
+        return {
+            "workers": self._workers,
+            "running": self._running,
+            "queued": list(self._queue),
+            "completed": self.completed,
+            "replaced": self.replaced,
+        }
+
+
+def get_training_pool(hass: HomeAssistant) -> TrainingPool:
+    """Return training pool shared by all config entries."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if TRAINING_POOL not in domain_data:
+        domain_data[TRAINING_POOL] = TrainingPool(hass)
+    pool: TrainingPool = domain_data[TRAINING_POOL]
+    return pool
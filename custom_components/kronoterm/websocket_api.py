@@ -0,0 +1,120 @@
+"""WebSocket API of the integration."""
+
+from typing import Any
+
+import voluptuous as vol  # type: ignore
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+import homeassistant.util.dt as dt_util
+
+from .const import CONFIG_ENTRY_ID
+from .forecast_store import FORECAST_KINDS
+from .history_compare import DEFAULT_POINTS, async_compare
+from .services import get_forecast_store
+
+
+async def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register WebSocket commands of the integration."""
+    websocket_api.async_register_command(hass, websocket_subscribe_forecast)
+    websocket_api.async_register_command(hass, websocket_compare_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "kronoterm/forecast/subscribe",
+        vol.Optional(CONFIG_ENTRY_ID): str,
+    }
+)
+@callback
+def websocket_subscribe_forecast(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Subscribe to forecasts.
+
+    All forecasts are sent once, afterwards only changed and appended slots
+    of the forecast that changed. Clients whose version of the forecast does
+    not match `base_version` of the change should subscribe again. When the
+    config entry is unloaded, e.g. reloaded after options change, `closed` is
+    sent and clients should subscribe again once the entry is loaded.
+    """
+    try:
+        store = get_forecast_store(hass, msg.get(CONFIG_ENTRY_ID))
+    except ServiceValidationError as err:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(err))
+        return
+
+    @callback
+    def forecast_changed(kind: str) -> None:
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"], {"type": "delta", "kind": kind, **store.delta(kind)}
+            )
+        )
+
+    @callback
+    def store_closed() -> None:
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"type": "closed"})
+        )
+
+    remove_listener = store.add_listener(forecast_changed)
+    remove_close_listener = store.add_close_listener(store_closed)
+
+    @callback
+    def unsubscribe() -> None:
+        remove_listener()
+        remove_close_listener()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(
+            msg["id"],
+            {
+                "type": "snapshot",
+                "forecasts": {kind: store.snapshot(kind) for kind in FORECAST_KINDS},
+            },
+        )
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "kronoterm/history/compare",
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Required("ranges"): vol.All(
+            [vol.ExactSequence([cv.datetime, cv.datetime])], vol.Length(min=1, max=2)
+        ),
+        vol.Optional("points", default=DEFAULT_POINTS): vol.All(
+            vol.Coerce(int), vol.Range(min=3, max=5000)
+        ),
+    }
+)
+@websocket_api.async_response
+async def websocket_compare_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Return history of entity in ranges, downsampled to at most `points` each.
+
+    Every range is returned as minutes since its start (`x`) and change of
+    the value since the first one (`y`), read from statistics if possible.
+    """
+    ranges = [
+        (dt_util.as_utc(start), dt_util.as_utc(end)) for start, end in msg["ranges"]
+    ]
+    if any(start >= end for start, end in ranges):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_INVALID_FORMAT, "Range must end after start"
+        )
+        return
+
+    series = await async_compare(hass, msg["entity_id"], ranges, msg["points"])
+    connection.send_result(msg["id"], {"ranges": series})
@@ -1,9 +1,26 @@
 """Fixtures for testing."""
 
+from collections.abc import AsyncGenerator
 from typing import Any
+from unittest.mock import AsyncMock, MagicMock, PropertyMock
+
+from homeassistant.components.recorder.const import DOMAIN as R_DOMAIN
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.core import HomeAssistant
 import pytest
 import pytest_socket  # type: ignore
 
+from custom_components.kronoterm.energy_api import ENTSOE, NordPool, EnergyCharts
+
+from .mock_price_server import (
+    ENERGY_CHARTS_PATH,
+    ENTSOE_PATH,
+    NORD_POOL_PATH,
+    MockPriceServer,
+)
+
+BENCHMARK_RESULTS = pytest.StashKey[list[dict[str, Any]]]()
+
 
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations: Any) -> None:
@@ -16,3 +33,61 @@ def allow_network() -> None:  # noqa: D103
     pytest_socket.socket_allow_hosts(["*"], True)
     pytest_socket.enable_socket()
     pytest_socket._remove_restrictions()
+
+
+@pytest.fixture
+def setup_recorder(hass: HomeAssistant) -> None:
+    """Set Recorder."""
+
+    _internal_store: dict[Any, Any] = {}
+    hass.data[R_DOMAIN] = MagicMock()
+    hass.data[R_DOMAIN].__getitem__.side_effect = _internal_store.__getitem__
+    hass.data[R_DOMAIN].__setitem__.side_effect = _internal_store.__setitem__
+    hass.data[R_DOMAIN].__delitem__.side_effect = _internal_store.__delitem__
+    hass.data[R_DOMAIN].db_connected = PropertyMock(return_value=False)
+
+    hass.data[DATA_INSTANCE] = AsyncMock()
+    hass.data[DATA_INSTANCE].async_add_executor_job = AsyncMock()
+    hass.data[DATA_INSTANCE].async_add_executor_job.return_value = []
+
+
+@pytest.fixture
+async def mock_price_server(
+    monkeypatch: pytest.MonkeyPatch,
+) -> AsyncGenerator[MockPriceServer]:
+    """Start local price server and point providers to it."""
+    server = MockPriceServer()
+    await server.start()
+
+    monkeypatch.setenv("ENTSOE_API_KEY", "mock")
+    monkeypatch.setattr(NordPool, "base_url", server.url(NORD_POOL_PATH))
+    monkeypatch.setattr(ENTSOE, "base_url", server.url(ENTSOE_PATH))
+    monkeypatch.setattr(EnergyCharts, "base_url", server.url(ENERGY_CHARTS_PATH))
+
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+def benchmark_report(request: pytest.FixtureRequest) -> list[dict[str, Any]]:
+    """Collect benchmark results that are reported at the end of the session."""
+    return request.config.stash.setdefault(BENCHMARK_RESULTS, [])
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    """Report collected benchmark results."""
+    results = config.stash.get(BENCHMARK_RESULTS, [])
+    if not results:
+        return
+
+    # benchmarks report different columns, all of them are shown
+    columns = list(dict.fromkeys(c for result in results for c in result))
+    widths = {
+        c: max(len(c), *(len(str(r.get(c, ""))) for r in results)) for c in columns
+    }
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line("  ".join(c.ljust(widths[c]) for c in columns))
+    for result in results:
+        terminalreporter.write_line(
+            "  ".join(str(result.get(c, "")).ljust(widths[c]) for c in columns)
+        )
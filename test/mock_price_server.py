@@ -0,0 +1,178 @@
+"""Local stand-in for energy price APIs that replays recorded responses."""
+
+import asyncio
+import json
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta, UTC
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+NORD_POOL_PATH = "/nordpool"
+ENTSOE_PATH = "/entsoe"
+ENERGY_CHARTS_PATH = "/energy-charts"
+
+
+class MockPriceServer:
+    """
+    HTTP server replaying recorded NordPool, ENTSO-E and Energy-Charts responses.
+
+    Recorded days are shifted to whatever day is requested, so any date can be
+    served. Behaviour can be changed between requests:
+
+    - `latency`: seconds to wait before every response
+    - `fail_requests`: number of next requests answered with `fail_status`
+    - `published_hours`: only this many hours of the day are returned (partial day)
+    - `published_until`: later days aren't published yet
+    """
+
+    def __init__(self) -> None:  # noqa: D107
+        self.latency: float = 0.0
+        self.fail_requests: int = 0
+        self.fail_status: int = 503
+        self.published_hours: int | None = None
+        self.published_until: date | None = None
+
+        self.requests: Counter[str] = Counter()
+        self.bytes_sent: int = 0
+
+        self._nord_pool: dict[str, Any] = json.loads(
+            (FIXTURES / "nordpool_day_ahead.json").read_text()
+        )
+        self._entsoe: str = (FIXTURES / "entsoe_a44.xml").read_text()
+        self._energy_charts: dict[str, Any] = json.loads(
+            (FIXTURES / "energy_charts_price.json").read_text()
+        )
+
+        app = web.Application()
+        app.router.add_get(NORD_POOL_PATH, self._handle_nord_pool)
+        app.router.add_get(ENTSOE_PATH, self._handle_entsoe)
+        app.router.add_get(ENERGY_CHARTS_PATH, self._handle_energy_charts)
+        self._server = TestServer(app, host="127.0.0.1")
+
+    async def start(self) -> None:
+        """Start listening on a free local port."""
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server."""
+        await self._server.close()
+
+    def url(self, path: str) -> str:
+        """Return absolute URL of the path on this server."""
+        return str(self._server.make_url(path))
+
+    @property
+    def total_requests(self) -> int:
+        """Return number of requests served on all paths."""
+        return sum(self.requests.values())
+
+    def reset(self) -> None:
+        """Reset counters and behaviour to defaults."""
+        self.latency = 0.0
+        self.fail_requests = 0
+        self.fail_status = 503
+        self.published_hours = None
+        self.published_until = None
+        self.requests.clear()
+        self.bytes_sent = 0
+
+    async def _before_response(self, request: web.Request) -> web.Response | None:
+        """Count request, apply latency and injected errors."""
+        self.requests[request.path] += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if self.fail_requests > 0:
+            self.fail_requests -= 1
+            return web.Response(status=self.fail_status)
+        return None
+
+    def _respond(self, body: str, content_type: str) -> web.Response:
+        self.bytes_sent += len(body)
+        return web.Response(text=body, content_type=content_type)
+
+    def _slots(self, slots_per_hour: int, total: int, day: date) -> int:
+        if self.published_until is not None and day > self.published_until:
+            return 0
+        if self.published_hours is None:
+            return total
+        return min(total, self.published_hours * slots_per_hour)
+
+    async def _handle_nord_pool(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        day = date.fromisoformat(request.query["date"])
+        area = request.query["indexNames"]
+        if self._slots(4, 1, day) == 0:
+            # NordPool answers with no content until the day is published
+            return web.Response(status=204)
+
+        # CET day starts at 22:00 or 23:00 UTC, recorded day is in CEST
+        start = datetime(day.year, day.month, day.day, tzinfo=UTC) - timedelta(hours=2)
+        recorded = self._nord_pool["multiIndexEntries"]
+        entries = []
+        for i, entry in enumerate(recorded[: self._slots(4, len(recorded), day)]):
+            slot = start + timedelta(minutes=15 * i)
+            entries.append(
+                {
+                    "deliveryStart": slot.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "deliveryEnd": (slot + timedelta(minutes=15)).strftime(
+                        "%Y-%m-%dT%H:%M:%SZ"
+                    ),
+                    "entryPerArea": {area: next(iter(entry["entryPerArea"].values()))},
+                }
+            )
+
+        data = {
+            **self._nord_pool,
+            "deliveryDateCET": day.isoformat(),
+            "market": request.query["market"],
+            "indexNames": [area],
+            "currency": request.query["currency"],
+            "areaStates": [{"state": "Final", "areas": [area]}],
+            "multiIndexEntries": entries,
+        }
+        return self._respond(json.dumps(data), "application/json")
+
+    async def _handle_entsoe(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        day = datetime.strptime(request.query["periodStart"], "%Y%m%d%H%M").date()
+        start = datetime(day.year, day.month, day.day) - timedelta(hours=2)
+        end = start + timedelta(days=1)
+
+        body = re.sub(
+            r"<start>[^<]*</start>",
+            f"<start>{start:%Y-%m-%dT%H:%MZ}</start>",
+            self._entsoe,
+        )
+        body = re.sub(r"<end>[^<]*</end>", f"<end>{end:%Y-%m-%dT%H:%MZ}</end>", body)
+
+        points = re.findall(r"\s*<Point>.*?</Point>", body, flags=re.DOTALL)
+        for point in points[self._slots(1, len(points), day) :]:
+            body = body.replace(point, "", 1)
+
+        return self._respond(body, "text/xml")
+
+    async def _handle_energy_charts(self, request: web.Request) -> web.Response:
+        if (error := await self._before_response(request)) is not None:
+            return error
+
+        day = date.fromisoformat(request.query["start"][:10])
+        start = int(datetime(day.year, day.month, day.day, tzinfo=UTC).timestamp())
+        prices = self._energy_charts["price"]
+        count = self._slots(1, len(prices), day)
+
+        data = {
+            **self._energy_charts,
+            "unix_seconds": [start + 3600 * i for i in range(count)],
+            "price": prices[:count],
+        }
+        return self._respond(json.dumps(data), "application/json")
@@ -0,0 +1,273 @@
+"""End-to-end simulation of the integration under an accelerated clock."""
+
+import asyncio
+import json
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, cast
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.db_schema import (
+    StateAttributes,
+    States,
+    StatesMeta,
+    StatisticsShortTerm,
+)
+from homeassistant.components.recorder.tasks import RecorderTask
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import RANDOM_MICROSECOND_MAX
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore
+from pytest_homeassistant_custom_component.components.recorder.common import (  # type: ignore
+    async_wait_recording_done,
+)
+from sqlalchemy import distinct, func, select
+from sqlalchemy.orm import Session
+
+from custom_components.kronoterm.const import (
+    BLACK_HOLE_SENSOR,
+    DOMAIN,
+    SELECT_PROVIDER,
+    SELECTED_CONSUMER,
+)
+
+from .mock_price_server import MockPriceServer
+
+EVENT = "homeassistant.helpers.event"
+PROVIDER = "Deutschland (NordPool)"
+# time listeners of the integration fire at most once per minute
+STEP = timedelta(minutes=1)
+OFFSET = timedelta(microseconds=RANDOM_MICROSECOND_MAX)
+# asyncio reports callbacks that take longer as slow
+SLOW_STEP = 0.1  # s
+
+
+@dataclass
+class SimulationReport:
+    """Cost of running the integration for the simulated time."""
+
+    days: float = 0.0
+    wall_time: float = 0.0  # s
+    loop_time: float = 0.0  # s of CPU on the event loop
+    max_step: float = 0.0  # s
+    slow_steps: int = 0
+    steps: int = 0
+    # traced memory (bytes) at the end of every simulated hour
+    memory: list[int] = field(default_factory=list)
+    # recorded rows, bytes and keys of distinct attributes by entity
+    state_rows: dict[str, int] = field(default_factory=dict)
+    attribute_bytes: dict[str, int] = field(default_factory=dict)
+    attribute_keys: dict[str, set[str]] = field(default_factory=dict)
+    statistics_rows: int = 0
+    provider_requests: int = 0
+
+    @property
+    def memory_growth(self) -> int:
+        """Return memory growth (bytes) after the first hour."""
+        if len(self.memory) < 2:
+            return 0
+        return self.memory[-1] - self.memory[0]
+
+    def as_rows(self) -> list[dict[str, Any]]:
+        """Return report as rows of the benchmark report."""
+        per_day = self.days or 1
+        rows: list[dict[str, Any]] = [
+            {
+                "benchmark": "simulation",
+                "workload": f"{self.days:g}d",
+                "ms": f"{self.wall_time * 1000:.0f}",
+                "loop ms/day": f"{self.loop_time * 1000 / per_day:.0f}",
+                "max step ms": f"{self.max_step * 1000:.1f}",
+                "slow steps": self.slow_steps,
+                "memory growth": self.memory_growth,
+                "requests": self.provider_requests,
+                "statistics rows": self.statistics_rows,
+            }
+        ]
+        rows.extend(
+            {
+                "benchmark": "simulation/recorder",
+                "workload": entity_id,
+                "rows/day": f"{rows / per_day:.0f}",
+                "bytes": self.attribute_bytes.get(entity_id, 0),
+            }
+            for entity_id, rows in sorted(self.state_rows.items())
+        )
+        return rows
+
+
+@contextmanager
+def frozen_time_trackers(
+    freezer: FrozenDateTimeFactory, start: datetime
+) -> Iterator[None]:
+    """
+    Freeze clock at start and make time trackers read the frozen clock.
+
+    Trackers read time through their own references to the real clock, so
+    without this they'd fire once and then schedule themselves in real time.
+    Loop clock follows the frozen one, so due timers then run on their own.
+    It has to be entered before recorder and Home Assistant are set up.
+    """
+    # time listeners are spread over the first half second
+    freezer.move_to(start + OFFSET)
+    with (
+        patch(f"{EVENT}.time_tracker_utcnow", lambda: dt_util.utcnow()),
+        patch(f"{EVENT}.time_tracker_timestamp", lambda: time.time()),
+    ):
+        yield
+
+
+def _wall_time() -> float:
+    """Return real monotonic time (s), clocks of time module are frozen."""
+    return time.clock_gettime(time.CLOCK_MONOTONIC)
+
+
+class Simulation:
+    """
+    Runs the full entity set under a frozen clock that is moved in steps.
+
+    Every step moves the clock, lets due timers run and waits for the loop to
+    settle, so weeks of uptime pass in minutes. It has to run inside of
+    `frozen_time_trackers`. Event loop CPU time is measured per step and
+    traced memory per simulated hour.
+    """
+
+    def __init__(  # noqa: D107
+        self,
+        hass: HomeAssistant,
+        freezer: FrozenDateTimeFactory,
+        server: MockPriceServer,
+    ) -> None:
+        self.hass = hass
+        self.freezer = freezer
+        self.server = server
+        self.report = SimulationReport()
+
+    async def async_setup(self) -> None:
+        """Set up the integration with black hole sensor as consumer."""
+        # debug mode captures a stack for every callback, which is most of
+        # the time of a long simulation
+        self.hass.loop.set_debug(False)
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            unique_id="_",
+            data={
+                SELECT_PROVIDER: PROVIDER,
+                SELECTED_CONSUMER: f"sensor.{BLACK_HOLE_SENSOR}",
+            },
+        )
+        entry.add_to_hass(self.hass)
+        assert await self.hass.config_entries.async_setup(entry.entry_id)
+        await self.hass.async_block_till_done()
+
+    async def async_run(self, days: float, step: timedelta = STEP) -> SimulationReport:
+        """Run simulation for days and return its report."""
+        report = self.report
+        steps_per_hour = int(timedelta(hours=1) / step)
+        steps = int(days * 24 * steps_per_hour)
+
+        tracemalloc.start()
+        begin = _wall_time()
+        try:
+            for i in range(1, steps + 1):
+                loop_begin = time.thread_time()
+                self.freezer.tick(step)
+                # loop clock is frozen too, due timers run on the next iteration
+                await asyncio.sleep(0)
+                await self.hass.async_block_till_done()
+                duration = time.thread_time() - loop_begin
+
+                report.loop_time += duration
+                report.max_step = max(report.max_step, duration)
+                report.slow_steps += duration > SLOW_STEP
+                if i % steps_per_hour == 0:
+                    report.memory.append(tracemalloc.get_traced_memory()[0])
+        finally:
+            tracemalloc.stop()
+
+        report.wall_time += _wall_time() - begin
+        report.steps += steps
+        report.days += days
+        report.provider_requests = self.server.total_requests
+
+        await async_wait_recording_done(self.hass)
+        await self._async_run_on_recorder(self._query_recorder)
+        return report
+
+    async def _async_run_on_recorder(self, job: Callable[[], None]) -> None:
+        """
+        Run job in the recorder thread, after pending events are committed.
+
+        Commits only happen every few seconds of the frozen clock, so a state
+        written after the last step (e.g. by a finished refit) would hold the
+        connection of the in-memory database and block other threads.
+        """
+        done = self.hass.loop.create_future()
+        get_instance(self.hass).queue_task(_RecorderJob(job, self.hass, done))
+        await done
+
+    def _query_recorder(self) -> None:
+        """Count recorded states and statistics."""
+        # typed as the undecorated generator of the recorder helper
+        scope = cast(
+            AbstractContextManager[Session],
+            session_scope(hass=self.hass, read_only=True),
+        )
+        with scope as session:
+            self.report.state_rows = {
+                entity_id: count
+                for entity_id, count in session.execute(
+                    select(StatesMeta.entity_id, func.count(States.state_id))
+                    .join(States, States.metadata_id == StatesMeta.metadata_id)
+                    .group_by(StatesMeta.entity_id)
+                )
+                if entity_id is not None
+            }
+            attributes = (
+                select(
+                    distinct(States.attributes_id).label("attributes_id"),
+                    StatesMeta.entity_id,
+                )
+                .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+                .subquery()
+            )
+            for entity_id, shared_attrs in session.execute(
+                select(attributes.c.entity_id, StateAttributes.shared_attrs).join(
+                    StateAttributes,
+                    StateAttributes.attributes_id == attributes.c.attributes_id,
+                )
+            ):
+                self.report.attribute_bytes[entity_id] = (
+                    self.report.attribute_bytes.get(entity_id, 0) + len(shared_attrs)
+                )
+                self.report.attribute_keys.setdefault(entity_id, set()).update(
+                    json.loads(shared_attrs)
+                )
+            self.report.statistics_rows = session.execute(
+                select(func.count(StatisticsShortTerm.id))
+            ).scalar_one()
+
+
+@dataclass(slots=True)
+class _RecorderJob(RecorderTask):
+    """Job of the simulation queued to the recorder thread."""
+
+    job: Callable[[], None]
+    hass: HomeAssistant
+    done: asyncio.Future[None]
+
+    def run(self, instance: Recorder) -> None:
+        """Run job and resolve the future on the event loop."""
+        try:
+            self.job()
+        except Exception as err:  # noqa: BLE001
+            self.hass.loop.call_soon_threadsafe(self.done.set_exception, err)
+        else:
+            self.hass.loop.call_soon_threadsafe(self.done.set_result, None)
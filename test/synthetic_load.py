@@ -0,0 +1,57 @@
+"""Synthetic consumption history derived from the black hole sensor model."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from custom_components.kronoterm.dummy_consumer_sensor import daily_load
+
+
+def synthetic_load(
+    start: datetime,
+    days: float,
+    interval: int = 15,
+    noise: float = 0.05,
+    seasonality: float = 0.3,
+    outages: float = 0.0,
+    outage_slots: int = 8,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return timestamps (s) and consumption (W) every interval (min) from start.
+
+    Daily shape comes from the black hole sensor. It's scaled by `seasonality`
+    (more consumption in winter, peak in mid January) and multiplied by
+    relative gaussian `noise`. Roughly `outages` of all samples are NaN, in
+    outages of `outage_slots` samples. Result is the same for the same seed.
+    """
+    rng = np.random.default_rng(seed)
+    count = int(days * 24 * 60 / interval)
+    times = start.timestamp() + np.arange(count) * interval * 60.0
+
+    minute_of_day = (times // 60) % (24 * 60)
+    day_of_year = (times / 86400) % 365.25
+    season = 1 + seasonality * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)
+    values = daily_load(minute_of_day) * season
+    values *= 1 + noise * rng.standard_normal(count)
+    values = np.clip(values, 0, None)
+
+    if outages > 0:
+        outage_count = int(count * outages / outage_slots)
+        outage_starts = rng.integers(0, max(count - outage_slots, 1), outage_count)
+        for outage_start in outage_starts.tolist():
+            values[outage_start : outage_start + outage_slots] = np.nan
+
+    return times, values
+
+
+def synthetic_history(
+    start: datetime, days: float, outages: float = 0.0, seed: int = 0
+) -> list[tuple[datetime, float]]:
+    """Return synthetic slot averages as predictor history, without outages."""
+    times, values = synthetic_load(start, days, outages=outages, seed=seed)
+    known = ~np.isnan(values)
+    return [
+        (start + timedelta(seconds=t - start.timestamp()), v)
+        for t, v in zip(times[known].tolist(), values[known].tolist(), strict=True)
+    ]
@@ -0,0 +1,93 @@
+"""Tests for cost backfill."""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from homeassistant.core import HomeAssistant, State
+from pytest import approx
+
+from custom_components.kronoterm.backfill import (
+    BACKFILL_COST_STATISTIC,
+    async_backfill,
+    slot_costs,
+)
+from custom_components.kronoterm.energy_api import GENI
+
+START = datetime(2025, 5, 13, 10, 0, tzinfo=UTC)
+ENTITY_ID = "sensor.heat_pump_power"
+
+
+def test_slot_costs() -> None:
+    """Tests energy of slots with power changing inside of a slot."""
+    times = np.array([0.0, 450.0, 900.0])
+    power = np.array([1000.0, 3000.0, np.nan])
+    edges = np.array([0.0, 900.0, 1800.0])
+    prices = np.array([0.1, np.nan])
+
+    energy, cost = slot_costs(times, power, edges, prices)
+
+    assert energy.tolist() == approx([0.5, 0.0])
+    assert cost.tolist() == approx([0.05, 0.0])
+
+    energy, cost = slot_costs(np.array([]), np.array([]), edges, prices)
+    assert energy.tolist() == [0.0, 0.0]
+
+
+@pytest.mark.asyncio
+@patch("custom_components.kronoterm.backfill.async_add_external_statistics")
+@patch("custom_components.kronoterm.backfill.get_instance")
+@patch("custom_components.kronoterm.backfill.history.get_significant_states")
+async def test_backfill(
+    mock_history: MagicMock,
+    mock_instance: MagicMock,
+    mock_statistics: MagicMock,
+    hass: HomeAssistant,
+) -> None:
+    """Tests history is processed in chunks and written as hourly statistics."""
+    mock_instance.return_value.async_add_executor_job = hass.async_add_executor_job
+    requested: list[tuple[datetime, datetime]] = []
+
+    def history(
+        hass: HomeAssistant, start: datetime, end: datetime, *args: Any, **kwargs: Any
+    ) -> dict[str, list[State]]:
+        requested.append((start, end))
+        # 2 kW all the time, state of the previous chunk is the start state
+        state = State(ENTITY_ID, "2", last_changed=start - timedelta(hours=1))
+        return {ENTITY_ID: [state]}
+
+    mock_history.side_effect = history
+    provider = GENI((await GENI.providers())[0])
+
+    with patch(
+        "custom_components.kronoterm.backfill.BACKFILL_CHUNK", timedelta(hours=2)
+    ):
+        result = await async_backfill(
+            hass,
+            provider,
+            ENTITY_ID,
+            1000,
+            START,
+            START + timedelta(hours=3, minutes=30),
+        )
+
+    assert requested == [
+        (START, START + timedelta(hours=2)),
+        (START + timedelta(hours=2), START + timedelta(hours=3)),
+    ]
+    assert result.hours == 3
+    assert result.energy == approx(6.0)
+    price = await provider.price(START)
+    assert price is not None
+    assert result.cost == approx(6.0 * price)
+    assert result.missing_prices == 0
+
+    cost = [
+        call.args[2]
+        for call in mock_statistics.call_args_list
+        if call.args[1]["statistic_id"] == BACKFILL_COST_STATISTIC
+    ]
+    assert [len(statistics) for statistics in cost] == [2, 1]
+    assert cost[1][0]["sum"] == approx(result.cost)
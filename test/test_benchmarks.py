@@ -0,0 +1,181 @@
+"""
+Benchmark predictor and cost pipeline on synthetic load.
+
+Durations are compared with baselines in `fixtures/benchmark_baselines.json`
+and fail when they're several times slower. Baselines depend on the machine,
+so benchmarks only run with `-m benchmark`. Run them with
+`KRONOTERM_UPDATE_BASELINES=1` to record new baselines on this machine.
+"""
+
+import json
+import os
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import numpy as np
+import pytest
+
+from custom_components.kronoterm.energy_api import NordPool
+from custom_components.kronoterm.forecast_cost import cumulative_cost
+from custom_components.kronoterm.predictor import Predictor, _horizon_features
+
+from .mock_price_server import FIXTURES, MockPriceServer
+from .synthetic_load import synthetic_history, synthetic_load
+
+START = datetime(2025, 1, 6, 0, 0, tzinfo=UTC)
+BASELINES = FIXTURES / "benchmark_baselines.json"
+UPDATE_BASELINES = os.environ.get("KRONOTERM_UPDATE_BASELINES") == "1"
+# timing varies between runs and machines, only large regressions fail
+REGRESSION_FACTOR = 3
+SLACK_MS = 5.0
+
+
+@pytest.fixture(scope="module")
+def baselines() -> dict[str, float]:
+    """Return stored baselines (ms) by benchmark and workload."""
+    if not BASELINES.exists():
+        return {}
+    baselines: dict[str, float] = json.loads(BASELINES.read_text())
+    return baselines
+
+
+def best_of(function: Callable[[], Any], repeat: int = 3) -> float:
+    """Return the shortest duration (ms) of repeated calls."""
+    durations = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - begin)
+    return min(durations) * 1000
+
+
+async def async_best_of(
+    function: Callable[[], Awaitable[Any]], repeat: int = 3
+) -> float:
+    """Return the shortest duration (ms) of repeated awaited calls."""
+    durations = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        await function()
+        durations.append(time.perf_counter() - begin)
+    return min(durations) * 1000
+
+
+def check(
+    report: list[dict[str, Any]],
+    baselines: dict[str, float],
+    benchmark: str,
+    workload: str,
+    duration: float,
+) -> None:
+    """Report duration and compare it with the baseline."""
+    key = f"{benchmark}/{workload}"
+    baseline = baselines.get(key)
+    report.append(
+        {
+            "benchmark": benchmark,
+            "workload": workload,
+            "ms": f"{duration:.1f}",
+            "baseline": baseline if baseline is not None else "",
+        }
+    )
+
+    if UPDATE_BASELINES:
+        baselines[key] = round(duration, 1)
+        BASELINES.write_text(json.dumps(baselines, indent=4, sort_keys=True) + "\n")
+    elif baseline is not None:
+        assert duration <= baseline * REGRESSION_FACTOR + SLACK_MS, key
+
+
+def test_synthetic_load() -> None:
+    """Test synthetic load follows the model and has requested outages."""
+    times, values = synthetic_load(START, 365, noise=0, outages=0.1)
+    assert len(times) == 365 * 96
+    assert times[1] - times[0] == 15 * 60
+    assert 0.05 < np.isnan(values).mean() <= 0.1
+
+    # winter night peak is higher than the summer one
+    _, clean = synthetic_load(START, 365, noise=0)
+    assert clean[8] > clean[8 + 96 * 182]
+    assert np.array_equal(synthetic_load(START, 7)[1], synthetic_load(START, 7)[1])
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("weeks", [1, 52])
+def test_benchmark_features(
+    benchmark_report: list[dict[str, Any]], baselines: dict[str, float], weeks: int
+) -> None:
+    """Benchmark feature extraction of history."""
+    dts = [dt for dt, _ in synthetic_history(START, weeks * 7)]
+    duration = best_of(lambda: Predictor.features(dts))
+    check(benchmark_report, baselines, "predictor/features", f"{weeks}w", duration)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("weeks", [1, 4, 12])
+def test_benchmark_fit(
+    benchmark_report: list[dict[str, Any]], baselines: dict[str, float], weeks: int
+) -> None:
+    """Benchmark training of predictor on history with outages."""
+    history = synthetic_history(START, weeks * 7, outages=0.05)
+    duration = best_of(lambda: Predictor.new(history), repeat=1)
+    check(benchmark_report, baselines, "predictor/fit", f"{weeks}w", duration)
+
+
+@pytest.mark.benchmark
+def test_benchmark_forecast(
+    benchmark_report: list[dict[str, Any]], baselines: dict[str, float]
+) -> None:
+    """Benchmark forecasts at every slot change of a day."""
+    predictor = Predictor.new(synthetic_history(START, 7))
+    end = START + timedelta(days=7)
+    slots = [end + timedelta(minutes=15 * i) for i in range(96)]
+
+    def forecast_day() -> None:
+        _horizon_features.cache_clear()
+        for slot in slots:
+            predictor.forecast(slot)
+
+    duration = best_of(forecast_day)
+    check(benchmark_report, baselines, "predictor/forecast", "96 slots", duration)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("days", [1, 7, 30])
+async def test_benchmark_prices_between(
+    mock_price_server: MockPriceServer,
+    benchmark_report: list[dict[str, Any]],
+    baselines: dict[str, float],
+    days: int,
+) -> None:
+    """Benchmark range query of prices, once fetched and from cache."""
+    api = NordPool("Deutschland (NordPool)")
+    end = START + timedelta(days=days)
+
+    cold = await async_best_of(lambda: api.prices_between(START, end), repeat=1)
+    warm = await async_best_of(lambda: api.prices_between(START, end))
+    check(benchmark_report, baselines, "provider/prices_between", f"{days}d", cold)
+    check(benchmark_report, baselines, "provider/prices_between", f"{days}d warm", warm)
+    assert len(await api.prices_between(START, end)) == days * 96
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("slots", [32, 192, 2880])
+def test_benchmark_cumulative_cost(
+    benchmark_report: list[dict[str, Any]], baselines: dict[str, float], slots: int
+) -> None:
+    """Benchmark forecast cost of hourly prices and 15 minute consumption."""
+    times, values = synthetic_load(START, slots / 96, outages=0.05)
+    consumption: list[tuple[datetime, float | None]] = [
+        (START + timedelta(seconds=t - times[0]), None if np.isnan(v) else v)
+        for t, v in zip(times.tolist(), values.tolist(), strict=True)
+    ]
+    price: list[tuple[datetime, float | None]] = [
+        (START + timedelta(hours=i), 0.1 + 0.05 * np.sin(i / 4))
+        for i in range(slots // 4 + 1)
+    ]
+
+    duration = best_of(lambda: cumulative_cost(price, consumption))
+    check(benchmark_report, baselines, "cost/cumulative_cost", str(slots), duration)
@@ -0,0 +1,176 @@
+"""Tests for cheapest window search, its sensors and service."""
+
+from datetime import UTC, datetime, timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest import approx
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore
+
+from custom_components.kronoterm.const import (
+    CHEAPEST_WINDOW_SENSOR,
+    DOMAIN,
+    FORECAST_STORE,
+    SELECT_PROVIDER,
+    SELECTED_CONSUMER,
+    SERVICE_FIND_CHEAPEST_WINDOW,
+)
+from custom_components.kronoterm.energy_api import GENI
+from custom_components.kronoterm.forecast_cost import cheapest_windows
+from custom_components.kronoterm.forecast_store import (
+    CONSUMPTION_FORECAST,
+    PRICE_FORECAST,
+    ForecastStore,
+)
+
+AT = datetime(2025, 5, 13, 10, 0, tzinfo=UTC)
+PRICES = [0.3, 0.2, 0.1, 0.1, 0.4, 0.05, 0.5, 0.2]
+PRICE = [(AT + timedelta(minutes=15 * i), p) for i, p in enumerate(PRICES)]
+
+
+pytestmark = pytest.mark.usefixtures("setup_recorder")
+
+
+def test_cheapest_windows() -> None:
+    """Tests windows are cheapest first, don't overlap and end by deadline."""
+    windows = cheapest_windows(PRICE, timedelta(minutes=30), 2.0, count=3)
+
+    assert [w.start for w in windows] == [PRICE[2][0], PRICE[4][0], PRICE[0][0]]
+    assert windows[0].end == PRICE[4][0]
+    assert windows[0].mean_price == approx(0.1)
+    assert windows[0].cost == approx(0.2)
+    assert windows[1].mean_price == approx(0.225)
+    assert windows[0].base_load is None
+
+    deadline = PRICE[2][0] + timedelta(minutes=20)
+    windows = cheapest_windows(PRICE, timedelta(minutes=30), deadline=deadline)
+    assert [w.start for w in windows] == [PRICE[1][0]]
+
+    # windows don't start in a slot that already ended
+    windows = cheapest_windows(PRICE, timedelta(minutes=30), now=PRICE[2][0])
+    assert [w.start for w in windows] == [PRICE[2][0]]
+    windows = cheapest_windows(
+        PRICE, timedelta(minutes=30), now=PRICE[2][0] + timedelta(milliseconds=1)
+    )
+    assert [w.start for w in windows] == [PRICE[2][0]]
+    windows = cheapest_windows(PRICE, timedelta(minutes=30), now=PRICE[3][0])
+    assert [w.start for w in windows] == [PRICE[4][0]]
+
+
+def test_partial_slot_and_unknown_prices() -> None:
+    """Tests the last slot is weighted by time and unknown prices are skipped."""
+    windows = cheapest_windows(PRICE, timedelta(minutes=20), now=PRICE[4][0])
+    # 15 minutes at 0.05 and 5 at 0.5
+    assert windows[0].start == PRICE[5][0]
+    assert windows[0].mean_price == approx((15 * 0.05 + 5 * 0.5) / 20)
+
+    price = [(slot, None if i == 5 else p) for i, (slot, p) in enumerate(PRICE)]
+    windows = cheapest_windows(price, timedelta(minutes=15))
+    assert windows[0].start == PRICE[2][0]
+    assert cheapest_windows(PRICE, timedelta(hours=3)) == []
+    assert cheapest_windows([], timedelta(hours=1)) == []
+
+
+def test_base_load_and_max_power() -> None:
+    """Tests windows over power limit or with unknown base load are skipped."""
+    base = [(slot, 1000.0 if i == 5 else 200.0) for i, (slot, _) in enumerate(PRICE)]
+    windows = cheapest_windows(PRICE, timedelta(minutes=15), 0.5, base_load=base)
+    assert windows[0].start == PRICE[5][0]
+    assert windows[0].base_load == approx(1000)
+
+    # appliance draws 2 kW
+    windows = cheapest_windows(
+        PRICE, timedelta(minutes=15), 0.5, base_load=base, max_power=2500
+    )
+    assert windows[0].start == PRICE[2][0]
+    assert windows[0].base_load == approx(200)
+
+    windows = cheapest_windows(
+        PRICE, timedelta(minutes=15), 0.5, base_load=base[:2], max_power=2500
+    )
+    assert [w.start for w in windows] == [PRICE[1][0]]
+    assert cheapest_windows(PRICE, timedelta(minutes=15), max_power=2500) == []
+
+
+async def test_sensors_and_service(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Tests sensors follow price forecast and service returns windows."""
+    freezer.move_to(AT)
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(f"sensor.{CHEAPEST_WINDOW_SENSOR}_1h")
+    assert state is not None
+    assert state.state != "unknown"
+    assert hass.states.get(f"sensor.{CHEAPEST_WINDOW_SENSOR}_3h") is not None
+
+    store: ForecastStore = hass.data[DOMAIN][config_entry.entry_id][FORECAST_STORE]
+    store.update(PRICE_FORECAST, PRICE)
+    await hass.async_block_till_done()
+    state = hass.states.get(f"sensor.{CHEAPEST_WINDOW_SENSOR}_1h")
+    assert state is not None
+    assert datetime.fromisoformat(state.state) == PRICE[2][0]
+    assert state.attributes["mean_price"] == approx(0.1625)
+
+    # forecast is refreshed just after the window started
+    freezer.move_to(PRICE[2][0] + timedelta(milliseconds=1))
+    store.update(PRICE_FORECAST, PRICE[2:])
+    await hass.async_block_till_done()
+    state = hass.states.get(f"sensor.{CHEAPEST_WINDOW_SENSOR}_1h")
+    assert state is not None
+    assert datetime.fromisoformat(state.state) == PRICE[2][0]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        {"duration": {"minutes": 30}, "energy": 2, "count": 2},
+        blocking=True,
+        return_response=True,
+    )
+    assert response is not None
+    assert [w["start"] for w in response["windows"]] == [
+        PRICE[2][0].isoformat(),
+        PRICE[4][0].isoformat(),
+    ]
+    assert response["windows"][0]["cost"] == approx(0.2)
+
+
+async def test_service_base_load_of_kw_consumer(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Tests consumption forecast of consumer in kW is compared with power in W."""
+    freezer.move_to(AT)
+    hass.states.async_set("sensor.heat_pump", "0.2", {"unit_of_measurement": "kW"})
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="_",
+        data={SELECT_PROVIDER: provider, SELECTED_CONSUMER: "sensor.heat_pump"},
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    store: ForecastStore = hass.data[DOMAIN][config_entry.entry_id][FORECAST_STORE]
+    store.update(PRICE_FORECAST, PRICE)
+    base = [(slot, 1.0 if i == 5 else 0.2) for i, (slot, _) in enumerate(PRICE)]
+    store.update(CONSUMPTION_FORECAST, base)
+
+    # appliance draws 2 kW, which is over the limit only with 1 kW of base load
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        {"duration": {"minutes": 15}, "energy": 0.5, "max_power": 2500},
+        blocking=True,
+        return_response=True,
+    )
+    assert response is not None
+    assert response["windows"][0]["start"] == PRICE[2][0].isoformat()
+    assert response["windows"][0]["base_load"] == approx(200)
@@ -1,14 +1,26 @@
 """Testing Consumer Sensor."""
 
-from unittest.mock import patch, AsyncMock
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from unittest.mock import patch, AsyncMock, MagicMock
 
 import pytest
-from homeassistant.core import HomeAssistant, State
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, State
+from pytest import approx
 from homeassistant.components.recorder.const import DATA_INSTANCE
 
-from custom_components.kronoterm.consumer_sensor import ConsumerSensor
+from custom_components.kronoterm.consumer_sensor import (
+    ConsumerSensor,
+    entity_history_chunks,
+)
 from custom_components.kronoterm.dummy_consumer_sensor import DummyPowerConsumerSensor
 from custom_components.kronoterm.const import BLACK_HOLE_SENSOR
+from custom_components.kronoterm.cost_sensor import CostSensor
+from custom_components.kronoterm.predictor import Predictor
+from custom_components.kronoterm.seasonal_profile import SeasonalProfile
+from custom_components.kronoterm.slot_average import SlotAverager
 
 
 async def setup_consumer(
@@ -38,10 +50,15 @@ async def setup_consumer(
 
     hass.data[DATA_INSTANCE] = AsyncMock()
     hass.data[DATA_INSTANCE].async_add_executor_job = AsyncMock()
-    hass.data[DATA_INSTANCE].async_add_executor_job.return_value = {
-        dummy_sensor.entity_id: []
-    }
-    await consumer.async_added_to_hass(time=False)
+    hass.data[DATA_INSTANCE].async_add_executor_job.return_value = []
+    # hass is mocked here, so training in background never runs
+    with patch.object(
+        hass,
+        "async_create_background_task",
+        side_effect=lambda target, name: target.close(),
+    ) as background_task:
+        await consumer.async_added_to_hass(time=False)
+    background_task.assert_called_once()
 
     hass.states.async_set(
         consumer.entity_id,
@@ -57,6 +74,11 @@ async def setup_consumer(
     return consumer, dummy_sensor
 
 
+def is_trained(consumer: ConsumerSensor) -> bool:
+    """Return if consumer is trained, read again after training could change it."""
+    return consumer.trained
+
+
 @pytest.mark.asyncio
 @patch(
     "custom_components.kronoterm.dummy_consumer_sensor.consumption",
@@ -78,3 +100,189 @@ async def test_consumer_state(mock_wait: AsyncMock, hass: HomeAssistant) -> None
     assert consumer.extra_state_attributes is not None
     assert "forecast" in consumer.extra_state_attributes
     assert consumer.unit_of_measurement == "W"
+
+
+async def test_history_chunks(hass: HomeAssistant) -> None:
+    """Test history window is loaded one day at a time."""
+    requested: list[tuple[datetime, datetime]] = []
+
+    async def load(job: Any) -> list[tuple[datetime, float]]:
+        _, _, start, end = job.args
+        requested.append((start, end))
+        return [(start, 1.0)]
+
+    hass.data[DATA_INSTANCE] = AsyncMock()
+    hass.data[DATA_INSTANCE].async_add_executor_job = load
+
+    chunks = [
+        chunk
+        async for chunk in entity_history_chunks(
+            hass, "sensor." + BLACK_HOLE_SENSOR, 30
+        )
+    ]
+
+    assert len(chunks) == 30
+    assert all(end - start == timedelta(days=1) for start, end in requested)
+    assert requested[0][1] == requested[1][0]
+
+
+async def test_background_training(hass: HomeAssistant) -> None:
+    """Test sensor starts with profile forecast and switches to trained model."""
+    entity_id = "sensor." + BLACK_HOLE_SENSOR
+    hass.states.async_set(entity_id, "100", {"unit_of_measurement": "W"})
+    history = [
+        (datetime(2025, 5, 14, 6, 0, tzinfo=UTC), 200.0),
+        (datetime(2025, 5, 14, 12, 0, tzinfo=UTC), 500.0),
+    ]
+
+    hass.data[DATA_INSTANCE] = AsyncMock()
+    hass.data[DATA_INSTANCE].async_add_executor_job = AsyncMock(return_value=history)
+
+    tasks: list[asyncio.Task[Any]] = []
+    create_task = hass.async_create_background_task
+
+    def background_task(target: Any, name: str) -> asyncio.Task[Any]:
+        tasks.append(create_task(target, name))
+        return tasks[-1]
+
+    consumer = ConsumerSensor(hass, entity_id, training_days=1)
+    with patch.object(hass, "async_create_background_task", background_task):
+        await consumer.async_added_to_hass(time=False)
+
+    # provisional forecast is the current consumption until profile fills up
+    assert consumer.trained is False
+    assert consumer.native_value == 100
+    assert consumer.extra_state_attributes is not None
+    forecast = consumer.extra_state_attributes["forecast"]
+    assert forecast[0][1] == 100
+    assert all(value == 100 for _, value in forecast[1:])
+
+    await asyncio.gather(*tasks)
+    assert is_trained(consumer)
+    # no slot was completed during training
+    assert len(consumer.predictor.history) == 2
+
+
+async def test_training_without_history(hass: HomeAssistant) -> None:
+    """Test sensor without history keeps profile forecast until a slot is fitted."""
+    entity_id = "sensor." + BLACK_HOLE_SENSOR
+    # slot is inside of the training window
+    start = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    hass.states.async_set(entity_id, "100", {"unit_of_measurement": "W"})
+
+    hass.data[DATA_INSTANCE] = AsyncMock()
+    hass.data[DATA_INSTANCE].async_add_executor_job = AsyncMock(return_value=[])
+
+    consumer = ConsumerSensor(hass, entity_id, training_days=1)
+    await consumer._async_train()
+    assert consumer.trained is False
+
+    # completed slot neither raises nor stays pending
+    consumer._averager.add(start, 100)
+    consumer._add_slots(consumer._averager.advance(start + timedelta(minutes=15)))
+    await hass.async_block_till_done()
+    consumer._update_forecast(start + timedelta(minutes=15))
+    assert is_trained(consumer)
+    assert consumer.predictor.history == [(start, 100)]
+
+
+async def test_profile_forecast(hass: HomeAssistant) -> None:
+    """Test profile forecasts consumption in the same slot a day before."""
+    profile = SeasonalProfile(hass)
+    start = datetime(2025, 5, 13, 13, 0, tzinfo=UTC)
+    profile.add(start, 100)
+    profile.add(start + timedelta(minutes=5), 200)
+    profile.add(start + timedelta(minutes=15), 400)
+    profile.add(start + timedelta(days=1, minutes=15), 50)
+
+    forecast = profile.forecast(start + timedelta(days=1, minutes=3), 0)
+    assert forecast[0][0] == start + timedelta(days=1)
+    assert forecast[0][1] == 150
+    assert forecast[1][1] == 50
+    assert forecast[2][1] == 0
+
+    await profile._store.async_save(profile._data_to_save())
+    restored = SeasonalProfile(hass)
+    await restored.async_load()
+    assert restored.slots == profile.slots
+
+
+def test_slot_average() -> None:
+    """Test changes are averaged over the time they lasted."""
+    averager = SlotAverager()
+    start = datetime(2025, 5, 13, 13, 0, tzinfo=UTC)
+
+    assert averager.add(start + timedelta(minutes=2), 1000) == []
+    assert averager.add(start + timedelta(minutes=5), 3000) == []
+    assert averager.add(start + timedelta(minutes=6), None) == []
+    assert averager.add(start + timedelta(minutes=8), 1000) == []
+    assert averager.average() == approx((3 * 1000 + 3000) / 4)
+
+    # unknown value doesn't count, unchanged value fills whole slots
+    assert averager.advance(start + timedelta(minutes=31)) == [
+        (start, approx((3 * 1000 + 3000 + 7 * 1000) / 11)),
+        (start + timedelta(minutes=15), 1000),
+    ]
+    assert averager.average() == 1000
+
+
+async def test_state_change_sampling(hass: HomeAssistant) -> None:
+    """Test predictor is trained on slot averages of state changes."""
+    entity_id = "sensor." + BLACK_HOLE_SENSOR
+    start = datetime(2025, 5, 13, 13, 0, tzinfo=UTC)
+    hass.states.async_set(entity_id, "1000", {"unit_of_measurement": "W"})
+
+    consumer = ConsumerSensor(hass, entity_id)
+    consumer.trained = True
+    consumer._averager.add(start, 1000)
+
+    def changed(state: str, minutes: int) -> Event:
+        return Event(
+            EVENT_STATE_CHANGED,
+            {"entity_id": entity_id, "new_state": State(entity_id, state)},
+            time_fired=start + timedelta(minutes=minutes),
+        )
+
+    with patch.object(consumer, "_async_refit") as refit:
+        consumer._async_target_changed(changed("3000", 5))
+        consumer._async_target_changed(changed("1000", 6))
+        refit.assert_not_called()
+
+        consumer._async_target_changed(changed("1000", 16))
+        # predictor that was never fitted is due
+        refit.assert_called_once_with("age")
+        [(slot, value)] = consumer.predictor.history
+        assert slot == start
+        assert value == approx((14 * 1000 + 3000) / 15)
+    await hass.async_block_till_done()
+
+
+async def test_refit_on_training_window(hass: HomeAssistant) -> None:
+    """Test refit trains on the training window, not on all uptime history."""
+    now = datetime.now(UTC)
+    consumer = ConsumerSensor(hass, "sensor." + BLACK_HOLE_SENSOR, training_days=1)
+    consumer.predictor.history = [
+        (now - timedelta(hours=hours), 100.0) for hours in range(72, 0, -1)
+    ]
+
+    with patch.object(
+        consumer, "_async_fit", AsyncMock(return_value=Predictor())
+    ) as fit:
+        await consumer._async_refit("slots")
+    history = fit.call_args.args[0]
+    assert len(history) == 23
+    assert history[0][0] == now - timedelta(hours=23)
+    assert consumer.predictor.history == history
+
+
+async def test_additional_consumer(hass: HomeAssistant) -> None:
+    """Test additional consumers get their own entities and profile."""
+    consumer = ConsumerSensor(hass, "sensor.boiler", consumer="boiler")
+    assert consumer.entity_id == "sensor.consumer_sensor_boiler"
+    assert consumer.unique_id == "consumer_sensor_boiler"
+    assert consumer.translation_placeholders == {"consumer": "boiler"}
+    assert consumer.profile._store.key == "kronoterm.consumer_profile_boiler"
+
+    cost = CostSensor(hass, MagicMock(), consumer="boiler")
+    assert cost.entity_id == "sensor.total_cost_sensor_boiler"
+    assert cost._consumption_entity_id == consumer.entity_id
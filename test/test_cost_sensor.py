@@ -9,18 +9,19 @@ from custom_components.kronoterm.consumer_sensor import ConsumerSensor
 from custom_components.kronoterm.dummy_consumer_sensor import DummyPowerConsumerSensor
 from custom_components.kronoterm.const import (
     CONSUMER_SENSOR_ID,
-    ENERGY_PRICE_SENSOR,
     BLACK_HOLE_SENSOR,
 )
-from custom_components.kronoterm.energy_price_sensor import EnergyPriceSensor
+from custom_components.kronoterm.coordinator import PriceCoordinator, PriceData
 from custom_components.kronoterm.cost_sensor import CostSensor
 from custom_components.kronoterm.energy_api import GENI
+from custom_components.kronoterm.forecast_cost import cumulative_cost
 
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 
 import asyncio
 
-from homeassistant.core import HomeAssistant, State
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, State
 from homeassistant.components.sensor import SensorStateClass
 from homeassistant.components.recorder.const import DATA_INSTANCE
 
@@ -81,6 +82,20 @@ def calculate_forecast_expected(
     return forecast_expected
 
 
+async def price_coordinator(
+    hass: HomeAssistant,
+    price: float | None = test_price,
+    forecast: Sequence[tuple[datetime, float | None]] | None = test_price_forecast,
+) -> PriceCoordinator:
+    """Create price coordinator holding test prices."""
+    providers = await GENI.providers()
+    coordinator = PriceCoordinator(hass, GENI(providers[0]))
+    coordinator.data = PriceData(
+        price, "EUR/kWh", list(forecast) if forecast is not None else []
+    )
+    return coordinator
+
+
 async def setup_cost_sensor(
     hass: HomeAssistant,
     mock_wait: AsyncMock,
@@ -105,11 +120,15 @@ async def setup_cost_sensor(
 
     hass.data[DATA_INSTANCE] = AsyncMock()
     hass.data[DATA_INSTANCE].async_add_executor_job = AsyncMock()
-    hass.data[DATA_INSTANCE].async_add_executor_job.return_value = {
-        dummy_sensor.entity_id: []
-    }
-
-    await consumer.async_added_to_hass(time=False)
+    hass.data[DATA_INSTANCE].async_add_executor_job.return_value = []
+    # hass is mocked here, so training in background never runs
+    with patch.object(
+        hass,
+        "async_create_background_task",
+        side_effect=lambda target, name: target.close(),
+    ) as background_task:
+        await consumer.async_added_to_hass(time=False)
+    background_task.assert_called_once()
 
     hass.states.async_set(
         consumer.entity_id,
@@ -117,29 +136,12 @@ async def setup_cost_sensor(
         dummy_sensor.extra_state_attributes,
     )
 
-    # Setting up the Energy Price Sensor
-    providers = await GENI.providers()
-    energy_price_sensor = await EnergyPriceSensor.new(
-        providers[0],
-        GENI(providers[0]),
-    )
-    energy_price_sensor.entity_id = "sensor." + ENERGY_PRICE_SENSOR
-    await energy_price_sensor.async_added_to_hass()
-    await energy_price_sensor.async_update()
-
-    hass.states.async_set(
-        energy_price_sensor.entity_id,
-        energy_price_sensor.native_value,
-        {"unit_of_measurement": energy_price_sensor.native_unit_of_measurement},
-    )
-
     # Let Home Assistant run any scheduled tasks
     await mock_wait(hass)
 
     return {
         "dummy_sensor": dummy_sensor,
         "consumer": consumer,
-        "energy_price_sensor": energy_price_sensor,
     }
 
 
@@ -157,13 +159,7 @@ async def test_cost_sensor_success(
 
     # Mocking three different things
     def mock_get_state(entity_id: str) -> State | None:
-        if entity_id == "sensor." + ENERGY_PRICE_SENSOR:
-            return State(
-                entity_id,
-                str(test_price),
-                {"unit_of_measurement": "EUR/kWh", "forecast": test_price_forecast},
-            )
-        elif entity_id == "sensor." + BLACK_HOLE_SENSOR:
+        if entity_id == "sensor." + BLACK_HOLE_SENSOR:
             return State(
                 entity_id,
                 str(test_consumption),
@@ -184,10 +180,10 @@ async def test_cost_sensor_success(
     _ = await setup_cost_sensor(hass, mock_wait)
 
     # Create the Cost Sensor instance
-    cost_sensor = CostSensor(hass)
+    cost_sensor = CostSensor(hass, await price_coordinator(hass))
 
     # Updating the first time - cost is 0.0, everything else is available
-    await cost_sensor.async_update()
+    cost_sensor._update_cost(datetime.now())
     last_update_local = cost_sensor._last_update
 
     # create an expected output for forecast cost
@@ -210,7 +206,7 @@ async def test_cost_sensor_success(
     # Cost is calculated as last_update - now -> we need at least 1s for normal results
     await asyncio.sleep(1)
 
-    await cost_sensor.async_update()
+    cost_sensor._update_cost(datetime.now())
     update_now_local = cost_sensor._last_update
 
     # all needed variables to calculate the cost
@@ -238,7 +234,7 @@ async def test_missing_values(hass: HomeAssistant) -> None:
     """Test _calculate_cost() when current price and current consumption are None."""
 
     # Creating the CostSensor instance
-    cost_sensor = CostSensor(hass)
+    cost_sensor = CostSensor(hass, await price_coordinator(hass))
 
     # Testing if price is None
     cost_sensor._price = None
@@ -275,13 +271,7 @@ async def test_different_units(
     for unit in units:
         # Mocking three different things
         def mock_get_state(entity_id: str) -> State | None:
-            if entity_id == "sensor." + ENERGY_PRICE_SENSOR:
-                return State(
-                    entity_id,
-                    str(test_price),
-                    {"unit_of_measurement": "EUR/kWh", "forecast": test_price_forecast},
-                )
-            elif entity_id == "sensor." + BLACK_HOLE_SENSOR:
+            if entity_id == "sensor." + BLACK_HOLE_SENSOR:
                 return State(
                     entity_id,
                     str(test_consumption),
@@ -308,10 +298,10 @@ async def test_different_units(
         _ = await setup_cost_sensor(hass, mock_wait)
 
         # Create the Cost Sensor instance
-        cost_sensor = CostSensor(hass)
+        cost_sensor = CostSensor(hass, await price_coordinator(hass))
 
         # Updating the first time - cost is 0.0, everything else is available
-        await cost_sensor.async_update()
+        cost_sensor._update_cost(datetime.now())
 
         # Testing only unit
         test_consumption_factorized = test_consumption
@@ -402,13 +392,7 @@ async def test_different_forecast_timestamps(
         c_forecast: list[tuple[datetime, float]] | None = copy.deepcopy(forecast[1])
 
         def mock_get_state(entity_id: str) -> State | None:
-            if entity_id == "sensor." + ENERGY_PRICE_SENSOR:
-                return State(
-                    entity_id,
-                    str(test_price),
-                    {"unit_of_measurement": "EUR/kWh", "forecast": p_forecast},
-                )
-            elif entity_id == "sensor." + BLACK_HOLE_SENSOR:
+            if entity_id == "sensor." + BLACK_HOLE_SENSOR:
                 return State(
                     entity_id,
                     str(test_consumption),
@@ -435,10 +419,12 @@ async def test_different_forecast_timestamps(
         _ = await setup_cost_sensor(hass, mock_wait)
 
         # Create the Cost Sensor instance
-        cost_sensor = CostSensor(hass)
+        cost_sensor = CostSensor(
+            hass, await price_coordinator(hass, test_price, p_forecast)
+        )
 
         # Updating the first time - cost is 0.0, everything else is available
-        await cost_sensor.async_update()
+        cost_sensor._update_cost(datetime.now())
         p_forecast_again: list[tuple[datetime, float]] | None = copy.deepcopy(
             forecast[0]
         )
@@ -450,26 +436,139 @@ async def test_different_forecast_timestamps(
             assert cost_sensor._cost_forecast_cumulative is None
             return
 
-        # Testing calculate forecast cost cumulative
-        expected_forecast = None
-
-        if (
-            abs((p_forecast_again[0][0] - c_forecast_again[0][0]).total_seconds())
-            > 60 * 15
-        ):
-            expected_forecast = None
-        elif p_forecast_again[0][0] < c_forecast_again[0][0]:
-            # remove the first price forecast entry
-            p_forecast_again.pop(0)
-            expected_forecast = calculate_forecast_expected(
-                p_forecast_again, c_forecast_again
-            )
-        elif p_forecast_again[0][0] > c_forecast_again[0][0]:
-            # remove the first consumption forecast entry
-            c_forecast_again.pop(0)
-            expected_forecast = calculate_forecast_expected(
-                p_forecast_again, c_forecast_again
-            )
+        # Testing calculate forecast cost cumulative, forecasts are joined on timestamps
+        prices = dict(p_forecast_again)
+        common = [t for t, _ in c_forecast_again if t in prices]
+        expected_forecast = calculate_forecast_expected(
+            [(t, prices[t]) for t in common],
+            [(t, v) for t, v in c_forecast_again if t in prices],
+        )
+        assert len(common) < len(c_forecast_again)
 
         # Assertions
         assert cost_sensor._cost_forecast_cumulative == expected_forecast
+
+
+async def test_consumer_state_changes(hass: HomeAssistant) -> None:
+    """Test cost is integrated at consumer state changes between consumption samples."""
+
+    entity_id = "sensor." + CONSUMER_SENSOR_ID
+    attributes = {"unit_of_measurement": "W", "forecast": test_consumption_forecast}
+    hass.states.async_set(entity_id, "1000", attributes)
+
+    cost_sensor = CostSensor(hass, await price_coordinator(hass))
+    start = datetime(2025, 5, 13, 13, 0, tzinfo=UTC)
+    cost_sensor._update_cost(start)
+
+    def changed(state: str, hours: int, forecast: list) -> Event:
+        new_state = State(entity_id, state, {**attributes, "forecast": forecast})
+        return Event(
+            EVENT_STATE_CHANGED,
+            {"entity_id": entity_id, "new_state": new_state},
+            time_fired=start + timedelta(hours=hours),
+        )
+
+    with (
+        patch.object(cost_sensor, "async_write_ha_state"),
+        patch.object(
+            cost_sensor,
+            "_calculate_forecast_cost_cumulative",
+            wraps=cost_sensor._calculate_forecast_cost_cumulative,
+        ) as calculate_forecast,
+    ):
+        cost_sensor._async_consumer_changed(
+            changed("2000", 1, test_consumption_forecast)
+        )
+        # consumption rises linearly from 1 kW to 2 kW
+        assert cost_sensor.native_value == approx(test_price * 1.5)
+        assert cost_sensor.current_consumption == 2000
+        assert calculate_forecast.call_count == 0
+
+        cost_sensor._async_consumer_changed(
+            changed("2000", 2, test_consumption_forecast[1:])
+        )
+        assert cost_sensor.native_value == approx(test_price * 3.5)
+        assert calculate_forecast.call_count == 1
+        assert cost_sensor._consumption_forecast == test_consumption_forecast[1:]
+
+
+async def test_price_slot_boundaries(hass: HomeAssistant) -> None:
+    """Test period is charged at the price of every slot it spans."""
+
+    cost_sensor = CostSensor(hass, await price_coordinator(hass))
+    start = datetime(2025, 5, 13, 13, 10, tzinfo=UTC)
+    cost_sensor._price = 0.1
+    cost_sensor._consumption = 1000
+    cost_sensor._price_forecast = [
+        (datetime(2025, 5, 13, 13, 0, tzinfo=UTC), 0.1),
+        (datetime(2025, 5, 13, 13, 15, tzinfo=UTC), 0.4),
+        (datetime(2025, 5, 13, 13, 30, tzinfo=UTC), None),
+    ]
+    cost_sensor._calculate_cost(start)
+
+    # 1 kW to 3 kW from 13:10 to 13:40, slot at 13:30 has no price yet
+    cost = cost_sensor._calculate_cost(start + timedelta(minutes=30), 3000)
+    energy = [(1000 + 4000 / 3) / 2 / 12, (4000 / 3 + 7000 / 3) / 2 / 4]
+    energy.append((7000 / 3 + 3000) / 2 / 6)
+    assert cost == approx((energy[0] * 0.1 + energy[1] * 0.4 + energy[2] * 0.1) / 1000)
+    assert cost_sensor._last_update == start + timedelta(minutes=30)
+
+
+async def test_price_refresh_between_samples(hass: HomeAssistant) -> None:
+    """Test price refresh doesn't split integration between consumption samples."""
+
+    entity_id = "sensor." + CONSUMER_SENSOR_ID
+    hass.states.async_set(entity_id, "1000", {"unit_of_measurement": "W"})
+    start = datetime(2025, 5, 13, 13, 10, tzinfo=UTC)
+    boundary = datetime(2025, 5, 13, 13, 15, tzinfo=UTC)
+    coordinator = await price_coordinator(
+        hass, 0.1, [(boundary - timedelta(minutes=15), 0.1), (boundary, 0.4)]
+    )
+    cost_sensor = CostSensor(hass, coordinator)
+    cost_sensor._update_cost(start)
+
+    with patch.object(cost_sensor, "async_write_ha_state"):
+        # refreshed forecast starts at the new slot
+        coordinator.data = PriceData(
+            0.4, "EUR/kWh", [(boundary, 0.4), (boundary + timedelta(minutes=15), 0.2)]
+        )
+        cost_sensor._handle_coordinator_update()
+        assert cost_sensor.native_value == 0
+
+        cost_sensor._async_consumer_changed(
+            Event(
+                EVENT_STATE_CHANGED,
+                {
+                    "entity_id": entity_id,
+                    "new_state": State(entity_id, "3000", {"unit_of_measurement": "W"}),
+                },
+                time_fired=start + timedelta(minutes=15),
+            )
+        )
+
+    # 1 kW to 3 kW from 13:10 to 13:25, the first 5 minutes at the old price
+    energy = [(1000 + 5000 / 3) / 2 / 12, (5000 / 3 + 3000) / 2 / 6]
+    assert cost_sensor.native_value == approx(
+        (energy[0] * 0.1 + energy[1] * 0.4) / 1000
+    )
+
+
+def test_different_forecast_resolutions() -> None:
+    """Test hourly prices apply to all 15 minute consumption slots of the hour."""
+
+    price_forecast = [
+        (datetime(2025, 5, 13, 13, 0), 0.1),
+        (datetime(2025, 5, 13, 14, 0), 0.2),
+    ]
+    consumption_forecast = [
+        (datetime(2025, 5, 13, 12, 45) + timedelta(minutes=15 * i), 1000.0)
+        for i in range(10)
+    ]
+
+    forecast = cumulative_cost(price_forecast, consumption_forecast)
+
+    # 12:45 has no price yet, 15:00 is after the last hourly price
+    assert [t for t, _ in forecast] == [t for t, _ in consumption_forecast[1:9]]
+    assert forecast[0][1] == 0.0
+    assert forecast[-1][1] == approx(3 * 0.1 / 4 + 4 * 0.2 / 4)
+    assert cumulative_cost(price_forecast, []) == []
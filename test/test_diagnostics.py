@@ -0,0 +1,69 @@
+"""Test diagnostics."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore
+
+from custom_components.kronoterm.const import (
+    ADDITIONAL_CONSUMERS,
+    DOMAIN,
+    PRICE_COORDINATOR,
+    PROVIDER_REQUESTS_SENSOR,
+    SELECT_PROVIDER,
+    SELECTED_CONSUMER,
+)
+from custom_components.kronoterm.diagnostics import async_get_config_entry_diagnostics
+from custom_components.kronoterm.energy_api import GENI
+
+
+pytestmark = pytest.mark.usefixtures("setup_recorder")
+
+
+async def test_config_entry_diagnostics(hass: HomeAssistant) -> None:
+    """Test provider metrics are part of diagnostics."""
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics["config"] == {
+        SELECT_PROVIDER: provider,
+        SELECTED_CONSUMER: None,
+        ADDITIONAL_CONSUMERS: None,
+    }
+    assert diagnostics["provider"]["name"] == "GENI"
+    assert diagnostics["provider"]["metrics"]["requests"] == 0
+    assert diagnostics["training_pool"]["running"] == 0
+    # prices were fetched at setup
+    assert diagnostics["tracing"]["spans"]["price/fetch"]["count"] == 1
+
+    state = hass.states.get(f"sensor.{PROVIDER_REQUESTS_SENSOR}")
+    assert state is not None
+    assert state.state == "0"
+
+
+async def test_provider_metric_sensors(hass: HomeAssistant) -> None:
+    """Test metric sensors follow price refreshes and aren't polled."""
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id][PRICE_COORDINATOR]
+
+    entity_id = f"sensor.{PROVIDER_REQUESTS_SENSOR}"
+    entity = hass.data["sensor"].get_entity(entity_id)
+    assert entity.should_poll is False
+    assert {"errors", "bytes"} <= entity._unrecorded_attributes
+
+    coordinator.provider.metrics.requests += 1
+    coordinator.async_update_listeners()
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "1"
@@ -1,12 +1,35 @@
 """Tests for current price sensor."""
 
+from datetime import UTC, date, datetime, timedelta
 from unittest.mock import AsyncMock, patch
 
+from freezegun.api import FrozenDateTimeFactory
 import pytest
+from custom_components.kronoterm.coordinator import DAY_AHEAD_RETRY, PriceCoordinator
 from custom_components.kronoterm.energy_price_sensor import EnergyPriceSensor
-from custom_components.kronoterm.energy_api import GENI
+from custom_components.kronoterm.energy_api import (
+    GENI,
+    ENTSOE,
+    EnergyAPI,
+    EnergyCharts,
+    NordPool,
+)
 
 from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed  # type: ignore
+
+from .mock_price_server import MockPriceServer
+
+
+async def new_sensor(hass: HomeAssistant) -> EnergyPriceSensor:
+    """Create price sensor with refreshed coordinator."""
+    providers = await GENI.providers()
+    coordinator = PriceCoordinator(hass, GENI(providers[0]))
+    await coordinator.async_refresh()
+
+    sensor: EnergyPriceSensor = await EnergyPriceSensor.new(providers[0], coordinator)
+    return sensor
 
 
 @pytest.mark.asyncio
@@ -18,11 +41,7 @@ async def test_async_update_success(mock_price: AsyncMock, hass: HomeAssistant)
 
     providers = await GENI.providers()
 
-    sensor = await EnergyPriceSensor.new(
-        providers[0],
-        GENI(providers[0]),
-    )
-    await sensor.async_update()
+    sensor = await new_sensor(hass)
 
     assert sensor.native_unit_of_measurement == "EUR/kWh"
     assert sensor.native_value == 3.14
@@ -39,14 +58,101 @@ async def test_async_update_fail(mock_price: AsyncMock, hass: HomeAssistant) ->
 
     mock_price.return_value = None
 
-    providers = await GENI.providers()
-
-    sensor = await EnergyPriceSensor.new(
-        providers[0],
-        GENI(providers[0]),
-    )
-    await sensor.async_update()
+    sensor = await new_sensor(hass)
 
     assert sensor.native_unit_of_measurement == "EUR/kWh"
     assert sensor.native_value is None
     assert sensor.available is False
+
+    await sensor.coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+@patch.object(GENI, "price", new_callable=AsyncMock)
+async def test_refresh_at_slot_boundary(
+    mock_price: AsyncMock, hass: HomeAssistant
+) -> None:
+    """Tests prices are refreshed only at slot boundaries."""
+
+    mock_price.return_value = 3.14
+
+    sensor = await new_sensor(hass)
+    coordinator = sensor.coordinator
+    coordinator.async_start()
+    calls = mock_price.await_count
+
+    now = dt_util.utcnow()
+    boundary = now.replace(second=0, microsecond=0) + timedelta(
+        minutes=15 - now.minute % 15
+    )
+
+    async_fire_time_changed(hass, boundary - timedelta(minutes=1))
+    await hass.async_block_till_done()
+    assert mock_price.await_count == calls
+
+    mock_price.return_value = 2.71
+    async_fire_time_changed(hass, boundary)
+    await hass.async_block_till_done()
+    assert mock_price.await_count > calls
+    assert sensor.native_value == 2.71
+
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_retry_until_day_ahead_published(hass: HomeAssistant) -> None:
+    """Tests incomplete forecast is fetched again until prices are published."""
+
+    published = False
+
+    async def price(dt: datetime) -> float | None:
+        return 3.14 if published or dt <= dt_util.utcnow() else None
+
+    provider = GENI((await GENI.providers())[0])
+    with patch.object(provider, "price", side_effect=price):
+        coordinator = PriceCoordinator(hass, provider)
+        await coordinator.async_refresh()
+        assert not coordinator.data.forecast_complete
+
+        published = True
+        async_fire_time_changed(hass, dt_util.utcnow() + DAY_AHEAD_RETRY)
+        await hass.async_block_till_done()
+        assert coordinator.data.forecast_complete
+
+        await coordinator.async_shutdown()
+
+
+@pytest.mark.parametrize(
+    ("provider", "provider_class"),
+    [
+        ("Deutschland (NordPool)", NordPool),
+        ("Slovakia (ENTSOE)", ENTSOE),
+        ("Switzerland (Energy Charts)", EnergyCharts),
+    ],
+)
+async def test_long_horizon_requests(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    mock_price_server: MockPriceServer,
+    provider: str,
+    provider_class: type[EnergyAPI],
+) -> None:
+    """Tests 48 h forecast costs a request per day and doesn't wait for unpublished days."""
+    hass.config.set_time_zone("Europe/Ljubljana")
+    # 12:00 CEST, prices of the day after tomorrow can't be published yet
+    freezer.move_to(datetime(2025, 5, 13, 10, 0, tzinfo=UTC))
+    mock_price_server.published_until = date(2025, 5, 14)
+
+    coordinator = PriceCoordinator(hass, provider_class(provider), horizon=48)
+    await coordinator.async_refresh()
+    assert len(coordinator.data.forecast) == 4 * 48
+    assert not coordinator.data.forecast_complete
+    assert not coordinator.as_dict()["waiting_for_day_ahead"]
+    # three days are touched, the unpublished one is asked for at most once more
+    assert mock_price_server.total_requests <= 3
+
+    mock_price_server.requests.clear()
+    await coordinator.async_refresh()
+    assert mock_price_server.total_requests <= 1
+
+    await coordinator.async_shutdown()
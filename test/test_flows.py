@@ -1,44 +1,33 @@
 """Test for config/option flows."""
 
 import re
-from typing import Any
 from unittest import mock
-from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+from unittest.mock import patch
 import pytest
 
 import homeassistant
-from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.const import DOMAIN as R_DOMAIN
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore
 
 from custom_components.kronoterm import config_flow
 from custom_components.kronoterm.const import (
+    ADDITIONAL_CONSUMERS,
     DOMAIN,
     NAME,
     SELECT_PROVIDER,
     SELECTED_CONSUMER,
     BLACK_HOLE_SENSOR,
+    DEFAULT_FORECAST_HORIZON,
+    DEFAULT_MIN_SAMPLE_INTERVAL,
+    DEFAULT_TRAINING_DAYS,
+    FORECAST_HORIZON,
+    MIN_SAMPLE_INTERVAL,
+    TRAINING_DAYS,
 )
 from custom_components.kronoterm.energy_api import GENI
 
 
-@pytest.fixture(autouse=True)
-def setup_recorder(hass: HomeAssistant) -> None:
-    """Set Recorder."""
-
-    _internal_store: dict[Any, Any] = {}
-    hass.data[R_DOMAIN] = MagicMock()
-    hass.data[R_DOMAIN].__getitem__.side_effect = _internal_store.__getitem__
-    hass.data[R_DOMAIN].__setitem__.side_effect = _internal_store.__setitem__
-    hass.data[R_DOMAIN].__delitem__.side_effect = _internal_store.__delitem__
-    hass.data[R_DOMAIN].db_connected = PropertyMock(return_value=False)
-
-    hass.data[DATA_INSTANCE] = AsyncMock()
-    hass.data[DATA_INSTANCE].async_add_executor_job = AsyncMock()
-    hass.data[DATA_INSTANCE].async_add_executor_job.return_value = {
-        f"sensor.{BLACK_HOLE_SENSOR}": []
-    }
+pytestmark = pytest.mark.usefixtures("setup_recorder")
 
 
 @pytest.mark.asyncio
@@ -162,10 +151,19 @@ async def test_options_flow_change_provider(hass: HomeAssistant) -> None:
         result["flow_id"],
         user_input={SELECT_PROVIDER: providers[1], SELECTED_CONSUMER: "None"},
     )
+    # wait for reload triggered by options update
+    await hass.async_block_till_done()
     assert result["type"] == "create_entry"
     assert result["title"] == "Updated options"
     assert result["result"] is True
-    assert {SELECT_PROVIDER: providers[1], SELECTED_CONSUMER: None} == result["data"]
+    assert {
+        SELECT_PROVIDER: providers[1],
+        SELECTED_CONSUMER: None,
+        TRAINING_DAYS: DEFAULT_TRAINING_DAYS,
+        MIN_SAMPLE_INTERVAL: DEFAULT_MIN_SAMPLE_INTERVAL,
+        ADDITIONAL_CONSUMERS: [],
+        FORECAST_HORIZON: DEFAULT_FORECAST_HORIZON,
+    } == result["data"]
 
 
 @pytest.mark.asyncio
@@ -193,14 +191,21 @@ async def test_options_flow_select_consumer(hass: HomeAssistant) -> None:
         user_input={
             SELECT_PROVIDER: providers[0],
             SELECTED_CONSUMER: f"sensor.{BLACK_HOLE_SENSOR}",
+            TRAINING_DAYS: 30,
+            FORECAST_HORIZON: 48,
         },
     )
+    await hass.async_block_till_done()
     assert result["type"] == "create_entry"
     assert result["title"] == "Updated options"
     assert result["result"] is True
     assert {
         SELECT_PROVIDER: providers[0],
         SELECTED_CONSUMER: f"sensor.{BLACK_HOLE_SENSOR}",
+        TRAINING_DAYS: 30,
+        MIN_SAMPLE_INTERVAL: DEFAULT_MIN_SAMPLE_INTERVAL,
+        ADDITIONAL_CONSUMERS: [],
+        FORECAST_HORIZON: 48,
     } == result["data"]
 
     # show initial form
@@ -213,10 +218,49 @@ async def test_options_flow_select_consumer(hass: HomeAssistant) -> None:
             SELECTED_CONSUMER: "None",
         },
     )
+    await hass.async_block_till_done()
     assert result["type"] == "create_entry"
     assert result["title"] == "Updated options"
     assert result["result"] is True
     assert {
         SELECT_PROVIDER: providers[0],
         SELECTED_CONSUMER: None,
+        TRAINING_DAYS: 30,
+        MIN_SAMPLE_INTERVAL: DEFAULT_MIN_SAMPLE_INTERVAL,
+        ADDITIONAL_CONSUMERS: [],
+        FORECAST_HORIZON: 48,
     } == result["data"]
+
+
+@pytest.mark.asyncio
+async def test_options_flow_training_days(hass: HomeAssistant) -> None:
+    """Test training window and forecast horizon are limited."""
+
+    providers = await GENI.providers()
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: providers[0]}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    with pytest.raises(homeassistant.data_entry_flow.InvalidData):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                SELECT_PROVIDER: providers[0],
+                SELECTED_CONSUMER: "None",
+                TRAINING_DAYS: 365,
+            },
+        )
+    with pytest.raises(homeassistant.data_entry_flow.InvalidData):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                SELECT_PROVIDER: providers[0],
+                SELECTED_CONSUMER: "None",
+                FORECAST_HORIZON: 49,
+            },
+        )
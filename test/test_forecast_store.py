@@ -0,0 +1,141 @@
+"""Tests for forecast store and get_forecast service."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore
+
+from custom_components.kronoterm.const import (
+    DOMAIN,
+    ENERGY_PRICE_SENSOR,
+    SELECT_PROVIDER,
+    SERVICE_GET_FORECAST,
+)
+from custom_components.kronoterm.energy_api import GENI
+from custom_components.kronoterm.energy_price_sensor import EnergyPriceSensor
+from custom_components.kronoterm.forecast_store import (
+    COST_FORECAST,
+    PRICE_FORECAST,
+    ForecastStore,
+)
+
+AT = datetime(2025, 5, 13, 10, 0, tzinfo=UTC)
+FORECAST = [(AT + timedelta(minutes=15 * i), 0.1 * i) for i in range(4)]
+
+
+pytestmark = pytest.mark.usefixtures("setup_recorder")
+
+
+def test_update() -> None:
+    """Tests versions and listeners only change when forecast changes."""
+    store = ForecastStore()
+    changes: list[str] = []
+    remove = store.add_listener(changes.append)
+
+    store.update(PRICE_FORECAST, FORECAST)
+    store.update(PRICE_FORECAST, list(FORECAST))
+    assert store.version(PRICE_FORECAST) == 1
+    assert store.version(COST_FORECAST) == 0
+    assert changes == [PRICE_FORECAST]
+
+    remove()
+    store.update(PRICE_FORECAST, FORECAST[1:])
+    assert store.version(PRICE_FORECAST) == 2
+    assert changes == [PRICE_FORECAST]
+
+
+def test_serialized() -> None:
+    """Tests serialized forecast is cached until forecast changes."""
+    store = ForecastStore()
+    store.update(PRICE_FORECAST, FORECAST)
+
+    serialized = store.serialized(PRICE_FORECAST)
+    assert serialized[0] == (AT.isoformat(), 0.0)
+    assert store.serialized(PRICE_FORECAST) is serialized
+
+    store.update(PRICE_FORECAST, FORECAST[1:])
+    assert store.serialized(PRICE_FORECAST)[0] == (FORECAST[1][0].isoformat(), 0.1)
+    assert store.as_dict((COST_FORECAST,)) == {COST_FORECAST: []}
+
+
+def test_delta() -> None:
+    """Tests delta contains only changed and appended slots."""
+    store = ForecastStore()
+    store.update(PRICE_FORECAST, FORECAST)
+    assert store.delta(PRICE_FORECAST)["slots"] == store.serialized(PRICE_FORECAST)
+
+    shifted = FORECAST[1:] + [(AT + timedelta(hours=1), None)]
+    shifted[0] = (shifted[0][0], 0.5)
+    store.update(PRICE_FORECAST, shifted)
+
+    delta = store.delta(PRICE_FORECAST)
+    assert delta["base_version"] == 1
+    assert delta["version"] == 2
+    assert delta["start"] == FORECAST[1][0].isoformat()
+    assert delta["end"] == (AT + timedelta(hours=1)).isoformat()
+    assert delta["slots"] == [
+        (FORECAST[1][0].isoformat(), 0.5),
+        ((AT + timedelta(hours=1)).isoformat(), None),
+    ]
+    assert store.snapshot(PRICE_FORECAST)["version"] == 2
+
+
+def test_forecast_not_recorded() -> None:
+    """Tests forecast attributes are excluded from the recorder."""
+    assert "forecast" in EnergyPriceSensor._unrecorded_attributes
+    assert "provider_name" not in EnergyPriceSensor._unrecorded_attributes
+
+
+async def test_get_forecast_service(hass: HomeAssistant) -> None:
+    """Tests forecasts of loaded entry are returned by the service."""
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_FORECAST,
+        {"config_entry_id": config_entry.entry_id, "forecast": PRICE_FORECAST},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response is not None
+    assert list(response) == [PRICE_FORECAST]
+    assert len(response[PRICE_FORECAST]) == 4 * 8
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GET_FORECAST,
+            {"config_entry_id": "unknown"},
+            blocking=True,
+            return_response=True,
+        )
+
+    state = hass.states.get(f"sensor.{ENERGY_PRICE_SENSOR}")
+    assert state is not None
+    assert len(state.attributes["forecast"]) == 4 * 8
+
+
+def test_close() -> None:
+    """Tests closing drops listeners and notifies close listeners once."""
+    store = ForecastStore()
+    changes: list[str] = []
+    closed: list[bool] = []
+    remove = store.add_listener(changes.append)
+    store.add_close_listener(lambda: closed.append(True))
+
+    store.close()
+    store.close()
+    store.update(PRICE_FORECAST, FORECAST)
+    assert closed == [True]
+    assert changes == []
+    # removing dropped listener is harmless
+    remove()
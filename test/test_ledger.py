@@ -0,0 +1,137 @@
+"""Tests for cost ledger."""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+import pytest
+from pytest import approx
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore
+
+from custom_components.kronoterm.const import COST_LEDGER, DOMAIN, SELECT_PROVIDER
+from custom_components.kronoterm.energy_api import GENI
+
+from custom_components.kronoterm.integration import integrate
+from custom_components.kronoterm.ledger import (
+    COST_STATISTIC,
+    ENERGY_STATISTIC,
+    RETENTION,
+    STORAGE_KEY,
+    CostLedger,
+)
+
+START = datetime(2025, 5, 13, 13, 10, tzinfo=UTC)
+
+
+def add(
+    ledger: CostLedger, start: datetime, end: datetime, power: float, price: float
+) -> None:
+    """Book consumption at constant power and price."""
+    ledger.add(integrate(start, end, power, power, lambda _: price))
+
+
+@patch("custom_components.kronoterm.ledger.async_add_external_statistics")
+async def test_add(mock_statistics: MagicMock, hass: HomeAssistant) -> None:
+    """Tests consumption is split at slot boundaries."""
+    ledger = CostLedger(hass, "EUR")
+
+    # 13:10 - 13:40 at 2 kW
+    add(ledger, START, START + timedelta(minutes=30), 2000, 0.2)
+
+    assert [record.start.minute for record in ledger.slots] == [0, 15, 30]
+    assert [record.energy for record in ledger.slots] == approx([1 / 6, 0.5, 1 / 3])
+    assert ledger.slots[1].cost == approx(0.1)
+    assert ledger.slots[1].price == approx(0.2)
+    mock_statistics.assert_not_called()
+
+
+@patch("custom_components.kronoterm.ledger.async_add_external_statistics")
+async def test_publish(mock_statistics: MagicMock, hass: HomeAssistant) -> None:
+    """Tests completed hours are published with running sums."""
+    ledger = CostLedger(hass, "EUR")
+
+    add(ledger, START, START + timedelta(minutes=50), 1000, 0.1)
+    assert mock_statistics.call_count == 2
+
+    statistics: dict[str, list[Any]] = {
+        metadata["statistic_id"]: data
+        for _, metadata, data in (call.args for call in mock_statistics.call_args_list)
+    }
+    assert statistics[ENERGY_STATISTIC][0]["state"] == approx(50 / 60)
+    assert statistics[COST_STATISTIC][0]["sum"] == approx(5 / 60 * 1)
+    assert mock_statistics.call_args.args[1]["unit_of_measurement"] == "EUR"
+
+    # same hour again isn't published twice, sums continue
+    mock_statistics.reset_mock()
+    add(ledger, START + timedelta(minutes=50), START + timedelta(hours=1), 1000, 0.1)
+    mock_statistics.assert_not_called()
+    add(ledger, START + timedelta(hours=1), START + timedelta(hours=2), 1000, 0.1)
+    cost = mock_statistics.call_args.args[2]
+    assert cost[0]["state"] == approx(0.1)
+    assert cost[0]["sum"] == approx(0.1 + 5 / 60)
+
+
+@patch("custom_components.kronoterm.ledger.async_add_external_statistics")
+async def test_republish(mock_statistics: MagicMock, hass: HomeAssistant) -> None:
+    """Tests slot booked into a published hour publishes it and later sums again."""
+    ledger = CostLedger(hass, "EUR")
+    hour = START.replace(minute=0)
+    add(ledger, hour, hour + timedelta(hours=2), 1000, 0.1)
+
+    # clock went back, 13:00 - 13:06 at 1 kW once more
+    mock_statistics.reset_mock()
+    add(ledger, hour, hour + timedelta(minutes=6), 1000, 0.1)
+    energy = mock_statistics.call_args_list[0].args[2]
+    assert [row["start"] for row in energy] == [hour, hour + timedelta(hours=1)]
+    assert energy[0]["state"] == approx(1.1)
+    assert [row["sum"] for row in energy] == approx([1.1, 2.1])
+    assert ledger.as_dict()["energy_sum"] == approx(2.1)
+
+    # sums continue from the corrected ones
+    mock_statistics.reset_mock()
+    add(ledger, hour + timedelta(hours=2), hour + timedelta(hours=3), 1000, 0.1)
+    energy = mock_statistics.call_args_list[0].args[2]
+    assert [row["start"] for row in energy] == [hour + timedelta(hours=2)]
+    assert energy[0]["sum"] == approx(3.1)
+
+
+@patch("custom_components.kronoterm.ledger.async_add_external_statistics")
+async def test_persistence(
+    mock_statistics: MagicMock, hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Tests slots survive restart and old slots are dropped."""
+    ledger = CostLedger(hass, "EUR")
+    add(ledger, START, START + timedelta(minutes=20), 3000, 0.3)
+    await ledger.async_save()
+
+    restored = CostLedger(hass, "EUR")
+    await restored.async_load()
+    assert restored.slots == ledger.slots
+    assert restored.as_dict() == ledger.as_dict()
+
+    later = START + RETENTION + timedelta(hours=1)
+    add(restored, later, later + timedelta(minutes=1), 3000, 0.3)
+    assert [record.start for record in restored.slots] == [later.replace(minute=0)]
+
+
+@pytest.mark.usefixtures("setup_recorder")
+async def test_saved_on_unload(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Tests pending save is written when entry unloads, not after reload."""
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    ledger: CostLedger = hass.data[DOMAIN][config_entry.entry_id][COST_LEDGER]
+
+    with patch("custom_components.kronoterm.ledger.async_add_external_statistics"):
+        add(ledger, START, START + timedelta(minutes=20), 3000, 0.3)
+    assert STORAGE_KEY not in hass_storage
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert len(hass_storage[STORAGE_KEY]["data"]["slots"]) == 2
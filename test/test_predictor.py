@@ -1,8 +1,15 @@
 """Test predictor."""
 
 import pytest
-from datetime import datetime
-from custom_components.kronoterm.predictor import Predictor
+from datetime import UTC, datetime, timedelta, timezone
+from unittest.mock import patch
+
+from custom_components.kronoterm.predictor import (
+    SLOT_OF_WEEK_FEATURES,
+    Predictor,
+    horizon_features,
+)
+from custom_components.kronoterm.tracing import Tracer
 
 
 @pytest.fixture
@@ -91,3 +98,78 @@ def test_add_and_refit(sample_data: list[tuple[datetime, float]]) -> None:
     assert isinstance(prediction_before, float)
 
     assert abs(prediction_after - prediction_before) >= 0.0
+
+
+def test_features_match_rows() -> None:
+    """Test features of many datetimes are the features of each one."""
+    dts = [datetime(2025, 5, 16, 23, 45), datetime(2025, 12, 28, 7, 30)]
+    features = Predictor.features(dts)
+    assert features.shape == (2, 15)
+    assert features[1].tolist() == Predictor.features(dts[1:])[0].tolist()
+    assert features[0, :3].tolist() == [23.75, 4, 0]
+    assert features[1, :3].tolist() == [7.5, 6, 1]
+    # month and ISO week of the last week of the year
+    assert features[1, 9:11].tolist() == [12, 52]
+
+
+def test_features_gathered_by_slot() -> None:
+    """Test datetimes count as the start of their slot."""
+    features = Predictor.features(
+        [datetime(2025, 5, 16, 6, 7, 59), datetime(2025, 5, 16, 6, 0)]
+    )
+    assert features[0].tolist() == features[1].tolist()
+    assert features[0, 0] == 6
+    assert SLOT_OF_WEEK_FEATURES.shape == (672, 9)
+
+
+def test_horizon_features_shared(sample_data: list[tuple[datetime, float]]) -> None:
+    """Test forecast features are computed once per slot and local time."""
+    start = datetime(2025, 5, 16, 6, 5, tzinfo=UTC)
+    features = horizon_features(start.replace(minute=0))
+    assert horizon_features(start.replace(minute=0)) is features
+    assert not features.flags.writeable
+
+    # same instant in other time zone has other wall-clock features
+    local = start.astimezone(timezone(timedelta(hours=2)))
+    assert horizon_features(local.replace(minute=0))[0, 0] == features[0, 0] + 2
+
+    forecast = Predictor.new(sample_data).forecast(start)
+    assert forecast[0][0] == start.replace(minute=0)
+    assert len(forecast) == len(features)
+
+
+def test_forecast_predicts_only_new_slots(
+    sample_data: list[tuple[datetime, float]],
+) -> None:
+    """Test long horizon is predicted once and then extended by new slots."""
+    model = Predictor.new(sample_data)
+    start = datetime(2025, 5, 16, 6, 0, tzinfo=UTC)
+    forecast = model.forecast(start, 4 * 48)
+    assert len(forecast) == 4 * 48
+    assert forecast[-1][0] == start + timedelta(hours=48, minutes=-15)
+
+    with patch.object(model.model, "predict", wraps=model.model.predict) as predict:
+        later = model.forecast(start + timedelta(minutes=15), 4 * 48)
+        assert len(predict.call_args.args[0]) == 1
+        assert later[:-1] == forecast[1:]
+
+        # refit invalidates all predictions
+        model.fit()
+        model.forecast(start + timedelta(minutes=15), 4 * 48)
+        assert len(predict.call_args.args[0]) == 4 * 48
+
+
+def test_forecast_traced_when_predicting(
+    sample_data: list[tuple[datetime, float]],
+) -> None:
+    """Test featurization and prediction are timed only when slots are predicted."""
+    model = Predictor.new(sample_data)
+    tracer = Tracer()
+    start = datetime(2025, 5, 16, 6, 0, tzinfo=UTC)
+    model.forecast(start, 4 * 48, tracer)
+    model.forecast(start, 4 * 48, tracer)
+    model.forecast(start + timedelta(minutes=15), 4 * 48, tracer)
+    for name in ("consumer/featurize", "consumer/predict"):
+        stats = tracer.stats(name)
+        assert stats is not None
+        assert stats.count == 2
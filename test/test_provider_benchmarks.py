@@ -0,0 +1,73 @@
+"""Benchmark providers against local mock price server."""
+
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Any
+
+import pytest
+
+from custom_components.kronoterm.energy_api import EnergyAPI
+
+from .mock_price_server import MockPriceServer
+from .test_providers_offline import PROVIDERS
+
+START = datetime(2025, 5, 13, 16, 0, tzinfo=UTC)
+LATENCY = 0.02  # s, simulated network round trip
+RANGE_DAYS = 3
+
+
+async def run_workload(
+    server: MockPriceServer, api: EnergyAPI, starts: list[datetime]
+) -> tuple[float, int, int]:
+    """Return duration (ms), requests and bytes needed to query forecasts."""
+    requests_before = server.total_requests
+    bytes_before = server.bytes_sent
+    begin = time.perf_counter()
+    for start in starts:
+        await api.prices(start)
+    duration = (time.perf_counter() - begin) * 1000
+    return (
+        duration,
+        server.total_requests - requests_before,
+        server.bytes_sent - bytes_before,
+    )
+
+
+@pytest.mark.parametrize(("provider", "provider_class"), PROVIDERS)
+async def test_benchmark_provider(
+    mock_price_server: MockPriceServer,
+    benchmark_report: list[dict[str, Any]],
+    provider: str,
+    provider_class: type[EnergyAPI],
+) -> None:
+    """Drive provider through cold, warm and range workloads."""
+    mock_price_server.latency = LATENCY
+    api = provider_class(provider)
+
+    # 8h forecast starting at 18:00 CEST spans two days
+    cold = await run_workload(mock_price_server, api, [START])
+    warm = await run_workload(mock_price_server, api, [START])
+
+    range_starts = [START + timedelta(hours=8 * i) for i in range(RANGE_DAYS * 24 // 8)]
+    range_ = await run_workload(
+        mock_price_server, provider_class(provider), range_starts
+    )
+
+    for workload, (duration, requests, size) in (
+        ("cold", cold),
+        ("warm", warm),
+        ("range", range_),
+    ):
+        benchmark_report.append(
+            {
+                "benchmark": f"provider/{provider_class.__name__}",
+                "workload": workload,
+                "ms": f"{duration:.1f}",
+                "requests": requests,
+                "bytes": size,
+            }
+        )
+
+    assert cold[1] <= 2
+    assert warm[1] == 0
+    assert range_[1] <= RANGE_DAYS + 1
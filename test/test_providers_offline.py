@@ -0,0 +1,155 @@
+"""Test providers against local mock price server."""
+
+import json
+import re
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from custom_components.kronoterm.energy_api import (
+    EnergyAPI,
+    ENTSOE,
+    NordPool,
+    EnergyCharts,
+)
+from .mock_price_server import FIXTURES, MockPriceServer
+
+# 12:00 CEST
+AT = datetime(2025, 5, 13, 10, 0, tzinfo=UTC)
+
+PROVIDERS: list[tuple[str, type[EnergyAPI]]] = [
+    ("Deutschland (NordPool)", NordPool),
+    ("Slovakia (ENTSOE)", ENTSOE),
+    ("Switzerland (Energy Charts)", EnergyCharts),
+]
+
+
+def recorded_price(provider_class: type[EnergyAPI]) -> float:
+    """Return recorded price (EUR/kWh) for AT."""
+    if provider_class is NordPool:
+        data = json.loads((FIXTURES / "nordpool_day_ahead.json").read_text())
+        return float(data["multiIndexEntries"][12 * 4]["entryPerArea"]["GER"]) / 1000
+    if provider_class is ENTSOE:
+        xml = (FIXTURES / "entsoe_a44.xml").read_text()
+        prices = re.findall(r"<price.amount>([^<]*)</price.amount>", xml)
+        return round(float(prices[12]) / 1000, 5)
+    data = json.loads((FIXTURES / "energy_charts_price.json").read_text())
+    return round(float(data["price"][10]) / 1000, 5)
+
+
+@pytest.mark.parametrize(("provider", "provider_class"), PROVIDERS)
+async def test_recorded_price(
+    mock_price_server: MockPriceServer,
+    provider: str,
+    provider_class: type[EnergyAPI],
+) -> None:
+    """Test providers parse recorded responses."""
+    api = provider_class(provider)
+
+    assert await api.price(AT) == pytest.approx(recorded_price(provider_class))
+    assert mock_price_server.total_requests == 1
+
+    prices = await api.prices(AT)
+    assert len(prices) == 4 * 8
+    assert all(price is not None for _, price in prices)
+
+
+@pytest.mark.parametrize(("provider", "provider_class"), PROVIDERS)
+async def test_error_is_not_cached(
+    mock_price_server: MockPriceServer,
+    provider: str,
+    provider_class: type[EnergyAPI],
+) -> None:
+    """Test failed request returns None and is retried on next call."""
+    api = provider_class(provider)
+
+    mock_price_server.fail_requests = 1
+    assert await api.price(AT) is None
+
+    assert await api.price(AT) == pytest.approx(recorded_price(provider_class))
+    assert mock_price_server.total_requests == 2
+
+
+@pytest.mark.parametrize(("provider", "provider_class"), PROVIDERS)
+async def test_partial_day(
+    mock_price_server: MockPriceServer,
+    provider: str,
+    provider_class: type[EnergyAPI],
+) -> None:
+    """Test prices of unpublished hours are missing."""
+    api = provider_class(provider)
+
+    mock_price_server.published_hours = 6
+    assert await api.price(AT) is None
+
+    mock_price_server.published_hours = 0
+    assert await provider_class(provider).price(AT) is None
+
+
+async def test_entsoe_unpublished_day(
+    mock_price_server: MockPriceServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test unpublished day is asked for once per refresh, not once per slot."""
+    api = ENTSOE("Slovakia (ENTSOE)")
+    mock_price_server.published_hours = 0
+
+    prices = await api.prices(AT)
+    assert all(price is None for _, price in prices)
+    assert await api.price(AT) is None
+    assert mock_price_server.total_requests == 1
+
+    # asked again once the miss expires
+    monkeypatch.setattr(ENTSOE, "miss_ttl", 0)
+    mock_price_server.published_hours = None
+    assert await api.price(AT) == pytest.approx(recorded_price(ENTSOE))
+    assert mock_price_server.total_requests == 2
+
+
+async def test_entsoe_country(mock_price_server: MockPriceServer) -> None:
+    """Test ENTSOE providers without a region are constructed."""
+    for provider in await ENTSOE.providers():
+        ENTSOE(provider)
+
+
+@pytest.mark.parametrize(("provider", "provider_class"), PROVIDERS)
+async def test_metrics(
+    mock_price_server: MockPriceServer,
+    provider: str,
+    provider_class: type[EnergyAPI],
+) -> None:
+    """Test requests, errors and cache usage are counted."""
+    api = provider_class(provider)
+
+    mock_price_server.fail_requests = 1
+    await api.price(AT)
+    await api.price(AT)
+    await api.price(AT)
+
+    metrics = api.metrics
+    assert metrics.requests == 2
+    assert metrics.errors == 1
+    assert metrics.bytes == mock_price_server.bytes_sent
+    assert metrics.parses == 1
+    assert metrics.cache_misses == 2
+    assert metrics.cache_hits == 1
+    assert sum(metrics.latency_histogram) == 2
+
+    # cache holds 10 days
+    for day in range(1, 12):
+        await api.price(AT + timedelta(days=day))
+    assert metrics.cache_evictions == 2
+
+
+async def test_nord_pool_long_range(mock_price_server: MockPriceServer) -> None:
+    """Test range of two days is sliced from cached days, not looked up by slot."""
+    api = NordPool("Deutschland (NordPool)")
+    prices = await api.prices(AT, 4 * 48)
+    assert len(prices) == 4 * 48
+    assert prices[1][0] - prices[0][0] == timedelta(minutes=15)
+    assert prices[0][1] == pytest.approx(recorded_price(NordPool))
+
+    # one lookup per CET day the range touches
+    assert api.metrics.cache_misses + api.metrics.cache_hits == 3
+    assert mock_price_server.total_requests <= 3
+    for dt, price in prices[:: 4 * 7]:
+        assert await api.price(dt) == price
@@ -0,0 +1,39 @@
+"""Tests for reading numeric history from recorder."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.kronoterm.const import BLACK_HOLE_SENSOR
+from custom_components.kronoterm.recorder_history import load_history
+
+
+@patch("custom_components.kronoterm.recorder_history.history.get_significant_states")
+@patch("custom_components.kronoterm.recorder_history.statistics_during_period")
+def test_load_history(
+    mock_statistics: MagicMock, mock_states: MagicMock, hass: HomeAssistant
+) -> None:
+    """Test history is read from statistics, from states only without them."""
+    entity_id = "sensor." + BLACK_HOLE_SENSOR
+    start = datetime(2025, 5, 13, 13, 0, tzinfo=UTC)
+    end = start + timedelta(days=7)
+
+    mock_statistics.return_value = {
+        entity_id: [
+            {"start": start.timestamp(), "mean": 1.5},
+            {"start": start.timestamp() + 300, "mean": None},
+        ]
+    }
+    assert load_history(hass, entity_id, start, end) == [(start, 1.5)]
+    mock_states.assert_not_called()
+
+    mock_statistics.return_value = {}
+    mock_states.return_value = {
+        entity_id: [
+            {"s": "2", "lu": start.timestamp()},
+            {"s": "unavailable", "lu": start.timestamp() + 60},
+        ]
+    }
+    assert load_history(hass, entity_id, start, end) == [(start, 2.0)]
+    assert mock_states.call_args.kwargs["compressed_state_format"] is True
@@ -0,0 +1,64 @@
+"""Test refit scheduler."""
+
+from datetime import UTC, datetime, timedelta
+
+from pytest import approx
+
+from custom_components.kronoterm.refit_scheduler import (
+    MAX_AGE,
+    RefitScheduler,
+)
+
+START = datetime(2025, 5, 13, 13, 0, tzinfo=UTC)
+
+
+def observe(scheduler: RefitScheduler, predicted: float, actual: float) -> datetime:
+    """Forecast and observe 4 slots, return end of the last one."""
+    slots = [START + timedelta(minutes=15 * i) for i in range(4)]
+    scheduler.expect([(slot, predicted) for slot in slots])
+    for slot in slots:
+        scheduler.observe(slot, actual)
+    return slots[-1] + timedelta(minutes=15)
+
+
+def test_accurate_forecast_skips_refit() -> None:
+    """Test predictor isn't refitted while forecast is accurate."""
+    scheduler = RefitScheduler()
+    scheduler.fitted(START)
+    now = observe(scheduler, 1000, 1100)
+
+    assert scheduler.error() == approx(100 / 1100)
+    assert scheduler.reason(now) is None
+    assert scheduler.reason(START + MAX_AGE) == "age"
+
+
+def test_drift_refit() -> None:
+    """Test predictor is refitted when error drifts past threshold."""
+    scheduler = RefitScheduler()
+    scheduler.fitted(START)
+    now = observe(scheduler, 1000, 2000)
+
+    assert scheduler.reason(now) == "drift"
+    scheduler.fitted(now, "drift")
+    assert scheduler.as_dict() == {
+        "error": None,
+        "residuals": 0,
+        "new_slots": 0,
+        "fitted_at": now.isoformat(),
+        "refits": 1,
+        "skipped": 0,
+        "last_reason": "drift",
+    }
+
+
+def test_new_slots_refit() -> None:
+    """Test predictor is refitted after enough new slots."""
+    scheduler = RefitScheduler(max_new_slots=4)
+    scheduler.fitted(START)
+    # slots without prediction count, but have no residuals
+    scheduler.expect([])
+    for i in range(4):
+        scheduler.observe(START + timedelta(minutes=15 * i), 1000)
+
+    assert scheduler.error() is None
+    assert scheduler.reason(START + timedelta(hours=1)) == "slots"
@@ -0,0 +1,159 @@
+"""Tests for cost rollup sensors."""
+
+from datetime import datetime, timedelta
+
+
+import pytest
+from homeassistant.core import HomeAssistant, State
+import homeassistant.util.dt as dt_util
+from pytest import approx
+from pytest_homeassistant_custom_component.common import (  # type: ignore
+    MockConfigEntry,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.kronoterm.const import DAILY_COST_SENSOR, DOMAIN, SELECT_PROVIDER
+from custom_components.kronoterm.energy_api import GENI
+from custom_components.kronoterm.integration import Piece
+from custom_components.kronoterm.rollup_sensor import (
+    ROLLUP_PERIODS,
+    CostRollupSensor,
+    month_start,
+    week_start,
+)
+
+DAILY, WEEKLY, MONTHLY = ROLLUP_PERIODS
+
+
+def pieces(start: datetime, *costs: float) -> list[Piece]:
+    """Return consecutive 15 minute pieces with costs from start."""
+    slot = timedelta(minutes=15)
+    return [
+        Piece(start + i * slot, start + (i + 1) * slot, 1.0, cost)
+        for i, cost in enumerate(costs)
+    ]
+
+
+pytestmark = pytest.mark.usefixtures("setup_recorder")
+
+
+async def test_period_start(hass: HomeAssistant) -> None:
+    """Tests periods start at local midnight."""
+    hass.config.set_time_zone("Europe/Ljubljana")
+    # Sunday, 30 March 2025 is the day of DST change
+    now = datetime(2025, 3, 30, 12, 0, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+    assert DAILY.start_fn(now).isoformat() == "2025-03-30T00:00:00+01:00"
+    assert week_start(now).isoformat() == "2025-03-24T00:00:00+01:00"
+    assert (
+        month_start(now + timedelta(days=2)).isoformat() == "2025-04-01T00:00:00+02:00"
+    )
+
+
+async def test_roll_over(hass: HomeAssistant) -> None:
+    """Tests sum restarts at period start and keeps the previous sum."""
+    sensor = CostRollupSensor(DAILY, "EUR")
+    today = DAILY.start_fn(dt_util.utcnow())
+    assert sensor.should_poll is False
+
+    sensor.add(pieces(today + timedelta(hours=1), 0.5), today + timedelta(hours=1))
+    sensor.add(pieces(today + timedelta(hours=2), 0.25), today + timedelta(hours=2))
+    assert sensor.native_value == approx(0.75)
+    assert sensor.extra_state_attributes["previous"] is None
+
+    tomorrow = today + timedelta(days=1)
+    sensor.add(pieces(tomorrow, 0.1), tomorrow + timedelta(hours=1))
+    assert sensor.native_value == approx(0.1)
+    assert sensor.extra_state_attributes["previous"] == approx(0.75)
+    assert sensor.last_reset == DAILY.start_fn(tomorrow)
+
+    # no cost for a whole day
+    later = today + timedelta(days=3)
+    sensor.add(pieces(later, 0.2), later + timedelta(hours=1))
+    assert sensor.native_value == approx(0.2)
+    assert sensor.extra_state_attributes["previous"] == 0.0
+
+
+async def test_split_at_period_start(hass: HomeAssistant) -> None:
+    """Tests cost before midnight stays in the day it was used in."""
+    sensor = CostRollupSensor(DAILY, "EUR")
+    midnight = DAILY.start_fn(dt_util.utcnow()) + timedelta(days=1)
+
+    sensor.add(pieces(midnight - timedelta(minutes=30), 0.5, 0.25), midnight)
+    sensor.add(
+        pieces(midnight - timedelta(minutes=15), 0.1, 0.2),
+        midnight + timedelta(minutes=15),
+    )
+    assert sensor.native_value == approx(0.2)
+    assert sensor.extra_state_attributes["previous"] == approx(0.85)
+
+    # midnight rolled over before the period was integrated
+    sensor._roll_over(midnight + timedelta(days=1))
+    sensor.add(
+        pieces(midnight + timedelta(days=1, minutes=-15), 0.3, 0.4),
+        midnight + timedelta(days=1, minutes=15),
+    )
+    assert sensor.native_value == approx(0.4)
+    assert sensor.extra_state_attributes["previous"] == approx(0.5)
+
+
+async def test_restore(hass: HomeAssistant) -> None:
+    """Tests sums are restored with the integration, without reading history."""
+    period_start = DAILY.start_fn(dt_util.utcnow())
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(f"sensor.{DAILY_COST_SENSOR}", "1.5"),
+                {
+                    "value": 1.5,
+                    "previous": 2.0,
+                    "period_start": period_start.isoformat(),
+                },
+            )
+        ],
+    )
+
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(f"sensor.{DAILY_COST_SENSOR}")
+    assert state is not None
+    assert float(state.state) == 1.5
+    assert state.attributes["previous"] == 2.0
+    assert state.attributes["unit_of_measurement"] == "EUR"
+
+
+async def test_restore_invalid(hass: HomeAssistant) -> None:
+    """Tests sums restored from invalid data start from 0."""
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(f"sensor.{DAILY_COST_SENSOR}", "1.5"),
+                {
+                    "value": 1.5,
+                    "previous": "invalid",
+                    "period_start": DAILY.start_fn(dt_util.utcnow()).isoformat(),
+                },
+            )
+        ],
+    )
+
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(f"sensor.{DAILY_COST_SENSOR}")
+    assert state is not None
+    assert float(state.state) == 0.0
+    assert state.attributes["previous"] is None
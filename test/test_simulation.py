@@ -0,0 +1,75 @@
+"""Simulate days of uptime of the integration under an accelerated clock."""
+
+import logging
+import os
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.recorder import Recorder
+from homeassistant.core import HomeAssistant
+
+from .mock_price_server import MockPriceServer
+from .simulation import Simulation, frozen_time_trackers
+
+START = datetime(2025, 5, 12, 0, 0, tzinfo=UTC)
+# simulate weeks with KRONOTERM_SIMULATION_DAYS=21
+DAYS = float(os.environ.get("KRONOTERM_SIMULATION_DAYS", "1"))
+
+
+@pytest.fixture
+def recorder_config() -> dict[str, Any]:
+    """Commit like in production, not after every event."""
+    return {"commit_interval": 5}
+
+
+@pytest.fixture
+def enable_statistics() -> bool:
+    """Compile statistics like in production."""
+    return True
+
+
+@pytest.fixture
+def simulation_clock(freezer: FrozenDateTimeFactory) -> Iterator[None]:
+    """Freeze clock for time trackers of recorder and Home Assistant too."""
+    with frozen_time_trackers(freezer, START):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(
+    simulation_clock: None, recorder_mock: Recorder, enable_custom_integrations: Any
+) -> None:
+    """Enable custom integrations, after clock is frozen and recorder set up."""
+    return
+
+
+async def test_simulation(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    mock_price_server: MockPriceServer,
+    benchmark_report: list[dict[str, Any]],
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Run full entity set for days and report loop time, memory and writes."""
+    # debug logs of every event and statement would take most of the time
+    caplog.set_level(logging.WARNING)
+    caplog.set_level(logging.WARNING, logger="sqlalchemy.engine")
+    simulation = Simulation(hass, freezer, mock_price_server)
+    await simulation.async_setup()
+    report = await simulation.async_run(DAYS)
+    benchmark_report.extend(report.as_rows())
+
+    assert report.steps == DAYS * 24 * 60
+    # prices are fetched about once per day and cached
+    assert report.provider_requests <= 2 * (DAYS + 1)
+    # forecasts and per-slot counters aren't recorded
+    assert report.state_rows["sensor.consumer_sensor"] > 0
+    recorded_keys = set().union(*report.attribute_keys.values())
+    assert recorded_keys
+    assert not {"forecast", "cost_forecast_cumulative", "refit"} & recorded_keys
+    state = hass.states.get("sensor.total_cost_sensor")
+    assert state is not None
+    assert float(state.state) > 0
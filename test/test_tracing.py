@@ -0,0 +1,59 @@
+"""Test tracing of update stages."""
+
+import logging
+
+import pytest
+from pytest import approx
+
+from custom_components.kronoterm.tracing import Tracer
+
+
+def test_rolling_percentiles() -> None:
+    """Test percentiles are taken from the last spans only."""
+    tracer = Tracer(window=100, blocking_threshold=10)
+    for i in range(1, 201):
+        tracer.record("stage", i / 1000)
+
+    stats = tracer.stats("stage")
+    assert stats is not None
+    assert stats.percentile(50) == approx(0.150)
+    assert stats.percentile(95) == approx(0.195)
+    assert stats.percentile(100) == approx(0.200)
+    assert stats.as_dict() == {
+        "count": 200,
+        "mean_ms": approx(100.5),
+        "max_ms": 200.0,
+        "blocked": 0,
+        "p50_ms": 150.0,
+        "p95_ms": 195.0,
+        "p99_ms": 199.0,
+    }
+    assert tracer.stats("missing") is None
+
+
+def test_span_is_timed_when_it_raises() -> None:
+    """Test span records duration even when its stage fails."""
+    tracer = Tracer()
+    with pytest.raises(ValueError), tracer.span("stage"):
+        raise ValueError
+
+    assert tracer.as_dict()["spans"]["stage"]["count"] == 1
+
+
+def test_blocking_span_warns(caplog: pytest.LogCaptureFixture) -> None:
+    """Test only synchronous spans over threshold are reported, once."""
+    tracer = Tracer(blocking_threshold=0.05)
+    with caplog.at_level(logging.WARNING):
+        tracer.record("fetch", 1.0, blocking=False)
+        tracer.record("predict", 0.01)
+        assert not caplog.records
+
+        tracer.record("predict", 0.2)
+        tracer.record("predict", 0.3)
+
+    assert len(caplog.records) == 1
+    assert "predict held the event loop for 200 ms" in caplog.text
+    diagnostics = tracer.as_dict()
+    assert diagnostics["blocking_threshold_ms"] == 50.0
+    assert diagnostics["spans"]["predict"]["blocked"] == 2
+    assert diagnostics["spans"]["fetch"]["blocked"] == 0
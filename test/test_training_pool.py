@@ -0,0 +1,87 @@
+"""Test training pool."""
+
+import asyncio
+from functools import partial
+import threading
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.kronoterm.training_pool import TrainingPool, get_training_pool
+
+
+async def test_pool_bounds_workers(hass: HomeAssistant) -> None:
+    """Test at most `workers` jobs run at the same time."""
+    pool = TrainingPool(hass, workers=2)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    release = threading.Event()
+
+    def job(value: int) -> int:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        release.wait(5)
+        with lock:
+            running -= 1
+        return value
+
+    tasks = [
+        asyncio.create_task(pool.async_run(f"consumer{i}", partial(job, i)))
+        for i in range(4)
+    ]
+    await asyncio.sleep(0.1)
+    assert pool.as_dict()["running"] == 2
+    assert pool.as_dict()["queued"] == ["consumer2", "consumer3"]
+
+    release.set()
+    assert await asyncio.gather(*tasks) == [0, 1, 2, 3]
+    assert peak == 2
+    assert pool.completed == 4
+
+
+async def test_pool_replaces_queued_job(hass: HomeAssistant) -> None:
+    """Test newer job of a queued key replaces the older one in its place."""
+    pool = TrainingPool(hass, workers=1)
+    release = threading.Event()
+    runs: list[str] = []
+
+    def job(name: str) -> str:
+        release.wait(5)
+        runs.append(name)
+        return name
+
+    busy = asyncio.create_task(pool.async_run("a", lambda: job("a")))
+    await asyncio.sleep(0)
+    old = asyncio.create_task(pool.async_run("b", lambda: job("b old")))
+    other = asyncio.create_task(pool.async_run("c", lambda: job("c")))
+    await asyncio.sleep(0)
+    new = asyncio.create_task(pool.async_run("b", lambda: job("b new")))
+    await asyncio.sleep(0)
+    assert pool.as_dict()["queued"] == ["b", "c"]
+
+    release.set()
+    results = await asyncio.gather(busy, old, other, new)
+    assert list(results) == ["a", "b new", "c", "b new"]
+    assert runs == ["a", "b new", "c"]
+    assert pool.replaced == 1
+
+
+async def test_pool_failed_job(hass: HomeAssistant) -> None:
+    """Test failure of a job is raised to its callers and frees the worker."""
+    pool = TrainingPool(hass, workers=1)
+
+    def fail() -> None:
+        raise ValueError("no data")
+
+    with pytest.raises(ValueError):
+        await pool.async_run("a", fail)
+    assert await pool.async_run("a", lambda: 1) == 1
+    assert pool.as_dict()["running"] == 0
+
+
+async def test_shared_pool(hass: HomeAssistant) -> None:
+    """Test all consumers get the same pool."""
+    assert get_training_pool(hass) is get_training_pool(hass)
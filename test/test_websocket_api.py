@@ -0,0 +1,193 @@
+"""Tests for WebSocket API."""
+
+from datetime import UTC, datetime, timedelta
+import threading
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+import pytest
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry  # type: ignore
+
+from custom_components.kronoterm.const import DOMAIN, FORECAST_STORE, SELECT_PROVIDER
+from custom_components.kronoterm.energy_api import GENI
+from custom_components.kronoterm.history_compare import lttb
+from custom_components.kronoterm.forecast_store import (
+    CONSUMPTION_FORECAST,
+    PRICE_FORECAST,
+    Forecast,
+    ForecastStore,
+)
+
+AT = datetime(2025, 5, 13, 10, 0, tzinfo=UTC)
+
+
+pytestmark = pytest.mark.usefixtures("setup_recorder")
+
+
+async def test_subscribe_forecast(hass: HomeAssistant, hass_ws_client: Any) -> None:
+    """Tests snapshot is followed by deltas of changed forecasts."""
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    store: ForecastStore = hass.data[DOMAIN][config_entry.entry_id][FORECAST_STORE]
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": "kronoterm/forecast/subscribe"})
+    assert (await client.receive_json())["success"]
+
+    snapshot = (await client.receive_json())["event"]
+    assert snapshot["type"] == "snapshot"
+    assert len(snapshot["forecasts"][PRICE_FORECAST]["slots"]) == 4 * 8
+    version = snapshot["forecasts"][CONSUMPTION_FORECAST]["version"]
+
+    forecast: Forecast = [(AT + timedelta(minutes=15 * i), 1.0) for i in range(4)]
+    store.update(CONSUMPTION_FORECAST, forecast)
+    store.update(CONSUMPTION_FORECAST, [*forecast[:3], (forecast[3][0], 2.0)])
+
+    delta = (await client.receive_json())["event"]
+    assert delta["type"] == "delta"
+    assert delta["kind"] == CONSUMPTION_FORECAST
+    assert delta["base_version"] == version
+    assert len(delta["slots"]) == 4
+
+    delta = (await client.receive_json())["event"]
+    assert delta["base_version"] == version + 1
+    assert delta["slots"] == [[forecast[3][0].isoformat(), 2.0]]
+
+    await client.send_json(
+        {"id": 2, "type": "kronoterm/forecast/subscribe", "config_entry_id": "_"}
+    )
+    assert not (await client.receive_json())["success"]
+
+
+async def test_subscription_closed_on_reload(
+    hass: HomeAssistant, hass_ws_client: Any
+) -> None:
+    """Tests subscribers are told to subscribe again when entry is reloaded."""
+    provider = (await GENI.providers())[0]
+    config_entry = MockConfigEntry(
+        domain=DOMAIN, unique_id="_", data={SELECT_PROVIDER: provider}
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    store: ForecastStore = hass.data[DOMAIN][config_entry.entry_id][FORECAST_STORE]
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": "kronoterm/forecast/subscribe"})
+    assert (await client.receive_json())["success"]
+    assert (await client.receive_json())["event"]["type"] == "snapshot"
+
+    assert await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert (await client.receive_json())["event"] == {"type": "closed"}
+
+    # old store is detached, new one serves the next subscription
+    store.update(CONSUMPTION_FORECAST, [(AT, 1.0)])
+    new_store = hass.data[DOMAIN][config_entry.entry_id][FORECAST_STORE]
+    assert new_store is not store
+    await client.send_json({"id": 2, "type": "unsubscribe_events", "subscription": 1})
+    assert (await client.receive_json())["success"]
+    await client.send_json({"id": 3, "type": "kronoterm/forecast/subscribe"})
+    assert (await client.receive_json())["success"]
+    assert (await client.receive_json())["event"]["type"] == "snapshot"
+
+
+@patch("custom_components.kronoterm.history_compare.states_history")
+@patch("custom_components.kronoterm.history_compare.statistics_history")
+async def test_compare_history(
+    mock_statistics: MagicMock,
+    mock_states: MagicMock,
+    hass: HomeAssistant,
+    hass_ws_client: Any,
+) -> None:
+    """Tests ranges are downsampled and relative to their start."""
+    hass.data[DATA_INSTANCE].async_add_executor_job = hass.async_add_executor_job
+
+    def statistics(
+        hass: HomeAssistant,
+        entity_id: str,
+        start: datetime,
+        end: datetime,
+        period: str,
+        field: str,
+    ) -> list[tuple[datetime, float]]:
+        if field == "mean":
+            return []
+        count = int((end - start) / timedelta(minutes=5))
+        return [(start + timedelta(minutes=5 * i), 10.0 + i) for i in range(count)]
+
+    # downsampling is slow for long ranges, it runs in executor with the read
+    threads: list[str] = []
+
+    def downsample(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+        threads.append(threading.current_thread().name)
+        return lttb(x, y, points)
+
+    mock_statistics.side_effect = statistics
+    await async_setup_component(hass, DOMAIN, {})
+
+    client = await hass_ws_client(hass)
+    with patch("custom_components.kronoterm.history_compare.lttb", downsample):
+        await client.send_json(
+            {
+                "id": 1,
+                "type": "kronoterm/history/compare",
+                "entity_id": "sensor.total_cost_sensor",
+                "ranges": [
+                    [AT.isoformat(), (AT + timedelta(days=1)).isoformat()],
+                    [
+                        (AT + timedelta(days=1)).isoformat(),
+                        (AT + timedelta(days=8)).isoformat(),
+                    ],
+                ],
+                "points": 50,
+            }
+        )
+        response = await client.receive_json()
+    assert len(threads) == 2
+    assert threading.main_thread().name not in threads
+    assert response["success"]
+
+    first, second = response["result"]["ranges"]
+    assert len(first["x"]) == len(first["y"]) == 50
+    assert first["x"][:2] == [0.0, 5.0]
+    assert first["y"][0] == 0.0
+    assert first["y"][-1] == 24 * 12 - 1
+    # long range is read from hourly statistics
+    assert mock_statistics.call_args_list[-1].args[4] == "hour"
+    assert second["start"] == (AT + timedelta(days=1)).isoformat()
+    mock_states.assert_not_called()
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": "kronoterm/history/compare",
+            "entity_id": "sensor.total_cost_sensor",
+            "ranges": [[AT.isoformat(), AT.isoformat()]],
+        }
+    )
+    assert not (await client.receive_json())["success"]
+
+
+def test_lttb() -> None:
+    """Tests peaks are kept when downsampling."""
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[500] = 100.0
+
+    kept = lttb(x, y, 20)
+    assert len(kept) == 20
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 500 in kept
+    assert np.all(np.diff(kept) > 0)
+    assert lttb(x[:10], y[:10], 20).tolist() == list(range(10))